@@ -0,0 +1,174 @@
+import argparse
+import codecs
+import glob
+import logging
+import mmap
+import os
+import re
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("archive_reader")
+
+DEFAULT_ARCHIVE_DIR = "page_sources"
+
+# BOM으로 시작하면 인코딩이 확정됨
+BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# 문서 앞부분에서만 <meta charset>을 찾음
+SNIFF_BYTES = 4096
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+
+# 페이지 소스를 브라우저에서 나눠 받을 단위(문자 수) - 프로세스에는 한 번에 이만큼만 올라옴
+PAGE_SOURCE_CHUNK_CHARS = 1 << 18
+
+# 직렬화한 HTML을 페이지 안에 한 번만 만들어 두고 조각씩 가져옴
+_STAGE_SOURCE_SCRIPT = """
+const doctype = document.doctype ? new XMLSerializer().serializeToString(document.doctype) : '';
+window.__archivedPageSource = doctype + document.documentElement.outerHTML;
+return window.__archivedPageSource.length;
+"""
+# 조각 끝이 서로게이트 쌍 중간이면 한 글자 앞에서 자름 (조각마다 올바른 UTF-8로 인코딩되도록)
+_SLICE_SOURCE_SCRIPT = """
+const source = window.__archivedPageSource;
+let end = Math.min(arguments[1], source.length);
+const last = source.charCodeAt(end - 1);
+if (end < source.length && last >= 0xD800 && last <= 0xDBFF) end -= 1;
+return [end, source.substring(arguments[0], end)];
+"""
+_DROP_SOURCE_SCRIPT = "delete window.__archivedPageSource;"
+
+
+@contextmanager
+def mapped_file(path):
+    """
+    파일을 읽기 전용으로 메모리 매핑합니다.
+
+    파일 내용을 파이썬 bytes로 복사하지 않으므로 해시 계산, 인코딩 감지, 정규식 검색을
+    페이지 캐시 위에서 바로 할 수 있습니다. (빈 파일은 b"")
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if hasattr(buffer, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+            yield buffer
+        finally:
+            buffer.close()
+
+
+def _valid_codec(name):
+    try:
+        return codecs.lookup(name.decode("ascii")).name
+    except (LookupError, UnicodeDecodeError):
+        return None
+
+
+def detect_encoding(buffer):
+    """
+    HTML 버퍼(bytes 또는 mmap)의 인코딩을 전체를 디코딩하지 않고 추정합니다.
+
+    1. BOM
+    2. 첫 비ASCII 바이트 주변이 올바른 UTF-8이면 UTF-8
+       (page_sources/의 파일은 원본 선언과 관계없이 UTF-8로 저장되므로 meta 선언보다 우선)
+    3. <meta charset> 선언
+    4. 비ASCII 바이트가 없으면 UTF-8 (ASCII 호환)
+
+    Returns:
+        str | None: 인코딩 이름 (판단할 수 없으면 None - 파서의 자동 감지에 맡김)
+    """
+    head = buffer[:4]
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    match = NON_ASCII_RE.search(buffer)
+    if match is None:
+        return "utf-8"
+
+    # 멀티바이트 문자가 창 끝에서 잘릴 수 있으므로 final=False로 검사
+    window = buffer[match.start():match.start() + SNIFF_BYTES]
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(window, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    declared = META_CHARSET_RE.search(buffer, 0, SNIFF_BYTES)
+    if declared:
+        return _valid_codec(declared.group(1))
+    return None
+
+
+def write_page_source(driver, path, chunk_chars=PAGE_SOURCE_CHUNK_CHARS):
+    """
+    브라우저의 현재 HTML을 조각 단위로 받아 UTF-8로 파일에 씁니다.
+
+    driver.page_source는 페이지 전체를 문자열 하나로 받아 오므로 큰 페이지는 str과 인코딩한 bytes가 함께 메모리에 남습니다.
+    여기서는 페이지 안에 직렬화해 둔 HTML을 chunk_chars 문자씩 가져와 바로 쓰므로 조각 하나만 메모리에 올라옵니다.
+    스크립트를 실행할 수 없는 문서면 page_source로 한 번에 씁니다.
+
+    Args:
+        driver: 페이지가 로드된 WebDriver
+        path (str): 저장할 파일 경로
+        chunk_chars (int): 한 번에 가져올 문자 수
+
+    Returns:
+        int: 기록한 바이트 수
+    """
+    try:
+        length = driver.execute_script(_STAGE_SOURCE_SCRIPT)
+    except Exception as e:
+        logger.debug(f"페이지 소스를 나눠 받을 수 없어 한 번에 저장: {e}")
+        length = None
+
+    written = 0
+    with open(path, "wb") as f:
+        if not isinstance(length, int):
+            return f.write(driver.page_source.encode("utf-8"))
+        try:
+            start = 0
+            while start < length:
+                start, chunk = driver.execute_script(_SLICE_SOURCE_SCRIPT, start, start + chunk_chars)
+                written += f.write(chunk.encode("utf-8"))
+        finally:
+            try:
+                driver.execute_script(_DROP_SOURCE_SCRIPT)
+            except Exception:
+                pass
+    return written
+
+
+def iter_archived_html(directory=DEFAULT_ARCHIVE_DIR, pattern="*.html"):
+    """보관된 HTML 파일 경로를 이름순으로 반환합니다."""
+    yield from sorted(glob.glob(os.path.join(directory, pattern)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="보관된 HTML의 인코딩 감지/파싱 속도 확인")
+    parser.add_argument("directory", nargs="?", default=DEFAULT_ARCHIVE_DIR, help="HTML 디렉토리")
+    parser.add_argument("--parse", action="store_true", help="BeautifulSoup 파싱까지 수행")
+    args = parser.parse_args()
+
+    total_bytes = 0
+    started = time.perf_counter()
+    for path in iter_archived_html(args.directory):
+        with mapped_file(path) as buffer:
+            encoding = detect_encoding(buffer)
+            total_bytes += len(buffer)
+            if args.parse:
+                from bs4 import BeautifulSoup
+                BeautifulSoup(buffer, "html.parser", from_encoding=encoding)
+        print(f"{encoding or '자동 감지'}\t{os.path.basename(path)}")
+    elapsed = time.perf_counter() - started
+    print(f"{total_bytes / (1024 * 1024):.1f} MB, {elapsed:.2f}초")
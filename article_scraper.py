@@ -0,0 +1,709 @@
+import logging
+import os
+import random
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+# selenium, selenium_stealth, webdriver_manager, bs4는 무거우므로 필요한 함수 안에서 import
+# (Streamlit 앱의 첫 렌더링과 스크랩 서비스 기동이 브라우저 관련 모듈 로딩을 기다리지 않도록)
+from resilience import CircuitOpenError, ScrapeCancelled, check_blocked, check_cancelled, classify_failure, load_with_retry
+from scheduler import domain_key
+from near_duplicates import get_fingerprint_index
+from search_index import get_search_index
+from html_cache import document_cache
+from network_replay import NETWORK_LIVE, NetworkSession, resolve_network_mode
+from browser_profiles import acquire_profile, bind_profile
+from discovery import page_key
+from single_flight import SingleFlight
+from selector_stats import CONTAINER, HTML_CONTAINER, HTML_TITLE, TITLE, get_selector_stats
+from browser_watchdog import get_driver_watchdog, quit_driver
+from wait_stats import document_ready, get_wait_stats_store, wait_for_settle
+from site_profiles import site_registry
+from archive_reader import write_page_source
+
+# Streamlit 앱과 스크랩 서비스가 함께 쓰는 스크랩 핵심 로직 (UI 코드 없음)
+logger = logging.getLogger("article_scraper")
+
+def detect_site_type(url):
+    """URL을 기반으로 사이트 유형을 감지합니다."""
+    return site_registry.for_url(url).name
+
+def get_compatible_chromedriver():
+    """
+    Streamlit Cloud와 호환되는 ChromeDriver를 설정하는 함수
+    
+    Returns:
+        Service: Chrome WebDriver 서비스 객체
+    """
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    try:
+        # 환경 감지
+        is_streamlit_cloud = os.environ.get('IS_STREAMLIT_CLOUD') == 'true'
+        
+        if is_streamlit_cloud:
+            logger.info("Streamlit Cloud 환경 감지됨")
+            
+            # 시스템에 설치된 chromium-driver를 찾아봄
+            system_driver_path = "/usr/bin/chromedriver"
+            if os.path.exists(system_driver_path):
+                logger.info(f"시스템에 설치된 ChromeDriver 사용: {system_driver_path}")
+                return Service(executable_path=system_driver_path)
+            
+            # 시스템에 드라이버가 없으면 Chromium 사용
+            CHROMIUM_PATH = "/usr/bin/chromium"
+            
+            # Chromium 버전 확인
+            chromium_version = ""
+            try:
+                chromium_version_cmd = subprocess.run(
+                    [CHROMIUM_PATH, "--version"], 
+                    capture_output=True, 
+                    text=True
+                )
+                chromium_version = chromium_version_cmd.stdout.strip().split(" ")[-1]
+                logger.info(f"감지된 Chromium 버전: {chromium_version}")
+            except Exception as e:
+                logger.error(f"Chromium 버전 확인 실패: {e}")
+                chromium_version = "120.0.6099.224"  # 기본 버전
+            
+            # ChromeDriver 다운로드 경로 설정
+            chromium_major_version = chromium_version.split('.')[0]
+            driver_path = Path("/tmp/chromedriver")
+            
+            # 환경에 맞는 ChromeDriver 설치
+            if not driver_path.exists():
+                logger.info(f"ChromeDriver 설치 중 (Chromium {chromium_major_version}용)")
+                
+                # webdriver-manager 최신 버전 사용 방식 (3.8.0+)
+                try:
+                    from webdriver_manager.core.os_manager import ChromeType
+                    
+                    # 명시적으로 크롬 유형을 지정하고 브라우저 버전과 일치하는 드라이버 설치
+                    driver_path = ChromeDriverManager(
+                        chrome_type=ChromeType.CHROMIUM
+                    ).install()
+                    logger.info(f"최신 webdriver-manager 방식으로 ChromeDriver 설치 성공")
+                except Exception as e1:
+                    logger.warning(f"최신 방식의 ChromeDriver 설치 실패: {e1}")
+                    
+                    # 구버전 webdriver-manager 사용 방식 시도
+                    try:
+                        # 정확한 버전 없이 기본 ChromeDriver 설치
+                        driver_path = ChromeDriverManager().install()
+                        logger.info(f"기본 ChromeDriver 설치 성공")
+                    except Exception as e2:
+                        logger.error(f"모든 ChromeDriver 설치 방법 실패: {e1}, {e2}")
+                        raise Exception(f"ChromeDriver 설치 실패: {e2}")
+            
+            logger.info(f"ChromeDriver 경로: {driver_path}")
+            return Service(executable_path=driver_path)
+        else:
+            # 로컬 환경에서는 webdriver-manager 사용
+            logger.info("로컬 환경 감지됨, webdriver-manager 사용")
+            return Service(ChromeDriverManager().install())
+    
+    except Exception as e:
+        logger.error(f"ChromeDriver 설정 중 오류 발생: {e}", exc_info=True)
+        # 오류 발생 시 기본 ChromeDriverManager 사용 시도
+        try:
+            return Service(ChromeDriverManager().install())
+        except Exception as e2:
+            logger.error(f"최종 ChromeDriver 설정 실패: {e2}", exc_info=True)
+            # 최후의 수단: 시스템에 설치된 기본 chromedriver 사용 시도
+            if os.path.exists("/usr/bin/chromedriver"):
+                return Service(executable_path="/usr/bin/chromedriver")
+            else:
+                raise Exception("ChromeDriver를 설정할 수 없습니다. 시스템에 설치된 chromedriver가 없습니다.")
+
+def setup_chrome_options(profile_dir=None, disk_cache_dir=None, disk_cache_size=None):
+    """Chrome/Chromium 브라우저 옵션을 설정하는 함수 (profile_dir/disk_cache_dir를 주면 사이트별 프로필/캐시 유지)"""
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--window-size=1920,1080")
+    
+    # Streamlit Cloud에서는 추가 설정
+    is_streamlit_cloud = os.environ.get('IS_STREAMLIT_CLOUD') == 'true'
+    if is_streamlit_cloud:
+        logger.info("Streamlit Cloud 환경에 맞는 브라우저 옵션 설정")
+        # Chromium 경로 명시
+        CHROMIUM_PATH = "/usr/bin/chromium"
+        if os.path.exists(CHROMIUM_PATH):
+            chrome_options.binary_location = CHROMIUM_PATH
+            logger.info(f"Chromium 경로 설정: {CHROMIUM_PATH}")
+        else:
+            logger.warning(f"Chromium 경로를 찾을 수 없음: {CHROMIUM_PATH}")
+    
+    # 봇 감지 우회를 위한 설정
+    user_agents = [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36", 
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ]
+    chrome_options.add_argument(f"--user-agent={random.choice(user_agents)}")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option("useAutomationExtension", False)
+    
+    # 사이트별 영구 프로필/디스크 캐시 (browser_profiles.py, 공통 CSS/JS 재사용)
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if disk_cache_dir:
+        chrome_options.add_argument(f"--disk-cache-dir={disk_cache_dir}")
+    if disk_cache_size:
+        chrome_options.add_argument(f"--disk-cache-size={disk_cache_size}")
+    
+    return chrome_options
+
+def save_page_source(driver, url, output_dir="page_sources"):
+    """현재 페이지의 HTML 소스를 브라우저에서 조각씩 받아 파일로 저장하고 경로를 반환합니다."""
+    # 디렉토리가 없으면 생성
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    
+    # 파일명에 사용할 타임스탬프 생성
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # 사이트 유형 감지
+    site_type = detect_site_type(url)
+    
+    # URL에서 기사 ID 추출
+    try:
+        # URL의 마지막 부분을 ID로 사용
+        article_id = url.strip('/').split('/')[-1]
+        # 쿼리 파라미터 제거
+        if '?' in article_id:
+            article_id = article_id.split('?')[0]
+    except:
+        article_id = "unknown"
+    
+    # 파일명 생성
+    filename = f"{output_dir}/{site_type}_article_{article_id}_{timestamp}.html"
+    
+    # HTML 소스 저장 (페이지 전체를 문자열 하나로 받지 않고 조각 단위로 기록)
+    size = write_page_source(driver, filename)
+    
+    logger.info(f"HTML 소스가 {filename}에 저장되었습니다. ({size} bytes)")
+    return filename
+
+# 본문을 찾지 못했을 때 결과에 넣는 문구 (결과의 'extraction_failed'로 구분)
+EXTRACTION_FAILED_TEXT = "내용을 찾을 수 없습니다."
+
+# 우선 컨테이너가 이 길이 이상의 본문을 가지면 다른 후보를 평가하지 않음
+CONFIDENT_CONTAINER_CHARS = 200
+
+def extract_content_from_html(html_file, html_bytes=None, index=True):
+    """
+    저장된 HTML 파일에서 내용을 추출합니다. (html_bytes가 주어지면 파일을 다시 읽지 않음)
+
+    index가 False이면 검색 인덱스에 반영하지 않습니다. (search_index.rebuild_index처럼 호출하는 쪽에서 색인할 때)
+    """
+    logger.info(f"HTML 파일에서 내용 추출: {html_file}")
+    
+    try:
+        # 파싱 결과는 내용 해시 기준으로 캐시 (디버그 사이드바와 공유, 파일은 메모리 매핑으로 읽음)
+        if html_bytes is None:
+            doc_key, soup = document_cache.get_file_soup(html_file)
+        else:
+            doc_key, soup = document_cache.get_soup(html_bytes)
+        
+        # 파일명 접두어(<사이트>_article_...)로 사이트 프로필 선택
+        profile = site_registry.for_file(html_file)
+        site_type = profile.name
+        
+        # 제목 추출 (사이트별 선택자 -> 일반 선택자 -> 첫 번째 h1, 이 사이트에서 가장 자주 맞은 선택자를 먼저 시도)
+        selector_stats = get_selector_stats()
+        title_elem = None
+        title_selector = None
+        for selector in selector_stats.order(site_type, HTML_TITLE, profile.html_title_selectors):
+            title_elem = profile.select_one(soup, selector)
+            if title_elem:
+                title_selector = selector
+                break
+        selector_stats.record(site_type, HTML_TITLE, title_selector)
+        
+        title = title_elem.text.strip() if title_elem else "제목을 찾을 수 없습니다"
+        
+        # 이 사이트에서 거의 항상 이긴 컨테이너가 충분한 본문과 함께 있으면 나머지 후보는 평가하지 않음
+        article_container = None
+        preferred = selector_stats.preferred(site_type, HTML_CONTAINER)
+        if preferred:
+            candidate = profile.select_one(soup, preferred)
+            if candidate is not None and len(candidate.text.strip()) >= CONFIDENT_CONTAINER_CHARS:
+                article_container = candidate
+                container_selector = preferred
+        
+        if article_container is None:
+            # 여러 컨테이너 후보 탐색 (사이트별 특화 + 일반)
+            containers = []
+            for selector in profile.html_container_selectors:
+                container = profile.select_one(soup, selector)
+                if container is not None:
+                    containers.append((selector, container))
+            
+            if not containers:
+                # 컨테이너를 찾을 수 없는 경우, 대체 방법 시도
+                logger.warning("HTML에서 주요 컨테이너를 찾을 수 없습니다. 대체 방법 시도...")
+                selector_stats.record(site_type, HTML_CONTAINER, None)
+                
+                # 전체 텍스트에서 가장 긴 텍스트 블록 찾기
+                text_blocks = longest_text_blocks(doc_key, soup)
+                
+                if text_blocks:
+                    # 가장 긴 블록 사용
+                    content = text_blocks[0][1]
+                    content = clean_content(content, site_type)
+                    
+                    logger.info(f"대체 방법으로 {len(content)}자 추출됨")
+                    if content and index:
+                        index_extracted_article(html_file, title, content, site_type)
+                    return {
+                        'title': title,
+                        'content': content or EXTRACTION_FAILED_TEXT,
+                        'site_type': site_type,
+                        'extraction_failed': not content
+                    }
+                else:
+                    return {
+                        'title': title, 
+                        'content': f"{EXTRACTION_FAILED_TEXT} HTML 구조가 변경되었을 수 있습니다.",
+                        'site_type': site_type,
+                        'extraction_failed': True
+                    }
+            
+            # 가장 많은 텍스트를 포함한 컨테이너 선택
+            container_selector, article_container = max(containers, key=lambda item: len(item[1].text.strip()))
+        selector_stats.record(site_type, HTML_CONTAINER, container_selector)
+        
+        logger.info(f"선택된 컨테이너: {container_selector} ({article_container.name}.{' '.join(article_container.get('class', []))})")
+        
+        # 다양한 태그에서 내용 추출
+        content_elements = []
+        
+        # p 태그 추출 (길이 제한 없음)
+        p_tags = article_container.select('p')
+        for p in p_tags:
+            p_text = p.text.strip()
+            if p_text:
+                content_elements.append(p_text)
+        
+        # div 태그 추출 (길이 제한 낮춤: 20자)
+        div_tags = article_container.select('div')
+        for div in div_tags:
+            div_text = div.text.strip()
+            if div_text and len(div_text) > 20:  # 실질적인 내용이 있는 div만
+                # 이미 추출된 내용과 중복되지 않는지 확인
+                is_duplicate = False
+                for existing in content_elements:
+                    if div_text in existing or existing in div_text:
+                        is_duplicate = True
+                        break
+                
+                if not is_duplicate:
+                    content_elements.append(div_text)
+        
+        # span 태그도 추가 (길이가 긴 것만)
+        span_tags = article_container.select('span')
+        for span in span_tags:
+            span_text = span.text.strip()
+            if span_text and len(span_text) > 30:  # 실질적인 내용이 있는 span만
+                # 이미 추출된 내용과 중복되지 않는지 확인
+                is_duplicate = False
+                for existing in content_elements:
+                    if span_text in existing or existing in span_text:
+                        is_duplicate = True
+                        break
+                
+                if not is_duplicate:
+                    content_elements.append(span_text)
+        
+        # li 태그도 추가 (길이 제한 없음)
+        li_tags = article_container.select('li')
+        for li in li_tags:
+            li_text = li.text.strip()
+            if li_text:
+                # 중복 검사
+                is_duplicate = False
+                for existing in content_elements:
+                    if li_text in existing or existing in li_text:
+                        is_duplicate = True
+                        break
+                
+                if not is_duplicate:
+                    content_elements.append(li_text)
+        
+        # 그림 설명을 본문에 포함하는 사이트(브런치): figure 태그 내의 figcaption 추가
+        if profile.figure_captions:
+            for fig in article_container.select('figure'):
+                caption = fig.select_one('figcaption')
+                if caption and caption.text.strip():
+                    content_elements.append(f"[이미지] {caption.text.strip()}")
+        
+        # 내용이 추출되지 않은 경우 컨테이너 전체 텍스트 사용
+        if not content_elements:
+            logger.warning("개별 요소에서 내용을 추출할 수 없습니다. 컨테이너 전체 텍스트를 사용합니다.")
+            content = article_container.text.strip()
+        else:
+            # 모든 내용을 합쳐서 하나의 텍스트로
+            content = "\n\n".join(content_elements)
+        
+        # 불필요한 텍스트 제거
+        content = clean_content(content, site_type)
+        
+        logger.info(f"HTML 파일에서 {len(content)}자 추출됨")
+        if content and index:
+            index_extracted_article(html_file, title, content, site_type)
+        return {
+            'title': title,
+            'content': content or EXTRACTION_FAILED_TEXT,
+            'site_type': site_type,
+            'extraction_failed': not content
+        }
+    
+    except Exception as e:
+        logger.error(f"HTML 파일에서 내용 추출 실패: {e}", exc_info=True)
+        return {
+            'error': f"HTML 파일에서 내용 추출 중 오류 발생: {str(e)}"
+        }
+
+def longest_text_blocks(doc_key, soup, top_n=5):
+    """문서에서 가장 긴 텍스트 블록 상위 top_n개 [(태그 이름, 텍스트, 길이)] (문서별 캐시)"""
+    def compute():
+        all_tags = soup.find_all(["p", "div", "article", "section", "main", "span"])
+        text_blocks = []
+        for tag in all_tags:
+            text = " ".join(tag.text.split())
+            if text:
+                text_blocks.append((tag.name, text, len(text)))
+        
+        # 길이순 정렬 (전체 텍스트를 모두 보관하지 않도록 상위 블록만 유지)
+        text_blocks.sort(key=lambda x: x[2], reverse=True)
+        return text_blocks[:top_n]
+    
+    return document_cache.get_analysis(doc_key, ('text_blocks', top_n), compute)
+
+def index_extracted_article(html_file, title, content, site_type, url=None):
+    """추출된 기사를 전문 검색 인덱스에 반영합니다. (색인 실패가 추출 결과에 영향을 주지 않도록 함)"""
+    try:
+        get_search_index().add_document(html_file, title, content, url=url, site_type=site_type)
+    except Exception as e:
+        logger.warning(f"검색 인덱스 갱신 실패: {html_file} ({e})")
+
+def clean_content(content, site_type="unknown"):
+    """추출된 콘텐츠에서 불필요한 텍스트 제거"""
+    # ©️ 문자열 기준으로 내용 잘라내기
+    for copyright_marker in ["©️", "©", "ⓒ", "Copyright", "저작권"]:
+        if copyright_marker in content:
+            content = content.split(copyright_marker)[0]
+            break
+    
+    # 공통/사이트별 문구 제거 (사이트 프로필에 미리 컴파일된 정규식으로 한 번에)
+    content = site_registry.for_name(site_type).remove_phrases(content)
+    
+    # 다중 공백 정리
+    content = ' '.join(content.split())
+    
+    # 문단 구분을 위한 줄바꿈 추가
+    content = content.replace(". ", ".\n\n")
+    
+    return content.strip()
+
+def scrape_article(url, profile_mode=None, network_mode=None, notify=None):
+    """
+    여러 사이트의 기사 내용을 스크랩하는 함수
+    
+    profile_mode: 브라우저 프로필 모드 (off/cache/profile)
+    network_mode: live, record(응답을 HAR로 기록), replay(기록된 응답만으로 오프라인 실행)
+    notify: 진행 메시지를 바로 표시할 함수 notify(level, message) - level은 info/success/warning/error
+    
+    진행 메시지는 결과의 'messages'에도 담기므로 원격 클라이언트(scrape_service)도 같은 내용을 표시할 수 있습니다.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium_stealth import stealth
+    
+    messages = []
+    
+    def report(level, message):
+        messages.append({'level': level, 'message': message})
+        if notify:
+            notify(level, message)
+    
+    # 사이트 프로필 선택 (호스트 이름 기준)
+    profile = site_registry.for_url(url)
+    site_type = profile.name
+    logger.info(f"스크랩 시작: {url} (사이트 유형: {site_type})")
+    
+    # 네트워크 기록/재생 설정
+    network = NetworkSession(url, network_mode)
+    
+    # 사이트별 페이지 로드 대기 선택자
+    wait_selector = profile.wait_selector
+    
+    # 최근 로드 시간으로 정한 사이트별 대기 예산 (알 수 없는 사이트는 도메인별)
+    wait_stats = get_wait_stats_store()
+    stats_key = site_type if site_type != "unknown" else domain_key(url)
+    budget = wait_stats.budget(stats_key)
+    # 재생 모드는 기록된 응답이라 거의 바로 로드되므로, 실제 사이트에 접속할 때(live)만 대기 시간을 기록
+    # (재생한 시간이 섞이면 실제 스크랩의 대기 예산이 줄어 시간 초과가 남)
+    record_waits = network.mode == NETWORK_LIVE
+    logger.info(f"대기 예산 ({stats_key}): 최대 {budget.timeout}초, 폴링 {budget.poll_frequency}초, 추가 대기 최대 {budget.settle_timeout}초")
+    
+    # 브라우저 프로세스 트리의 메모리/페이지 수 감시 (한도를 넘으면 재시도 전에 새 드라이버로 교체)
+    watchdog = get_driver_watchdog()
+    
+    def create_driver():
+        # ChromeDriverManager 대신 get_compatible_chromedriver 함수 사용
+        service = get_compatible_chromedriver()
+        
+        # 사이트별 영구 프로필 슬롯 (모두 사용 중이거나 모드가 off이면 임시 프로필)
+        slot = acquire_profile(domain_key(url), profile_mode)
+        # Chrome 옵션 설정 (재시도마다 새로 만들어 네트워크 설정이 중복되지 않도록)
+        options = network.configure(setup_chrome_options(**slot.chrome_kwargs()) if slot else setup_chrome_options())
+        try:
+            # 프로세스 감시를 먼저 걸어 quit() 시 남은 프로세스 정리가 끝난 뒤 프로필 슬롯이 풀리도록
+            new_driver = bind_profile(watchdog.watch(webdriver.Chrome(service=service, options=options)), slot)
+        except Exception:
+            if slot:
+                slot.release()
+            raise
+        
+        try:
+            new_driver.set_page_load_timeout(30)
+            
+            # Selenium Stealth 적용 (봇 감지 회피)
+            stealth(
+                new_driver,
+                languages=["ko-KR", "ko", "en-US", "en"],
+                vendor="Google Inc.",
+                platform="Win32",
+                webgl_vendor="Intel Inc.",
+                renderer="Intel Iris OpenGL Engine",
+                fix_hairline=True
+            )
+            
+            # 자동화 스크립트 감지 방지
+            new_driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        except Exception:
+            # 설정 중 실패해도 방금 띄운 브라우저가 남지 않도록
+            quit_driver(new_driver)
+            raise
+        return new_driver
+    
+    def load_page(driver):
+        # async_scraper에서 취소된 스크랩이면 페이지를 열지 않음
+        check_cancelled()
+        load_started = time.perf_counter()
+        watchdog.note_page(driver)
+        driver.get(url)
+        
+        try:
+            WebDriverWait(driver, budget.timeout, poll_frequency=budget.poll_frequency).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+            )
+            if record_waits:
+                wait_stats.record(stats_key, time.perf_counter() - load_started)
+            logger.info("기사 컨텐츠 로드 완료")
+        except Exception as e:
+            # 차단 페이지면 재시도 없이 실패, 아니면 선택자 미스로 보고 HTML 추출로 진행
+            check_blocked(driver)
+            # 페이지는 다 받았는데 선택자만 없으면 느린 것이 아니므로 대기 시간으로 기록하지 않음
+            elapsed = None if document_ready(driver) else time.perf_counter() - load_started
+            if record_waits:
+                wait_stats.record(stats_key, elapsed, timed_out=True)
+            logger.warning(f"기사 콘텐츠 로드 대기 시간 초과: {e}")
+    
+    driver = None
+    try:
+        # 재생 모드면 기록된 응답만 돌려주는 로컬 프록시 시작
+        network.start()
+        
+        # 드라이버 충돌/시간 초과는 백오프 후 재시도, 차단 중인 도메인은 바로 실패
+        driver = load_with_retry(create_driver, load_page, domain_key(url), should_recycle=watchdog.needs_recycle)
+        
+        # 추가 대기 (동적 로딩 콘텐츠 대기) - 본문 길이가 더 이상 바뀌지 않으면 바로 진행
+        settle_seconds, _ = wait_for_settle(driver, wait_selector, budget)
+        if record_waits:
+            wait_stats.record(stats_key, settle_seconds=settle_seconds)
+        
+        # 기록 모드면 지금까지 받은 응답을 HAR로 저장
+        har_file = network.record(driver)
+        if har_file:
+            report("info", f"네트워크 기록 저장됨: {har_file}")
+        
+        # 페이지 소스 저장 (추출 실패 시에는 저장한 파일을 메모리 매핑으로 다시 읽음)
+        page_source_file = save_page_source(driver, url)
+        report("info", f"HTML 소스 저장됨: {page_source_file}")
+
+        # 이 사이트에서 가장 자주 맞은 선택자를 먼저 시도 (대부분 한 번의 조회로 끝남)
+        selector_stats = get_selector_stats()
+        selectors = selector_stats.order(site_type, TITLE, profile.title_selectors)
+        
+        # 제목 추출 (find_elements는 없으면 빈 목록이므로 예외 처리 비용이 없음)
+        title = "제목을 찾을 수 없습니다"
+        title_selector = None
+        for selector in selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            text = elements[0].text.strip() if elements else ""
+            if text:
+                title = text
+                title_selector = selector
+                break
+        selector_stats.record(site_type, TITLE, title_selector)
+                
+        selectors = selector_stats.order(site_type, CONTAINER, profile.container_selectors)
+        
+        # 내용 추출
+        content = None
+        article_container = None
+        container_selector = None
+        
+        for selector in selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                article_container = elements[0]
+                container_selector = selector
+                break
+        selector_stats.record(site_type, CONTAINER, container_selector)
+                
+        if article_container:
+            try:
+                # 내용 요소 추출
+                content_elements = []
+                
+                # p 태그 추출
+                p_tags = article_container.find_elements(By.TAG_NAME, "p")
+                for p in p_tags:
+                    if p.text.strip():
+                        content_elements.append(p.text)
+                        
+                # div 태그 추출 (중복 방지를 위한 최소 길이 확인)
+                div_tags = article_container.find_elements(By.TAG_NAME, "div")
+                for div in div_tags:
+                    div_text = div.text.strip()
+                    # 브런치는 div에 중요 내용이 많으므로 길이 제한 완화 (사이트 프로필의 min_div_chars)
+                    if div_text and len(div_text) > profile.min_div_chars:
+                        # 이미 추출된 내용과 중복되지 않는지 확인
+                        is_duplicate = False
+                        for existing in content_elements:
+                            if div_text in existing or existing in div_text:
+                                is_duplicate = True
+                                break
+                        
+                        if not is_duplicate:
+                            content_elements.append(div_text)
+                
+                # 그림 설명을 본문에 포함하는 사이트(브런치): figcaption 처리
+                if profile.figure_captions:
+                    try:
+                        figcaptions = article_container.find_elements(By.TAG_NAME, "figcaption")
+                        for caption in figcaptions:
+                            if caption.text.strip():
+                                content_elements.append(f"[이미지] {caption.text.strip()}")
+                    except Exception:
+                        pass
+                
+                # 모든 내용을 합쳐서 하나의 텍스트로
+                content = "\n\n".join(content_elements)
+                # 불필요한 텍스트 제거
+                content = clean_content(content, site_type)
+                
+            except Exception as e:
+                logger.error(f"내용 추출 실패: {e}")
+                content = None
+        
+        # 내용 추출 실패 시 저장된 HTML 파일에서 추출 시도
+        extraction_failed = False
+        if not content:
+            report("warning", "웹 페이지에서 직접 내용 추출에 실패했습니다. 저장된 HTML 파일에서 추출을 시도합니다...")
+            
+            html_result = extract_content_from_html(page_source_file)
+            if 'error' not in html_result and not html_result.get('extraction_failed'):
+                content = html_result['content']
+                if title == "제목을 찾을 수 없습니다":
+                    title = html_result['title']
+                report("success", "HTML 파일에서 내용을 성공적으로 추출했습니다!")
+            else:
+                extraction_failed = True
+                content = EXTRACTION_FAILED_TEXT
+                report("error", f"HTML 파일 추출도 실패: {html_result.get('error') or html_result['content']}")
+        
+        # 드라이버 종료
+        driver.quit()
+        
+        # 유사 중복 검사 (다른 URL로 이미 보관된 같은 글인지) - 추출 실패 문구는 지문/검색 인덱스에 넣지 않음
+        # (짧은 본문은 check_and_add에서 건너뜀)
+        near_duplicate_of = None
+        if not extraction_failed:
+            duplicates = get_fingerprint_index().check_and_add(url, content, title)
+            if duplicates:
+                near_duplicate_of = duplicates[0][0]
+                report("warning", f"이미 보관된 글과 거의 같은 내용입니다: {near_duplicate_of}")
+            index_extracted_article(page_source_file, title, content, site_type, url)
+        
+        return {
+            'title': title,
+            'content': content,
+            'page_source_file': page_source_file,
+            'site_type': site_type,
+            'near_duplicate_of': near_duplicate_of,
+            'extraction_failed': extraction_failed,
+            'messages': messages
+        }
+
+    except Exception as e:
+        failure_kind = classify_failure(e)
+        error_msg = f"스크랩 과정에서 오류 발생 ({failure_kind}): {str(e)}"
+        logger.error(error_msg, exc_info=not isinstance(e, (CircuitOpenError, ScrapeCancelled)))
+        report("error", error_msg)
+        
+        # 오류 발생 시에도 페이지 소스 저장 시도
+        driver = driver or getattr(e, 'driver', None)
+        if driver is not None:
+            try:
+                page_source_file = save_page_source(driver, url, "error_pages")
+                report("info", f"오류 상태의 HTML 소스가 {page_source_file}에 저장되었습니다.")
+            except Exception as e2:
+                logger.error(f"오류 처리 중 추가 예외 발생: {e2}")
+            finally:
+                # 소스 저장에 실패해도 브라우저 프로세스가 남지 않도록
+                quit_driver(driver)
+        
+        return {'error': str(e), 'failure_kind': failure_kind, 'messages': messages}
+    
+    finally:
+        network.stop()
+
+# 같은 URL의 동시 스크랩을 하나의 브라우저 세션으로 합침
+scrape_flights = SingleFlight()
+
+def scrape_article_shared(url, profile_mode=None, network_mode=None, notify=None):
+    """
+    scrape_article과 같지만, 같은 페이지(discovery.page_key 기준)의 스크랩이 이미 진행 중이면
+    새 브라우저를 띄우지 않고 그 결과를 함께 받습니다.
+    
+    네트워크 모드가 다르면 결과가 달라질 수 있으므로 별도로 실행합니다. (프로필 모드는 캐시 여부만 바꾸므로 키에서 제외)
+    합류한 호출은 진행 메시지를 실시간으로 받지 못하므로, 끝난 뒤 결과의 'messages'를 notify로 한꺼번에 전달합니다.
+    """
+    key = (page_key(url), resolve_network_mode(network_mode))
+    result, shared = scrape_flights.do(
+        key, lambda: scrape_article(url, profile_mode, network_mode, notify=notify)
+    )
+    if not shared:
+        return result
+    
+    if notify:
+        for message in result.get('messages', []):
+            notify(message['level'], message['message'])
+    # 호출마다 결과 dict를 따로 갖도록 얕은 복사
+    return dict(result, coalesced=True)
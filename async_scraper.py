@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from browser_watchdog import get_driver_watchdog
+from discovery import DEFAULT_USER_AGENT, FIXTURE_DIR_ENV, fetch_text, page_key
+from network_replay import resolve_network_mode
+from resilience import TIMEOUT, ScrapeCancelled, set_cancel_event
+from scrape_service import DEFAULT_WORKERS, SERVICE_URL_ENV
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger("async_scraper")
+
+# 동시에 띄울 브라우저 수 (기다리는 스크랩은 스레드 없이 세마포어에서 대기)
+BROWSER_WORKERS_ENV = "ASYNC_BROWSER_WORKERS"
+# 동시에 보낼 HTTP 요청 수
+DEFAULT_HTTP_CONCURRENCY = 20
+DEFAULT_HTTP_TIMEOUT = 10
+# 스크랩 하나의 기본 제한 시간 (대기열에서 기다린 시간 포함)
+DEFAULT_SCRAPE_TIMEOUT = 300
+# 스크랩 서비스 결과 확인 간격과 대기열이 가득 찼을 때 다시 제출하는 횟수
+SERVICE_POLL_INTERVAL = 1.0
+SERVICE_BUSY_RETRIES = 3
+
+_HTTP_ERRORS = (OSError, aiohttp.ClientError) if aiohttp else (OSError,)
+
+
+class _BrowserJob:
+    """실행기 스레드에서 도는 스크랩 하나 (취소되면 스레드의 재시도를 멈추고 브라우저를 종료)"""
+
+    def __init__(self):
+        self.cancel = threading.Event()
+        self.thread_id = None
+        self._lock = threading.Lock()
+
+    def run(self, func, args):
+        with self._lock:
+            if self.cancel.is_set():
+                raise ScrapeCancelled()
+            self.thread_id = threading.get_ident()
+        set_cancel_event(self.cancel)
+        try:
+            return func(*args)
+        finally:
+            set_cancel_event(None)
+            with self._lock:
+                self.thread_id = None
+
+    def abort(self):
+        with self._lock:
+            self.cancel.set()
+            thread_id = self.thread_id
+        if thread_id is not None:
+            get_driver_watchdog().terminate_thread_drivers(thread_id)
+
+
+class AsyncScraper:
+    """
+    asyncio 서비스에서 쓰는 스크랩 API
+
+    Selenium 스크랩은 browser_workers개 스레드의 전용 실행기에서 돌리고, 그 이상의 요청은 스레드 없이
+    세마포어에서 기다리므로 수천 개의 스크랩을 한꺼번에 await해도 이벤트 루프와 메모리에 부담이 없습니다.
+    HTTP 요청(스크랩 서비스 호출, fetch_text)은 aiohttp가 있으면 비동기로, 없으면 별도 스레드 풀에서 보냅니다.
+
+    - 취소: 기다리는 중인 스크랩은 바로 빠지고, 실행 중인 스크랩은 재시도를 멈추고 그 스레드의 브라우저 프로세스를 종료합니다.
+      (슬롯은 스레드가 실제로 끝난 뒤 돌려주므로 취소가 몰려도 브라우저 수가 한도를 넘지 않음)
+    - 시간 제한: 제한을 넘으면 위와 같이 정리하고 오류 결과를 반환합니다.
+    - 같은 페이지(discovery.page_key 기준, 같은 네트워크 모드)의 스크랩이 진행 중이면 새로 띄우지 않고 결과를 함께 받으며,
+      기다리는 호출이 모두 취소되었을 때만 스크랩을 취소합니다.
+    - SCRAPE_SERVICE_URL(또는 service_url)이 설정되어 있으면 브라우저 대신 스크랩 서비스에 맡기고 결과를 비동기로 기다립니다.
+
+    이벤트 루프 안에서 만들고 같은 루프에서만 사용하세요. (async with로 쓰면 끝날 때 남은 스크랩을 정리)
+
+    Args:
+        browser_workers (int): 동시에 띄울 브라우저 수 (기본: ASYNC_BROWSER_WORKERS 환경 변수 또는 2)
+        http_concurrency (int): 동시에 보낼 HTTP 요청 수
+        timeout (float): 스크랩 하나의 기본 제한 시간(초, None이면 제한 없음)
+        service_url (str): 스크랩 서비스 주소
+    """
+
+    def __init__(self, browser_workers=None, http_concurrency=DEFAULT_HTTP_CONCURRENCY, timeout=DEFAULT_SCRAPE_TIMEOUT,
+                 service_url=None):
+        self.browser_workers = int(browser_workers or os.environ.get(BROWSER_WORKERS_ENV) or DEFAULT_WORKERS)
+        self.http_concurrency = http_concurrency
+        self.timeout = timeout
+        self.service_url = (service_url or os.environ.get(SERVICE_URL_ENV) or "").rstrip("/") or None
+        self._browser_executor = ThreadPoolExecutor(self.browser_workers, thread_name_prefix="async-browser")
+        self._browser_slots = asyncio.Semaphore(self.browser_workers)
+        self._http_slots = asyncio.Semaphore(http_concurrency)
+        self._http_executor = None
+        self._session = None
+        self._jobs = set()
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def scrape_article(self, url, timeout=None, profile_mode=None, network_mode=None):
+        """
+        article_scraper.scrape_article의 비동기 버전
+
+        Returns:
+            dict: scrape_article()과 같은 형식의 결과 (실패/시간 초과 시 'error' 포함)
+        """
+        options = {'profile_mode': profile_mode, 'network_mode': network_mode}
+        if self.service_url:
+            factory = partial(self._scrape_remote, url, options)
+        else:
+            from article_scraper import scrape_article
+            factory = partial(self._run_browser, scrape_article, url, profile_mode, network_mode)
+
+        key = ('article', page_key(url), resolve_network_mode(network_mode))
+        result = await self._shared(key, factory, self._timeout(timeout))
+        if result is None:
+            return {'error': f"스크랩 시간 초과 ({self._timeout(timeout)}초)", 'failure_kind': TIMEOUT}
+        return result
+
+    async def scrape_wishket_article(self, url, timeout=None, skip_duplicates=False, detect_changes=False,
+                                     profile_mode=None, network_mode=None):
+        """
+        main.scrape_wishket_article의 비동기 버전 (main.py를 처음 쓸 때 import하므로 그때 scraper.log 로깅이 설정됨)
+
+        Returns:
+            dict: 제목, 내용을 포함한 딕셔너리 (실패/시간 초과 시 None - main.scrape_wishket_article과 같음)
+        """
+        from main import scrape_wishket_article
+        key = ('wishket', page_key(url), resolve_network_mode(network_mode))
+        factory = partial(self._run_browser, scrape_wishket_article, url, skip_duplicates, detect_changes,
+                          profile_mode, network_mode)
+        return await self._shared(key, factory, self._timeout(timeout))
+
+    async def scrape_many(self, urls, timeout=None, **options):
+        """여러 URL을 동시에 스크랩하고 입력 순서대로 결과를 반환합니다. (취소하면 남은 스크랩도 모두 취소)"""
+        return await asyncio.gather(*(self.scrape_article(url, timeout, **options) for url in urls))
+
+    async def fetch_text(self, url, timeout=DEFAULT_HTTP_TIMEOUT, fixture_dir=None):
+        """discovery.fetch_text의 비동기 버전 (HTTP 오류는 예외로 전달)"""
+        fixture_dir = fixture_dir or os.environ.get(FIXTURE_DIR_ENV)
+        async with self._http_slots:
+            if aiohttp is None or fixture_dir:
+                return await self._run_http(fetch_text, url, fixture_dir, timeout)
+            session = self._get_session()
+            headers = {"User-Agent": DEFAULT_USER_AGENT, "Accept-Encoding": "gzip"}
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                response.raise_for_status()
+                data = await response.read()
+        # sitemap.xml.gz처럼 파일 자체가 gzip인 경우 (전송 인코딩은 aiohttp가 해제)
+        if data[:2] == b"\x1f\x8b":
+            data = gzip.decompress(data)
+        return data.decode("utf-8", errors="replace")
+
+    async def aclose(self):
+        """실행 중인 스크랩을 중단하고 실행기/HTTP 세션을 정리합니다."""
+        for entry in list(self._inflight.values()):
+            entry[0].cancel()
+        for job in list(self._jobs):
+            job.abort()
+        loop = asyncio.get_running_loop()
+        # 대기 중인 작업은 버리고, 실행 중인 스레드가 브라우저를 정리하고 끝날 때까지 기다림
+        await loop.run_in_executor(None, lambda: self._browser_executor.shutdown(wait=True, cancel_futures=True))
+        if self._http_executor is not None:
+            self._http_executor.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _timeout(self, timeout):
+        return self.timeout if timeout is None else timeout
+
+    async def _shared(self, key, factory, timeout):
+        # 같은 키의 진행 중인 작업에 합류 (시간 초과면 None)
+        entry = self._inflight.get(key)
+        joined = entry is not None and not entry[0].cancelled()
+        if not joined:
+            entry = [asyncio.ensure_future(factory()), 0]
+            self._inflight[key] = entry
+            entry[0].add_done_callback(lambda _: self._inflight.pop(key, None) if self._inflight.get(key) is entry else None)
+        entry[1] += 1
+        try:
+            result = await asyncio.wait_for(asyncio.shield(entry[0]), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"스크랩 시간 초과 ({timeout}초): {key[1]}")
+            return None
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():
+                entry[0].cancel()
+        if joined and isinstance(result, dict):
+            return dict(result, coalesced=True)
+        return result
+
+    async def _run_browser(self, func, *args):
+        loop = asyncio.get_running_loop()
+        await self._browser_slots.acquire()
+        job = _BrowserJob()
+        try:
+            future = self._browser_executor.submit(job.run, func, args)
+        except BaseException:
+            self._browser_slots.release()
+            raise
+        self._jobs.add(job)
+        future.add_done_callback(lambda _: self._release_browser_slot(loop, job))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            job.abort()
+            logger.info(f"스크랩 취소: {args[0]}")
+            raise
+
+    def _release_browser_slot(self, loop, job):
+        # 실행기 스레드에서 호출됨 (작업이 실제로 끝나야 다음 브라우저를 띄움)
+        def release():
+            self._jobs.discard(job)
+            self._browser_slots.release()
+        try:
+            loop.call_soon_threadsafe(release)
+        except RuntimeError:
+            pass  # 이벤트 루프가 이미 닫힘
+
+    def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        return self._session
+
+    async def _run_http(self, func, *args):
+        if self._http_executor is None:
+            self._http_executor = ThreadPoolExecutor(self.http_concurrency, thread_name_prefix="async-http")
+        return await asyncio.get_running_loop().run_in_executor(self._http_executor, func, *args)
+
+    async def _request_json(self, method, url, payload=None):
+        # (상태 코드, 본문, 헤더)
+        async with self._http_slots:
+            if aiohttp is not None:
+                session = self._get_session()
+                async with session.request(method, url, json=payload,
+                                           timeout=aiohttp.ClientTimeout(total=DEFAULT_HTTP_TIMEOUT)) as response:
+                    data = await response.read()
+                    return response.status, json.loads(data) if data else None, dict(response.headers)
+
+            def request():
+                data = json.dumps(payload).encode("utf-8") if payload is not None else None
+                req = Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+                try:
+                    with urlopen(req, timeout=DEFAULT_HTTP_TIMEOUT) as response:
+                        return response.status, json.loads(response.read() or b"null"), dict(response.headers)
+                except HTTPError as e:
+                    return e.code, json.loads(e.read() or b"null"), dict(e.headers)
+
+            return await self._run_http(request)
+
+    async def _scrape_remote(self, url, options):
+        """스크랩 서비스에 작업을 제출하고 결과를 폴링합니다. (ScrapeServiceClient.scrape의 비동기 버전)"""
+        try:
+            for attempt in range(SERVICE_BUSY_RETRIES + 1):
+                status, body, headers = await self._request_json("POST", f"{self.service_url}/jobs", dict(options, url=url))
+                if status == 202:
+                    break
+                if status == 429 and attempt < SERVICE_BUSY_RETRIES:
+                    retry_after = int(headers.get("Retry-After") or 1)
+                    logger.info(f"스크랩 서비스가 바쁨, {retry_after}초 후 재시도")
+                    await asyncio.sleep(retry_after)
+                    continue
+                return {'error': (body or {}).get('error') or f"작업 제출 실패 ({status})"}
+
+            job_id = body['job_id']
+            while True:
+                status, body, _ = await self._request_json("GET", f"{self.service_url}/jobs/{job_id}/result")
+                if status == 200:
+                    return body
+                if status == 404:
+                    return {'error': f"스크랩 서비스에서 작업을 찾을 수 없습니다: {job_id}"}
+                await asyncio.sleep(SERVICE_POLL_INTERVAL)
+        except _HTTP_ERRORS as e:
+            return {'error': f"스크랩 서비스에 연결할 수 없습니다: {e}"}
+
+
+if __name__ == "__main__":
+    from log_setup import setup_logging
+    setup_logging("async_scraper.log")
+
+    parser = argparse.ArgumentParser(description="여러 기사를 asyncio로 동시에 스크랩")
+    parser.add_argument("urls", nargs="*", help="URL 목록")
+    parser.add_argument("--url-file", help="한 줄에 하나씩 URL이 적힌 파일")
+    parser.add_argument("--workers", type=int, help="동시에 띄울 브라우저 수")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_SCRAPE_TIMEOUT, help="스크랩 하나의 제한 시간(초)")
+    args = parser.parse_args()
+
+    urls = list(args.urls)
+    if args.url_file:
+        with open(args.url_file, "r", encoding="utf-8") as f:
+            urls.extend(line.strip() for line in f if line.strip())
+
+    async def run():
+        async with AsyncScraper(browser_workers=args.workers, timeout=args.timeout) as scraper:
+            for url, result in zip(urls, await scraper.scrape_many(urls)):
+                print(f"{url}\t{result.get('error') or result.get('title')}")
+
+    asyncio.run(run())
@@ -0,0 +1,224 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 등 fcntl이 없는 환경에서는 영구 프로필을 쓰지 않고 기존처럼 임시 프로필로 실행
+    fcntl = None
+
+logger = logging.getLogger("browser_profiles")
+
+DEFAULT_PROFILE_ROOT = os.path.join(".cache", "chrome_profiles")
+
+# 프로필 모드
+MODE_OFF = "off"          # 매번 임시 프로필 (기존 동작)
+MODE_CACHE = "cache"      # 디스크 캐시만 유지 (쿠키/스토리지는 매번 새로)
+MODE_PROFILE = "profile"  # user-data-dir 전체 유지 (캐시 + 쿠키/스토리지)
+PROFILE_MODES = [MODE_OFF, MODE_CACHE, MODE_PROFILE]
+
+# 환경 변수로 기본 모드 지정 (예: CHROME_PROFILE_MODE=cache)
+PROFILE_MODE_ENV = "CHROME_PROFILE_MODE"
+
+# 같은 디렉토리는 Chrome 하나만 쓸 수 있으므로 사이트마다 슬롯을 여러 개 두고 잠금으로 나눠 씀
+DEFAULT_SLOTS_PER_SITE = 4
+
+# Chrome에 넘기는 디스크 캐시 상한과, 정리 시 슬롯 전체 크기 상한
+DEFAULT_DISK_CACHE_BYTES = 200 * 1024 * 1024
+DEFAULT_SLOT_MAX_BYTES = 400 * 1024 * 1024
+
+# 이 기간 동안 쓰이지 않은 슬롯은 삭제
+DEFAULT_MAX_IDLE_DAYS = 14
+
+# 정리 작업 간격 (슬롯을 잡을 때 이 간격이 지났으면 정리 실행)
+CLEANUP_INTERVAL_SECONDS = 60 * 60
+CLEANUP_STAMP_FILE = ".last_cleanup"
+
+LOCK_FILE = ".slot.lock"
+SITE_KEY_RE = re.compile(r"[^0-9A-Za-z_.-]")
+
+
+def resolve_profile_mode(mode=None):
+    """모드 인자 또는 환경 변수에서 프로필 모드를 결정합니다. (잘못된 값은 off)"""
+    mode = (mode or os.environ.get(PROFILE_MODE_ENV) or MODE_OFF).lower()
+    if mode not in PROFILE_MODES:
+        logger.warning(f"알 수 없는 프로필 모드: {mode} (off로 실행)")
+        return MODE_OFF
+    if mode != MODE_OFF and fcntl is None:
+        logger.warning("파일 잠금을 지원하지 않는 환경이므로 영구 프로필을 사용하지 않습니다")
+        return MODE_OFF
+    return mode
+
+
+def directory_size(path):
+    """디렉토리 전체 크기(바이트)"""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class ProfileSlot:
+    """
+    잠금으로 점유한 사이트별 프로필 디렉토리 하나
+
+    release()를 부르기 전까지 다른 드라이버(다른 프로세스 포함)는 같은 슬롯을 쓰지 않습니다.
+    """
+
+    def __init__(self, path, mode, lock_file):
+        self.path = path
+        self.mode = mode
+        self._lock_file = lock_file
+
+    def chrome_kwargs(self, disk_cache_bytes=DEFAULT_DISK_CACHE_BYTES):
+        """setup_chrome_options()에 넘길 인자"""
+        kwargs = {"disk_cache_size": disk_cache_bytes}
+        if self.mode == MODE_PROFILE:
+            kwargs["profile_dir"] = os.path.abspath(self.path)
+        else:
+            kwargs["disk_cache_dir"] = os.path.abspath(os.path.join(self.path, "cache"))
+        return kwargs
+
+    def release(self):
+        if self._lock_file is None:
+            return
+        try:
+            # 마지막 사용 시각 (정리 기준)
+            os.utime(os.path.join(self.path, LOCK_FILE))
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+        finally:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+def _try_lock(slot_path):
+    os.makedirs(slot_path, exist_ok=True)
+    lock_file = open(os.path.join(slot_path, LOCK_FILE), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def acquire_profile(site_key, mode=None, root=DEFAULT_PROFILE_ROOT, slots=DEFAULT_SLOTS_PER_SITE):
+    """
+    사이트의 빈 프로필 슬롯을 점유합니다.
+
+    Args:
+        site_key (str): 사이트/도메인 키 (예: domain_key(url))
+        mode (str): MODE_CACHE 또는 MODE_PROFILE (None이면 환경 변수)
+        root (str): 프로필 루트 디렉토리
+        slots (int): 사이트당 최대 슬롯 수 (동시에 띄울 수 있는 영구 프로필 브라우저 수)
+
+    Returns:
+        ProfileSlot | None: 모드가 off이거나 모든 슬롯이 사용 중이면 None (임시 프로필로 실행)
+    """
+    mode = resolve_profile_mode(mode)
+    if mode == MODE_OFF:
+        return None
+
+    maybe_cleanup(root)
+
+    site_dir = os.path.join(root, mode, SITE_KEY_RE.sub("_", site_key or "unknown"))
+    for index in range(slots):
+        slot_path = os.path.join(site_dir, f"slot-{index}")
+        lock_file = _try_lock(slot_path)
+        if lock_file is not None:
+            logger.info(f"브라우저 프로필 슬롯 사용: {slot_path}")
+            return ProfileSlot(slot_path, mode, lock_file)
+
+    logger.info(f"{site_key}의 프로필 슬롯 {slots}개가 모두 사용 중이므로 임시 프로필로 실행합니다")
+    return None
+
+
+def bind_profile(driver, slot):
+    """드라이버 종료 시 슬롯 잠금이 풀리도록 driver.quit()을 감쌉니다."""
+    if slot is None:
+        return driver
+    original_quit = driver.quit
+
+    def quit():
+        try:
+            original_quit()
+        finally:
+            slot.release()
+
+    driver.quit = quit
+    return driver
+
+
+def cleanup_profiles(root=DEFAULT_PROFILE_ROOT, max_bytes=DEFAULT_SLOT_MAX_BYTES, max_idle_days=DEFAULT_MAX_IDLE_DAYS):
+    """
+    사용 중이 아닌 슬롯을 정리합니다.
+
+    - max_idle_days 동안 쓰이지 않은 슬롯은 삭제
+    - max_bytes를 넘는 슬롯은 삭제 (다음 사용 때 빈 프로필로 다시 시작)
+
+    Returns:
+        int: 삭제한 슬롯 수
+    """
+    if fcntl is None or not os.path.isdir(root):
+        return 0
+
+    removed = 0
+    now = time.time()
+    for dirpath, dirnames, _ in os.walk(root):
+        slot_names = [name for name in dirnames if name.startswith("slot-")]
+        for name in slot_names:
+            slot_path = os.path.join(dirpath, name)
+            lock_file = _try_lock(slot_path)
+            if lock_file is None:
+                continue  # 사용 중
+            try:
+                last_used = os.path.getmtime(os.path.join(slot_path, LOCK_FILE))
+                idle = now - last_used > max_idle_days * 86400
+                size = directory_size(slot_path)
+                if idle or size > max_bytes:
+                    reason = "오래 사용하지 않음" if idle else f"크기 {size // (1024 * 1024)} MB 초과"
+                    for entry in os.listdir(slot_path):
+                        if entry == LOCK_FILE:
+                            continue
+                        entry_path = os.path.join(slot_path, entry)
+                        if os.path.isdir(entry_path) and not os.path.islink(entry_path):
+                            shutil.rmtree(entry_path, ignore_errors=True)
+                        else:
+                            os.remove(entry_path)
+                    removed += 1
+                    logger.info(f"브라우저 프로필 슬롯 정리: {slot_path} ({reason})")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                lock_file.close()
+        # 슬롯 안쪽(프로필 내부)은 탐색하지 않음
+        dirnames[:] = [name for name in dirnames if not name.startswith("slot-")]
+    return removed
+
+
+_cleanup_lock = threading.Lock()
+
+
+def maybe_cleanup(root=DEFAULT_PROFILE_ROOT):
+    """마지막 정리 후 CLEANUP_INTERVAL_SECONDS가 지났으면 정리를 실행합니다."""
+    stamp = os.path.join(root, CLEANUP_STAMP_FILE)
+    if not _cleanup_lock.acquire(blocking=False):
+        return
+    try:
+        if os.path.exists(stamp) and time.time() - os.path.getmtime(stamp) < CLEANUP_INTERVAL_SECONDS:
+            return
+        os.makedirs(root, exist_ok=True)
+        with open(stamp, "w") as f:
+            f.write(str(time.time()))
+        cleanup_profiles(root)
+    except Exception as e:
+        logger.warning(f"브라우저 프로필 정리 실패: {e}")
+    finally:
+        _cleanup_lock.release()
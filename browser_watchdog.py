@@ -0,0 +1,431 @@
+import argparse
+import logging
+import os
+import signal
+import threading
+import time
+import weakref
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger("browser_watchdog")
+
+# 프로세스 트리(chromedriver + Chrome + 렌더러) RSS 합계가 이 값을 넘으면 다음 재시도 전에 새 드라이버로 교체
+MAX_RSS_MB_ENV = "DRIVER_MAX_RSS_MB"
+DEFAULT_MAX_RSS_MB = 1500
+# 한도의 이 배수를 넘으면 페이지 로드 중이어도 프로세스를 종료 (드라이버 충돌로 분류되어 새 드라이버로 재시도됨)
+HARD_LIMIT_FACTOR = 2
+# 한 드라이버로 연 페이지 수 한도
+MAX_PAGES_ENV = "DRIVER_MAX_PAGES"
+DEFAULT_MAX_PAGES = 50
+
+# 감시 주기와 고아 프로세스 정리 주기 (초)
+DEFAULT_INTERVAL = 5
+REAP_INTERVAL = 600
+
+# quit() 뒤 프로세스가 스스로 끝나기를 기다리는 시간
+TERMINATE_GRACE = 3
+
+# 드라이버가 띄운 Chrome을 사용자의 일반 Chrome과 구분하는 명령줄 인자
+AUTOMATION_MARKERS = ("--enable-automation", "--test-type=webdriver")
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def supported():
+    """프로세스 정보를 읽을 수 있는 환경인지 (psutil 또는 /proc)"""
+    return psutil is not None or os.path.isdir("/proc/self")
+
+
+def _proc_stat(pid):
+    # /proc/<pid>/stat의 (부모 PID, 시작 시각) - 프로세스 이름에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤부터 읽음
+    with open(f"/proc/{pid}/stat", "rb") as f:
+        fields = f.read().rsplit(b")", 1)[1].split()
+    return int(fields[1]), int(fields[19])
+
+
+def _process_table():
+    """{pid: (부모 PID, 시작 시각)}"""
+    if psutil is not None:
+        table = {}
+        for process in psutil.process_iter(["ppid", "create_time"]):
+            table[process.pid] = (process.info["ppid"], process.info["create_time"])
+        return table
+
+    table = {}
+    for name in os.listdir("/proc"):
+        if name.isdigit():
+            try:
+                table[int(name)] = _proc_stat(name)
+            except (OSError, IndexError, ValueError):
+                continue
+    return table
+
+
+def process_tree(root_pid, table=None):
+    """
+    root_pid와 모든 자손 프로세스
+
+    Returns:
+        dict: {pid: 시작 시각} (PID 재사용을 구분하기 위해 시작 시각을 함께 기록)
+    """
+    table = table if table is not None else _process_table()
+    if root_pid not in table:
+        return {}
+    children = {}
+    for pid, (ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    tree = {}
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree[pid] = table[pid][1]
+        stack.extend(children.get(pid, []))
+    return tree
+
+
+def process_usage(pid):
+    """(RSS 바이트, 열린 파일 핸들 수) - 읽을 수 없으면 (0, 0)"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            return process.memory_info().rss, process.num_fds() if hasattr(process, "num_fds") else 0
+        except psutil.Error:
+            return 0, 0
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0, 0
+    try:
+        handles = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        handles = 0
+    return rss, handles
+
+
+def _cmdline(pid):
+    if psutil is not None:
+        try:
+            return " ".join(psutil.Process(pid).cmdline())
+        except psutil.Error:
+            return ""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+def _owned_by_me(pid):
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).uids().real == os.getuid()
+        except (psutil.Error, AttributeError):
+            return False
+    try:
+        return os.stat(f"/proc/{pid}").st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def terminate_processes(pids, grace=TERMINATE_GRACE):
+    """
+    프로세스들을 SIGTERM으로 종료하고, grace초 안에 끝나지 않으면 SIGKILL
+
+    Args:
+        pids (dict): {pid: 시작 시각} - 시작 시각이 다르면 PID가 재사용된 것이므로 건드리지 않음
+
+    Returns:
+        int: 종료 신호를 보낸 프로세스 수
+    """
+    table = _process_table()
+    alive = [pid for pid, started in pids.items() if pid != os.getpid() and table.get(pid, (None, None))[1] == started]
+    for pid in alive:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+
+    deadline = time.monotonic() + grace
+    remaining = alive
+    while remaining and time.monotonic() < deadline:
+        time.sleep(0.1)
+        table = _process_table()
+        remaining = [pid for pid in remaining if table.get(pid, (None, None))[1] == pids[pid]]
+    for pid in remaining:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+    return len(alive)
+
+
+class _Watched:
+    def __init__(self, driver, root_pid):
+        self.ref = weakref.ref(driver)
+        self.root_pid = root_pid
+        self.pids = {}
+        self.pages = 0
+        self.rss = 0
+        self.peak_rss = 0
+        self.handles = 0
+        self.recycle_reason = None
+        self.started = time.time()
+        # 드라이버를 만든 스레드 (취소된 스크랩의 브라우저를 찾을 때 사용)
+        self.thread_id = threading.get_ident()
+
+
+class DriverWatchdog:
+    """
+    WebDriver 프로세스 트리 감시
+
+    watch()한 드라이버마다 chromedriver와 그 자손(Chrome, 렌더러 등)의 RSS/열린 핸들을 주기적으로 확인합니다.
+
+    - 메모리 한도나 페이지 수 한도를 넘은 드라이버는 needs_recycle()이 사유를 돌려주므로
+      load_with_retry가 다음 시도 전에 새 드라이버로 바꿉니다.
+    - 한도의 HARD_LIMIT_FACTOR배를 넘으면 바로 종료합니다. (진행 중인 요청은 드라이버 충돌로 재시도)
+    - quit() 뒤에도 남은 프로세스, quit() 없이 버려진 드라이버의 프로세스,
+      이전 실행에서 부모가 죽어 남은 자동화 Chrome/chromedriver를 정리합니다.
+
+    psutil이 있으면 사용하고, 없으면 /proc을 직접 읽습니다. (둘 다 없으면 감시하지 않음)
+
+    Args:
+        max_rss_mb (int): 드라이버 교체 기준 메모리 (MB)
+        max_pages (int): 드라이버 교체 기준 페이지 수
+        interval (float): 감시 주기 (초)
+    """
+
+    def __init__(self, max_rss_mb=None, max_pages=None, interval=DEFAULT_INTERVAL):
+        self.max_rss = int(max_rss_mb or os.environ.get(MAX_RSS_MB_ENV) or DEFAULT_MAX_RSS_MB) * 1024 * 1024
+        self.max_pages = int(max_pages or os.environ.get(MAX_PAGES_ENV) or DEFAULT_MAX_PAGES)
+        self.interval = interval
+        self.enabled = supported()
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_reap = 0.0
+
+    def start(self):
+        if not self.enabled:
+            logger.info("psutil과 /proc을 모두 사용할 수 없어 브라우저 프로세스를 감시하지 않습니다")
+            return self
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="driver-watchdog", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def watch(self, driver):
+        """
+        드라이버를 감시 대상에 추가하고, quit() 뒤 남은 프로세스가 정리되도록 quit()을 감쌉니다.
+
+        Returns:
+            WebDriver: 같은 드라이버
+        """
+        process = getattr(getattr(driver, "service", None), "process", None)
+        if not self.enabled or process is None:
+            return driver
+
+        watched = _Watched(driver, process.pid)
+        watched.pids = process_tree(process.pid)
+        with self._lock:
+            self._watched[id(driver)] = watched
+        original_quit = driver.quit
+
+        def quit():
+            try:
+                original_quit()
+            finally:
+                self._release(id(driver), watched)
+
+        driver.quit = quit
+        return driver
+
+    def note_page(self, driver):
+        """드라이버로 페이지를 하나 열었음을 기록합니다."""
+        with self._lock:
+            watched = self._watched.get(id(driver))
+            if watched is None:
+                return
+            watched.pages += 1
+            if watched.pages >= self.max_pages and watched.recycle_reason is None:
+                watched.recycle_reason = f"페이지 {watched.pages}개 사용"
+
+    def needs_recycle(self, driver):
+        """교체가 필요하면 사유, 아니면 None"""
+        with self._lock:
+            watched = self._watched.get(id(driver))
+            return watched.recycle_reason if watched else None
+
+    def usage(self, driver):
+        """드라이버 프로세스 트리의 최근 사용량"""
+        with self._lock:
+            watched = self._watched.get(id(driver))
+            if watched is None:
+                return None
+            return {
+                'pid': watched.root_pid,
+                'processes': len(watched.pids),
+                'rss_mb': round(watched.rss / (1024 * 1024), 1),
+                'peak_rss_mb': round(watched.peak_rss / (1024 * 1024), 1),
+                'handles': watched.handles,
+                'pages': watched.pages,
+            }
+
+    def summary(self):
+        with self._lock:
+            drivers = list(self._watched.values())
+        return {
+            'drivers': len(drivers),
+            'processes': sum(len(watched.pids) for watched in drivers),
+            'rss_mb': round(sum(watched.rss for watched in drivers) / (1024 * 1024), 1),
+            'handles': sum(watched.handles for watched in drivers),
+        }
+
+    def terminate_thread_drivers(self, thread_id):
+        """
+        thread_id 스레드가 만든 드라이버의 프로세스를 바로 종료합니다. (취소된 스크랩 정리용)
+
+        진행 중인 Selenium 호출은 드라이버 충돌 예외로 끝나고, 스크랩 함수의 예외 처리 경로에서 quit()으로 정리됩니다.
+
+        Returns:
+            int: 종료한 프로세스 수
+        """
+        table = _process_table()
+        with self._lock:
+            targets = [watched for watched in self._watched.values() if watched.thread_id == thread_id]
+        killed = 0
+        for watched in targets:
+            pids = dict(watched.pids)
+            pids.update(process_tree(watched.root_pid, table))
+            killed += terminate_processes(pids, grace=0)
+        if killed:
+            logger.info(f"취소된 스크랩의 브라우저 프로세스 {killed}개 종료")
+        return killed
+
+    def _release(self, key, watched):
+        with self._lock:
+            if self._watched.get(key) is watched:
+                del self._watched[key]
+        # chromedriver가 Chrome을 끝내지 못하고 종료된 경우 남은 프로세스 정리
+        killed = terminate_processes(watched.pids)
+        if killed:
+            logger.warning(f"드라이버 종료 후 남은 프로세스 {killed}개 정리 (chromedriver PID {watched.root_pid})")
+
+    def _sample(self):
+        table = _process_table()
+        with self._lock:
+            items = list(self._watched.items())
+
+        for key, watched in items:
+            if watched.ref() is None:
+                # quit() 없이 버려진 드라이버 (예: 드라이버 생성 직후 설정 중 예외)
+                logger.warning(f"quit() 없이 버려진 드라이버 정리 (chromedriver PID {watched.root_pid})")
+                self._release(key, watched)
+                continue
+
+            tree = process_tree(watched.root_pid, table)
+            rss = handles = 0
+            for pid in tree:
+                pid_rss, pid_handles = process_usage(pid)
+                rss += pid_rss
+                handles += pid_handles
+            with self._lock:
+                # 이미 끝난 자손도 quit 뒤 확인할 수 있도록 누적
+                watched.pids.update(tree)
+                watched.rss = rss
+                watched.peak_rss = max(watched.peak_rss, rss)
+                watched.handles = handles
+                if rss > self.max_rss and watched.recycle_reason is None:
+                    watched.recycle_reason = f"메모리 {rss / (1024 * 1024):.0f}MB 사용"
+                    logger.info(f"드라이버 교체 예정: {watched.recycle_reason} (chromedriver PID {watched.root_pid})")
+
+            if rss > self.max_rss * HARD_LIMIT_FACTOR:
+                logger.warning(f"드라이버 메모리 {rss / (1024 * 1024):.0f}MB로 한도 초과, 프로세스 강제 종료 "
+                               f"(chromedriver PID {watched.root_pid})")
+                terminate_processes(tree, grace=0)
+
+    def reap_orphans(self):
+        """
+        이전 실행이나 비정상 종료로 부모를 잃은 자동화 Chrome/chromedriver를 정리합니다.
+
+        같은 사용자가 실행했고, 부모가 init(PID 1)으로 바뀌었으며, chromedriver이거나
+        자동화 인자(--enable-automation 등)로 실행된 Chrome만 대상으로 합니다.
+
+        Returns:
+            int: 정리한 프로세스 수
+        """
+        table = _process_table()
+        with self._lock:
+            watched_pids = {pid for watched in self._watched.values() for pid in watched.pids}
+        orphans = {}
+        for pid, (ppid, _) in table.items():
+            if ppid != 1 or pid in watched_pids or not _owned_by_me(pid):
+                continue
+            cmdline = _cmdline(pid)
+            if "chromedriver" in cmdline or any(marker in cmdline for marker in AUTOMATION_MARKERS):
+                orphans.update(process_tree(pid, table))
+        killed = terminate_processes(orphans) if orphans else 0
+        if killed:
+            logger.warning(f"부모를 잃은 브라우저 프로세스 {killed}개 정리")
+        return killed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+                if time.monotonic() - self._last_reap >= REAP_INTERVAL:
+                    self._last_reap = time.monotonic()
+                    self.reap_orphans()
+            except Exception as e:
+                logger.error(f"브라우저 프로세스 감시 실패: {e}", exc_info=True)
+
+
+def quit_driver(driver):
+    """예외 처리 경로에서도 프로세스가 남지 않도록 driver.quit()의 예외를 삼킵니다."""
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"드라이버 종료 실패: {e}")
+
+
+_default_watchdog = None
+_default_watchdog_lock = threading.Lock()
+
+
+def get_driver_watchdog():
+    """프로세스에서 공유하는 브라우저 감시기를 반환합니다. (처음 호출 시 감시 스레드 시작)"""
+    global _default_watchdog
+    with _default_watchdog_lock:
+        if _default_watchdog is None:
+            _default_watchdog = DriverWatchdog().start()
+        return _default_watchdog
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="남아 있는 자동화 Chrome/chromedriver 프로세스 확인 및 정리")
+    parser.add_argument("--reap", action="store_true", help="부모를 잃은 프로세스 종료")
+    args = parser.parse_args()
+
+    if not supported():
+        parser.exit(1, "psutil 또는 /proc이 필요합니다\n")
+
+    table = _process_table()
+    for pid, (ppid, _) in sorted(table.items()):
+        cmdline = _cmdline(pid)
+        if _owned_by_me(pid) and ("chromedriver" in cmdline or any(marker in cmdline for marker in AUTOMATION_MARKERS)):
+            rss, handles = process_usage(pid)
+            orphan = " (부모 없음)" if ppid == 1 else ""
+            print(f"{pid}\t{rss / (1024 * 1024):.0f}MB\t핸들 {handles}{orphan}\t{cmdline[:100]}")
+    if args.reap:
+        print(f"정리한 프로세스: {DriverWatchdog().reap_orphans()}개")
@@ -0,0 +1,275 @@
+import difflib
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+
+from discovery import ARCHIVED_WISHKET_FILE_RE, WISHKET_DETAIL_URL, normalize_url
+from near_duplicates import DEFAULT_MAX_DISTANCE, MIN_CONTENT_CHARS, hamming_distance, simhash
+
+logger = logging.getLogger("change_detection")
+
+DEFAULT_STATE_FILE = "content_state.json"
+DEFAULT_CHANGE_LOG = "change_log.jsonl"
+
+# 비교 결과
+NEW = "new"                  # 처음 보는 URL
+UNCHANGED = "unchanged"      # 컨테이너/본문 모두 같음
+MARKUP_ONLY = "markup_only"  # 마크업만 바뀌고 정리된 본문은 같음 (보관하지 않음)
+CHANGED = "changed"          # 본문이 바뀜 (다시 추출/보관)
+
+# 브라우저 안에서 한 번에 컨테이너 HTML, 텍스트, 제목을 가져옴 (요소별 WebDriver 왕복 없이)
+FINGERPRINT_SCRIPT = """
+const container = document.querySelector(arguments[0]) || document.querySelector('article');
+const heading = document.querySelector('h1.article-title') || document.querySelector('h1');
+return {
+    html: container ? container.outerHTML : '',
+    text: container ? container.innerText : '',
+    title: heading ? heading.innerText : ''
+};
+"""
+
+# 요청마다 바뀌는 속성은 비교에서 제외
+VOLATILE_ATTR_RE = re.compile(r'\s(?:nonce|data-[\w-]+|style|id)="[^"]*"')
+WHITESPACE_RE = re.compile(r"\s+")
+TAG_GAP_RE = re.compile(r">\s+<")
+TAG_END_RE = re.compile(r"\s+(/?>)")
+
+# 변경 로그에 남길 문단 예시 수
+DIFF_SAMPLE_LINES = 5
+DIFF_SAMPLE_LENGTH = 120
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_container_html(html):
+    """비교용으로 컨테이너 HTML을 정규화합니다. (휘발성 속성 제거, 공백 통일)"""
+    html = VOLATILE_ATTR_RE.sub("", html)
+    html = TAG_GAP_RE.sub("><", html)
+    html = TAG_END_RE.sub(r"\1", html)
+    return WHITESPACE_RE.sub(" ", html).strip()
+
+
+def read_fingerprint(driver, clean, container_selector="div.article-body-container"):
+    """
+    로드된 페이지에서 변경 감지용 지문을 읽습니다.
+
+    Args:
+        driver: 페이지가 로드된 WebDriver
+        clean (callable): 본문 정리 함수 (clean_content)
+        container_selector (str): 본문 컨테이너 CSS 선택자
+
+    Returns:
+        dict: {'container_hash', 'text_hash', 'title', 'text'}
+    """
+    data = driver.execute_script(FINGERPRINT_SCRIPT, container_selector) or {}
+    text = clean(data.get("text") or "")
+    return {
+        "container_hash": _sha256(normalize_container_html(data.get("html") or "")),
+        "text_hash": _sha256(text),
+        "title": (data.get("title") or "").strip(),
+        "text": text,
+    }
+
+
+def summarize_text_diff(old_text, new_text):
+    """
+    문단 단위로 본문 차이를 요약합니다.
+
+    Returns:
+        dict: {'added', 'removed', 'samples'} (samples는 '+ 문단'/'- 문단' 일부)
+    """
+    old_lines = [line for line in (old_text or "").split("\n\n") if line.strip()]
+    new_lines = [line for line in (new_text or "").split("\n\n") if line.strip()]
+    added = removed = 0
+    samples = []
+    for line in difflib.ndiff(old_lines, new_lines):
+        if line[:2] not in ("+ ", "- "):
+            continue
+        if line[0] == "+":
+            added += 1
+        else:
+            removed += 1
+        if len(samples) < DIFF_SAMPLE_LINES:
+            samples.append(line[:DIFF_SAMPLE_LENGTH])
+    return {"added": added, "removed": removed, "samples": samples}
+
+
+class ContentStateStore:
+    """
+    URL별 마지막 본문 지문과 변경 로그
+
+    다시 스크랩할 때 지문이 같으면 페이지 로드만 하고 보관/추출/메타데이터 쓰기를 건너뛸 수 있도록,
+    URL마다 컨테이너 해시, 정리된 본문 해시, 마지막으로 보관한 파일을 기록합니다.
+
+    Args:
+        path (str): 상태 파일 경로
+        log_path (str): 변경 로그(JSON Lines) 경로
+    """
+
+    def __init__(self, path=DEFAULT_STATE_FILE, log_path=DEFAULT_CHANGE_LOG):
+        self.path = path
+        self.log_path = log_path
+        self.states = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.states = json.load(f)
+            except Exception as e:
+                logger.warning(f"본문 상태 파일 읽기 실패: {path} ({e})")
+
+    def get(self, url):
+        with self._lock:
+            return self.states.get(normalize_url(url))
+
+    def seed_from_metadata(self, metadata_dir="metadata"):
+        """
+        상태가 없는 보관 기사를 metadata/에서 채웁니다. (변경 감지 이전에 보관된 기사가 첫 --refresh에서 NEW로 다시 보관되지 않도록)
+
+        메타데이터에는 페이지 지문이 없으므로 본문의 simhash만 기록하고, 첫 비교에서 본문이 거의 같으면 변경 없음으로 봅니다.
+        (추출 방법에 따라 문단 구분 등이 컨테이너 텍스트와 조금씩 달라 해시로는 비교할 수 없음)
+
+        Returns:
+            int: 새로 채운 URL 수
+        """
+        seeded = {}
+        for path in glob.glob(os.path.join(metadata_dir, "*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except Exception as e:
+                logger.warning(f"메타데이터 읽기 실패: {path} ({e})")
+                continue
+            url = metadata.get("url")
+            if not url:
+                match = ARCHIVED_WISHKET_FILE_RE.match(os.path.basename(path))
+                url = WISHKET_DETAIL_URL.format(id=match.group(1)) if match else None
+            content = metadata.get("content") or ""
+            method = metadata.get("extraction_method") or metadata.get("best_method")
+            if not url or method == "실패" or len(content.strip()) < MIN_CONTENT_CHARS:
+                continue
+            # 같은 URL을 여러 번 보관했으면 가장 최근 파일 (파일명의 날짜/시각 순)
+            key = normalize_url(url)
+            if key in seeded and os.path.basename(seeded[key]["metadata_file"]) > os.path.basename(path):
+                continue
+            seeded[key] = {
+                "url": url,
+                "content_simhash": simhash(content),
+                "title": metadata.get("title"),
+                "page_source_file": metadata.get("page_source_file"),
+                "metadata_file": path,
+                "last_checked": metadata.get("timestamp"),
+            }
+
+        with self._lock:
+            added = {key: state for key, state in seeded.items() if key not in self.states}
+            if added:
+                self.states.update(added)
+                self._save()
+        if added:
+            logger.info(f"보관된 메타데이터에서 본문 상태 {len(added)}개를 채움")
+        return len(added)
+
+    def classify(self, url, fingerprint):
+        """이전 상태와 비교한 결과 (NEW, UNCHANGED, MARKUP_ONLY, CHANGED)"""
+        previous = self.get(url)
+        if previous is None:
+            return NEW
+        if "text_hash" not in previous:
+            # 메타데이터에서 채운 상태: 본문 simhash가 가까우면 같은 본문
+            distance = hamming_distance(simhash(fingerprint["text"]), previous["content_simhash"])
+            return UNCHANGED if distance <= DEFAULT_MAX_DISTANCE else CHANGED
+        if previous["text_hash"] != fingerprint["text_hash"]:
+            return CHANGED
+        if previous["container_hash"] != fingerprint["container_hash"]:
+            return MARKUP_ONLY
+        return UNCHANGED
+
+    def record(self, url, fingerprint, status, content=None, page_source_file=None, metadata_file=None):
+        """
+        비교 결과를 상태에 반영하고, 바뀐 내용이 있으면 변경 로그에 기록합니다.
+
+        Args:
+            url (str): 기사 URL
+            fingerprint (dict): read_fingerprint() 결과
+            status (str): classify() 결과
+            content (str): 새로 추출한 본문 (CHANGED일 때 이전 본문과 비교)
+            page_source_file (str): 새로 보관한 HTML 파일 (보관하지 않았으면 None)
+            metadata_file (str): 새로 쓴 메타데이터 파일
+        """
+        key = normalize_url(url)
+        now = datetime.now().isoformat()
+        with self._lock:
+            previous = self.states.get(key) or {}
+            state = dict(previous)
+            state.pop("content_simhash", None)
+            state.update({
+                "url": url,
+                "container_hash": fingerprint["container_hash"],
+                "text_hash": fingerprint["text_hash"],
+                "title": fingerprint["title"] or previous.get("title"),
+                "last_checked": now,
+            })
+            if status != UNCHANGED:
+                state["last_changed"] = now
+            if page_source_file:
+                state["page_source_file"] = page_source_file
+            if metadata_file:
+                state["metadata_file"] = metadata_file
+            self.states[key] = state
+            self._save()
+
+        if status in (UNCHANGED, NEW):
+            return
+
+        entry = {"url": url, "timestamp": now, "status": status, "changed": ["container"]}
+        if status == CHANGED:
+            entry["changed"].append("text")
+            entry["diff"] = summarize_text_diff(self._previous_content(previous), content or fingerprint["text"])
+        if previous.get("title") and fingerprint["title"] and previous["title"] != fingerprint["title"]:
+            entry["changed"].append("title")
+            entry["title"] = {"old": previous["title"], "new": fingerprint["title"]}
+        self._append_log(entry)
+        logger.info(f"본문 변경 감지 ({status}): {url} {entry['changed']}")
+
+    def _previous_content(self, previous):
+        # 이전 본문은 상태에 두지 않고 마지막 메타데이터 파일에서 읽음
+        metadata_file = previous.get("metadata_file")
+        if not metadata_file or not os.path.exists(metadata_file):
+            return ""
+        try:
+            with open(metadata_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("content", "")
+        except Exception:
+            return ""
+
+    def _append_log(self, entry):
+        with self._lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.states, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_content_state_store(path=DEFAULT_STATE_FILE):
+    """프로세스에서 공유하는 본문 상태 저장소를 반환합니다."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = ContentStateStore(path)
+        return _default_store
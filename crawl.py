@@ -0,0 +1,176 @@
+import argparse
+import json
+import logging
+import os
+import urllib.error
+import urllib.request
+from datetime import datetime
+
+from discovery import DEFAULT_USER_AGENT, WISHKET_DETAIL_URL, load_archived_urls, normalize_url
+
+logger = logging.getLogger("wishket_crawler")
+
+DEFAULT_CHECKPOINT_FILE = "crawl_checkpoint.json"
+
+
+def load_checkpoint(path=DEFAULT_CHECKPOINT_FILE):
+    """
+    크롤링 체크포인트를 읽습니다.
+
+    Args:
+        path (str): 체크포인트 파일 경로
+
+    Returns:
+        dict: 체크포인트 (파일이 없으면 빈 체크포인트)
+    """
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {"next_id": None, "high_water": 0, "missing": [], "failed": {}}
+
+
+def save_checkpoint(checkpoint, path=DEFAULT_CHECKPOINT_FILE):
+    """
+    체크포인트를 원자적으로 저장합니다. (임시 파일에 쓴 뒤 교체하므로 중간에 죽어도 파일이 깨지지 않음)
+    """
+    checkpoint["updated"] = datetime.now().isoformat()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def probe_article(url, timeout=10):
+    """
+    브라우저를 띄우기 전에 가벼운 HTTP 요청으로 기사 존재 여부를 확인합니다.
+
+    Returns:
+        bool: 기사가 존재하면 True, 404/410이면 False (그 외 오류는 존재한다고 보고 스크랩에 맡김)
+    """
+    request = urllib.request.Request(url, method="HEAD", headers={"User-Agent": DEFAULT_USER_AGENT})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout):
+            return True
+    except urllib.error.HTTPError as e:
+        if e.code in (404, 410):
+            return False
+        logger.warning(f"기사 확인 요청 실패 ({e.code}): {url}")
+        return True
+    except Exception as e:
+        logger.warning(f"기사 확인 요청 실패: {url} ({e})")
+        return True
+
+
+def crawl_wishket_range(start, end=None, checkpoint_path=DEFAULT_CHECKPOINT_FILE,
+                        metadata_dir="metadata", scrape_func=None, probe=True,
+                        stop_after_misses=20, max_failures=3):
+    """
+    위시켓 기사 ID 범위를 순회하며 스크랩하고 진행 상황을 체크포인트로 저장합니다.
+
+    - metadata/ 에 이미 있는 ID는 요청 없이 건너뜁니다.
+    - ID 하나를 처리할 때마다 체크포인트를 저장하므로 중단된 실행은 정확히 그 지점부터 재개됩니다.
+    - end를 지정하지 않으면 high_water 다음 ID부터 연속 stop_after_misses 개가 없을 때까지 진행합니다.
+      (야간 작업이 새 기사 수에 비례하는 시간만 쓰도록)
+
+    Args:
+        start (int): 시작 ID (체크포인트가 있으면 체크포인트 위치가 우선)
+        end (int): 끝 ID (포함). None이면 새 기사가 없을 때까지
+        checkpoint_path (str): 체크포인트 파일 경로
+        metadata_dir (str): 이미 보관된 기사를 확인할 메타데이터 디렉토리
+        scrape_func (callable): URL을 받아 결과 dict(실패 시 None)를 반환하는 함수
+        probe (bool): 스크랩 전에 HTTP 요청으로 존재 여부 확인
+        stop_after_misses (int): end가 없을 때 연속으로 없는 ID가 이만큼이면 종료
+        max_failures (int): 같은 ID의 스크랩 실패 허용 횟수 (초과하면 건너뜀)
+
+    Returns:
+        dict: 이번 실행의 통계 (scraped, skipped, missing, failed)
+    """
+    if scrape_func is None:
+        from main import scrape_wishket_article
+        scrape_func = scrape_wishket_article
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    archived = load_archived_urls(metadata_dir)
+    missing = set(checkpoint.get("missing", []))
+    failed = checkpoint.setdefault("failed", {})
+
+    # 재개 위치: 범위 안의 체크포인트가 있으면 그 위치, 없으면 start (야간 모드는 high_water 다음부터)
+    article_id = start
+    resume_id = checkpoint.get("next_id")
+    if resume_id and resume_id >= start and (end is None or resume_id <= end):
+        article_id = resume_id
+    if end is None:
+        article_id = max(article_id, checkpoint.get("high_water", 0) + 1)
+    logger.info(f"크롤링 시작: ID {article_id}부터 {end if end is not None else '새 기사가 없을 때까지'}")
+
+    stats = {"scraped": 0, "skipped": 0, "missing": 0, "failed": 0}
+    consecutive_misses = 0
+
+    while end is None or article_id <= end:
+        if end is None and consecutive_misses >= stop_after_misses:
+            # 새 기사 구간의 끝: 아직 발행되지 않은 ID는 다음 실행에서 다시 확인
+            article_id -= consecutive_misses
+            break
+
+        url = WISHKET_DETAIL_URL.format(id=article_id)
+        key = str(article_id)
+
+        if normalize_url(url) in archived:
+            stats["skipped"] += 1
+            consecutive_misses = 0
+            checkpoint["high_water"] = max(checkpoint.get("high_water", 0), article_id)
+        elif article_id in missing or failed.get(key, 0) >= max_failures:
+            stats["skipped"] += 1
+            consecutive_misses += 1
+        elif probe and not probe_article(url):
+            stats["missing"] += 1
+            consecutive_misses += 1
+            # 범위 모드에서만 영구적으로 없는 ID로 기록 (야간 모드의 앞쪽 ID는 곧 발행될 수 있음)
+            if end is not None:
+                missing.add(article_id)
+        else:
+            result = scrape_func(url)
+            if result:
+                stats["scraped"] += 1
+                consecutive_misses = 0
+                archived.add(normalize_url(url))
+                failed.pop(key, None)
+                checkpoint["high_water"] = max(checkpoint.get("high_water", 0), article_id)
+            else:
+                stats["failed"] += 1
+                consecutive_misses += 1
+                failed[key] = failed.get(key, 0) + 1
+
+        article_id += 1
+        checkpoint["next_id"] = article_id
+        checkpoint["missing"] = sorted(missing)
+        save_checkpoint(checkpoint, checkpoint_path)
+
+    # 범위를 모두 끝냈으면 다음 실행이 high_water 기준으로 이어가도록 위치 초기화
+    checkpoint["next_id"] = None if end is not None else article_id
+    save_checkpoint(checkpoint, checkpoint_path)
+
+    logger.info(f"크롤링 종료: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="위시켓 기사 ID 범위를 체크포인트와 함께 크롤링합니다.")
+    parser.add_argument("--start", type=int, default=1, help="시작 ID (체크포인트가 있으면 무시)")
+    parser.add_argument("--end", type=int, help="끝 ID. 생략하면 새 기사가 없을 때까지 (야간 작업용)")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT_FILE, help="체크포인트 파일 경로")
+    parser.add_argument("--no-probe", action="store_true", help="HTTP 존재 확인 없이 바로 스크랩")
+    parser.add_argument("--stop-after-misses", type=int, default=20, help="연속으로 없는 ID 허용 개수")
+    args = parser.parse_args()
+
+    crawl_wishket_range(
+        args.start,
+        args.end,
+        checkpoint_path=args.checkpoint,
+        probe=not args.no_probe,
+        stop_after_misses=args.stop_after_misses,
+    )
@@ -0,0 +1,338 @@
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import re
+import urllib.request
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse, urlunparse
+
+logger = logging.getLogger("article_discovery")
+
+# 브라우저 없이 가벼운 HTTP 요청만 사용 (스크래퍼와 동일한 UA 계열)
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 로컬 픽스처 모드: 이 환경 변수가 설정되면 네트워크 대신 로컬 파일을 읽음
+FIXTURE_DIR_ENV = "DISCOVERY_FIXTURE_DIR"
+
+WISHKET_DETAIL_URL = "https://yozm.wishket.com/magazine/detail/{id}/"
+
+# 사이트별 탐색 소스 ({account}는 작가/사용자 이름으로 치환)
+DISCOVERY_SOURCES = {
+    "wishket": {
+        "sitemaps": ["https://yozm.wishket.com/sitemap.xml"],
+        "feeds": [],
+        "id_url_template": WISHKET_DETAIL_URL,
+        "article_pattern": re.compile(r"^https?://yozm\.wishket\.com/magazine/detail/\d+/?$"),
+    },
+    "brunch": {
+        "sitemaps": [],
+        "feeds": ["https://brunch.co.kr/rss/@@{account}"],
+        "id_url_template": None,
+        "article_pattern": re.compile(r"^https?://brunch\.co\.kr/@[^/]+/\d+/?$"),
+    },
+    "velog": {
+        "sitemaps": [],
+        "feeds": ["https://v2.velog.io/rss/{account}"],
+        "id_url_template": None,
+        "article_pattern": re.compile(r"^https?://velog\.io/@[^/]+/[^/]+/?$"),
+    },
+    "medium": {
+        "sitemaps": [],
+        "feeds": ["https://medium.com/feed/@{account}"],
+        "id_url_template": None,
+        "article_pattern": re.compile(r"^https?://([\w-]+\.)?medium\.com/.+"),
+    },
+}
+
+# 저장된 파일명에서 위시켓 기사 ID 추출 (main.py: article_ID_..., streamlit_app.py: wishket_article_ID_...)
+ARCHIVED_WISHKET_FILE_RE = re.compile(r"^(?:wishket_)?article_(\d+)_\d{8}_\d{6}\.(?:html|json)$")
+
+
+def normalize_url(url):
+    """
+    중복 비교용으로 URL을 정규화합니다.
+
+    스킴/호스트를 소문자로 바꾸고 'www.' 접두어, 쿼리, 프래그먼트, 끝 슬래시를 제거합니다.
+
+    Args:
+        url (str): 원본 URL
+
+    Returns:
+        str: 정규화된 URL
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(((parsed.scheme or "https").lower(), host, path, "", "", ""))
+
+
+def page_key(url):
+    """
+    같은 페이지인지 비교하는 키 (동시 스크랩 합치기, 배치/큐 중복 제거, 기록 파일 이름)
+
+    normalize_url은 기사 탐색용이라 쿼리를 버리지만, 쿼리로 기사를 구분하는 사이트(view.php?no=1)가 있으므로
+    여기서는 쿼리를 유지하고 스킴/호스트 대소문자, 'www.' 접두어, 끝 슬래시, 프래그먼트만 정리합니다.
+
+    Args:
+        url (str): 원본 URL
+
+    Returns:
+        str: 페이지 키
+    """
+    parsed = urlparse(url.strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/") or "/"
+    return urlunparse(((parsed.scheme or "https").lower(), host, path, parsed.params, parsed.query, ""))
+
+
+def fixture_path_for(url, fixture_dir):
+    """
+    URL에 대응하는 로컬 픽스처 파일 경로를 반환합니다.
+
+    예: https://yozm.wishket.com/sitemap.xml -> yozm.wishket.com_sitemap.xml,
+        https://v2.velog.io/rss/example -> v2.velog.io_rss_example.xml (확장자가 없으면 .xml)
+    """
+    parsed = urlparse(url)
+    name = (parsed.netloc + parsed.path).strip("/").replace("/", "_")
+    if parsed.query:
+        name += "_" + re.sub(r"[^\w.-]", "_", parsed.query)
+    if not os.path.splitext(parsed.path)[1]:
+        name += ".xml"
+    return os.path.join(fixture_dir, name)
+
+
+def fetch_text(url, fixture_dir=None, timeout=10):
+    """
+    브라우저 없이 URL의 본문을 가져옵니다.
+
+    Args:
+        url (str): 가져올 URL
+        fixture_dir (str): 지정되면 네트워크 대신 로컬 픽스처 파일을 읽음
+        timeout (int): HTTP 요청 타임아웃(초)
+
+    Returns:
+        str: 응답 본문 (gzip 압축은 자동 해제)
+    """
+    fixture_dir = fixture_dir or os.environ.get(FIXTURE_DIR_ENV)
+    if fixture_dir:
+        path = fixture_path_for(url, fixture_dir)
+        with open(path, "rb") as f:
+            data = f.read()
+    else:
+        request = urllib.request.Request(url, headers={
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Accept-Encoding": "gzip",
+        })
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+
+    # sitemap.xml.gz 또는 gzip 인코딩 응답 처리
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return data.decode("utf-8", errors="replace")
+
+
+def _local_name(tag):
+    """XML 네임스페이스를 제거한 태그 이름을 반환합니다."""
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_sitemap(xml_text):
+    """
+    sitemap 또는 sitemap index XML을 파싱합니다.
+
+    Returns:
+        tuple: (기사 URL 목록, 하위 sitemap URL 목록)
+    """
+    root = ET.fromstring(xml_text)
+    urls, child_sitemaps = [], []
+    target = child_sitemaps if _local_name(root.tag) == "sitemapindex" else urls
+    for elem in root.iter():
+        if _local_name(elem.tag) == "loc" and elem.text:
+            target.append(elem.text.strip())
+    return urls, child_sitemaps
+
+
+def parse_feed(xml_text):
+    """RSS 2.0 / Atom 피드에서 기사 링크 목록을 추출합니다."""
+    root = ET.fromstring(xml_text)
+    links = []
+    for elem in root.iter():
+        name = _local_name(elem.tag)
+        if name == "item":
+            # RSS: <item><link>URL</link></item>
+            for child in elem:
+                if _local_name(child.tag) == "link" and child.text:
+                    links.append(child.text.strip())
+                    break
+        elif name == "entry":
+            # Atom: <entry><link rel="alternate" href="URL"/></entry>
+            for child in elem:
+                if _local_name(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+                    if child.get("href"):
+                        links.append(child.get("href").strip())
+                        break
+    return links
+
+
+def discover_from_sitemap(sitemap_url, fixture_dir=None, max_sitemaps=50):
+    """
+    sitemap(및 하위 sitemap index)을 따라가며 URL을 수집합니다.
+
+    Args:
+        sitemap_url (str): 시작 sitemap URL
+        fixture_dir (str): 로컬 픽스처 디렉토리
+        max_sitemaps (int): 방문할 최대 sitemap 수 (순환 참조 방지)
+
+    Returns:
+        list: 발견된 URL 목록
+    """
+    found = []
+    pending = [sitemap_url]
+    visited = set()
+    while pending and len(visited) < max_sitemaps:
+        current = pending.pop(0)
+        if current in visited:
+            continue
+        visited.add(current)
+        try:
+            urls, children = parse_sitemap(fetch_text(current, fixture_dir))
+        except Exception as e:
+            logger.warning(f"sitemap 읽기 실패: {current} ({e})")
+            continue
+        found.extend(urls)
+        pending.extend(children)
+    logger.info(f"sitemap에서 {len(found)}개 URL 발견: {sitemap_url}")
+    return found
+
+
+def discover_from_feed(feed_url, fixture_dir=None):
+    """RSS/Atom 피드에서 기사 URL 목록을 수집합니다."""
+    try:
+        links = parse_feed(fetch_text(feed_url, fixture_dir))
+    except Exception as e:
+        logger.warning(f"피드 읽기 실패: {feed_url} ({e})")
+        return []
+    logger.info(f"피드에서 {len(links)}개 URL 발견: {feed_url}")
+    return links
+
+
+def discover_id_range(start, end, template=WISHKET_DETAIL_URL):
+    """숫자 ID 범위(start 이상 end 이하)로 기사 URL을 생성합니다."""
+    return [template.format(id=article_id) for article_id in range(start, end + 1)]
+
+
+def load_archived_urls(metadata_dir="metadata", page_sources_dir="page_sources"):
+    """
+    이미 보관된 기사의 정규화된 URL 집합을 만듭니다.
+
+    metadata JSON의 'url' 필드와, URL을 복원할 수 있는 위시켓 파일명(기사 ID)을 사용합니다.
+
+    Returns:
+        set: 정규화된 URL 집합
+    """
+    archived = set()
+    for path in glob.glob(os.path.join(metadata_dir, "*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                url = json.load(f).get("url")
+            if url:
+                archived.add(normalize_url(url))
+        except Exception as e:
+            logger.warning(f"메타데이터 읽기 실패: {path} ({e})")
+
+    for directory in (metadata_dir, page_sources_dir):
+        for path in glob.glob(os.path.join(directory, "*")):
+            match = ARCHIVED_WISHKET_FILE_RE.match(os.path.basename(path))
+            if match:
+                archived.add(normalize_url(WISHKET_DETAIL_URL.format(id=match.group(1))))
+    return archived
+
+
+def filter_new_urls(urls, archived=None, site_type=None):
+    """
+    보관된 URL과 중복을 제거하고 새 기사 URL만 반환합니다. (입력 순서 유지)
+
+    Args:
+        urls (list): 후보 URL 목록
+        archived (set): 정규화된 보관 URL 집합 (None이면 load_archived_urls() 사용)
+        site_type (str): 지정되면 해당 사이트의 기사 URL 패턴에 맞는 것만 남김
+
+    Returns:
+        list: 새 기사 URL 목록
+    """
+    if archived is None:
+        archived = load_archived_urls()
+    pattern = DISCOVERY_SOURCES.get(site_type, {}).get("article_pattern")
+
+    seen = set(archived)
+    new_urls = []
+    for url in urls:
+        if pattern and not pattern.match(url):
+            continue
+        key = normalize_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        new_urls.append(url)
+    return new_urls
+
+
+def discover_articles(site_type, accounts=None, id_range=None, fixture_dir=None, archived=None):
+    """
+    사이트의 sitemap/피드/ID 범위에서 아직 보관되지 않은 기사 URL을 찾습니다.
+
+    Args:
+        site_type (str): "wishket", "brunch", "velog", "medium"
+        accounts (list): 피드 URL에 넣을 작가/사용자 이름 목록
+        id_range (tuple): (시작 ID, 끝 ID) - ID 기반 URL 템플릿이 있는 사이트만
+        fixture_dir (str): 로컬 픽스처 디렉토리 (테스트용)
+        archived (set): 정규화된 보관 URL 집합
+
+    Returns:
+        list: 스크래퍼로 보낼 새 기사 URL 목록
+    """
+    if site_type not in DISCOVERY_SOURCES:
+        raise ValueError(f"지원하지 않는 사이트 유형입니다: {site_type}")
+    sources = DISCOVERY_SOURCES[site_type]
+
+    candidates = []
+    for sitemap_url in sources["sitemaps"]:
+        candidates.extend(discover_from_sitemap(sitemap_url, fixture_dir))
+    for account in accounts or []:
+        for feed_template in sources["feeds"]:
+            candidates.extend(discover_from_feed(feed_template.format(account=account), fixture_dir))
+    if id_range and sources["id_url_template"]:
+        candidates.extend(discover_id_range(id_range[0], id_range[1], sources["id_url_template"]))
+
+    new_urls = filter_new_urls(candidates, archived, site_type)
+    logger.info(f"{site_type}: 후보 {len(candidates)}개 중 새 기사 {len(new_urls)}개")
+    return new_urls
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="sitemap/RSS/ID 범위에서 새 기사 URL을 찾습니다.")
+    parser.add_argument("site", choices=sorted(DISCOVERY_SOURCES))
+    parser.add_argument("--account", action="append", default=[], help="피드를 읽을 작가/사용자 이름 (여러 번 지정 가능)")
+    parser.add_argument("--id-range", nargs=2, type=int, metavar=("START", "END"), help="ID 범위 (위시켓)")
+    parser.add_argument("--fixture-dir", help="네트워크 대신 사용할 로컬 픽스처 디렉토리")
+    parser.add_argument("--output", help="URL 목록을 저장할 파일 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    new_urls = discover_articles(args.site, args.account, args.id_range, args.fixture_dir)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write("\n".join(new_urls) + ("\n" if new_urls else ""))
+        print(f"{len(new_urls)}개 URL 저장: {args.output}")
+    else:
+        for url in new_urls:
+            print(url)
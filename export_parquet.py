@@ -0,0 +1,279 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from datetime import datetime
+
+logger = logging.getLogger("parquet_export")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:
+    # pyarrow는 분석용 내보내기에만 필요한 선택 의존성
+    pa = None
+    pq = None
+    PYARROW_IMPORT_ERROR = e
+else:
+    PYARROW_IMPORT_ERROR = None
+
+DEFAULT_DATASET_DIR = "dataset"
+DEFAULT_METADATA_DIR = "metadata"
+
+# 한 파일(row group)에 모을 행 수: 너무 작으면 파일이 많아지고, 너무 크면 메모리를 오래 점유
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_COMPRESSION = "zstd"
+
+# 이미 내보낸 메타데이터 파일 목록 (증분 내보내기용)
+MANIFEST_FILE = "_exported.json"
+
+# 단계별 소요 시간(ms) 컬럼
+TIMING_STAGES = ["load", "settle", "save_source", "extract", "total"]
+
+# 메타데이터 파일명에서 수집 날짜를 읽음 (예: article_3005_20250318_113213.json)
+FILENAME_DATE_RE = re.compile(r"_(\d{8})_\d{6}\.json$")
+
+
+def _schema():
+    fields = [
+        ("url", pa.string()),
+        ("site_type", pa.string()),
+        ("title", pa.string()),
+        ("content", pa.string()),
+        ("extraction_method", pa.string()),
+        ("title_length", pa.int32()),
+        ("content_length", pa.int32()),
+        ("page_source_file", pa.string()),
+        ("scraped_at", pa.timestamp("ms")),
+    ]
+    fields.extend((f"{stage}_ms", pa.float64()) for stage in TIMING_STAGES)
+    return pa.schema(fields)
+
+
+def require_pyarrow():
+    """pyarrow가 없으면 설치 안내와 함께 ImportError를 발생시킵니다."""
+    if pa is None:
+        raise ImportError(f"Parquet 내보내기에는 pyarrow가 필요합니다 (pip install pyarrow): {PYARROW_IMPORT_ERROR}")
+
+
+def article_row(url, site_type, title, content, extraction_method, scraped_at=None, timings=None, page_source_file=None):
+    """
+    기사 하나를 데이터셋 행(dict)으로 변환합니다.
+
+    Args:
+        scraped_at (datetime | str): 수집 시각 (ISO 문자열 가능, 없으면 현재 시각)
+        timings (dict): 단계별 소요 시간(ms) {'load': .., 'extract': .., 'total': ..}
+
+    Returns:
+        dict: 스키마 컬럼별 값
+    """
+    if isinstance(scraped_at, str):
+        scraped_at = datetime.fromisoformat(scraped_at)
+    title = title or ""
+    content = content or ""
+    timings = timings or {}
+    row = {
+        "url": url,
+        "site_type": site_type or "unknown",
+        "title": title,
+        "content": content,
+        "extraction_method": extraction_method,
+        "title_length": len(title),
+        "content_length": len(content),
+        "page_source_file": page_source_file,
+        "scraped_at": scraped_at or datetime.now(),
+    }
+    for stage in TIMING_STAGES:
+        row[f"{stage}_ms"] = timings.get(stage)
+    return row
+
+
+def metadata_to_row(metadata, metadata_file=None):
+    """
+    main.py가 저장한 metadata/*.json 내용을 데이터셋 행으로 변환합니다.
+
+    예전 메타데이터에는 url/timestamp/extraction_method가 없을 수 있으므로
+    best_method와 파일명의 날짜로 대신합니다.
+    """
+    scraped_at = metadata.get("timestamp")
+    if not scraped_at and metadata_file:
+        match = FILENAME_DATE_RE.search(os.path.basename(metadata_file))
+        if match:
+            scraped_at = datetime.strptime(match.group(1), "%Y%m%d")
+        else:
+            scraped_at = datetime.fromtimestamp(os.path.getmtime(metadata_file))
+
+    return article_row(
+        url=metadata.get("url"),
+        site_type=metadata.get("site_type", "wishket"),
+        title=metadata.get("title"),
+        content=metadata.get("content"),
+        extraction_method=metadata.get("extraction_method") or metadata.get("best_method"),
+        scraped_at=scraped_at,
+        timings=metadata.get("timings"),
+        page_source_file=metadata.get("page_source_file"),
+    )
+
+
+def _partition_value(value):
+    # 경로에 쓸 수 없는 문자는 밑줄로
+    return re.sub(r"[^0-9A-Za-z_.-]", "_", value)
+
+
+class ParquetDatasetWriter:
+    """
+    사이트/날짜로 파티션된 Parquet 데이터셋에 행을 묶어서 추가하는 작성기
+
+    행은 (site_type, date) 파티션별로 버퍼에 모았다가 batch_size마다 파일 하나(row group 하나)로 씁니다.
+    이미 있는 파일은 수정하지 않고 새 part 파일만 추가하므로, 여러 번 실행해도 이전 결과가 유지됩니다.
+    결과 디렉토리는 site_type=<사이트>/date=<YYYY-MM-DD>/part-*.parquet 구조(Hive 파티션)입니다.
+
+    Args:
+        root (str): 데이터셋 루트 디렉토리
+        batch_size (int): 파일 하나에 쓸 행 수
+        compression (str): Parquet 압축 코덱
+    """
+
+    def __init__(self, root=DEFAULT_DATASET_DIR, batch_size=DEFAULT_BATCH_SIZE, compression=DEFAULT_COMPRESSION):
+        require_pyarrow()
+        self.root = root
+        self.batch_size = batch_size
+        self.compression = compression
+        self.schema = _schema()
+        self.rows_written = 0
+        self.files_written = 0
+        self._buffers = {}  # (site_type, date) -> [행]
+        self._lock = threading.Lock()
+
+    def append(self, row):
+        """행 하나를 추가합니다. (파티션 버퍼가 batch_size에 도달하면 바로 기록)"""
+        partition = (row["site_type"], row["scraped_at"].strftime("%Y-%m-%d"))
+        with self._lock:
+            buffer = self._buffers.setdefault(partition, [])
+            buffer.append(row)
+            if len(buffer) >= self.batch_size:
+                self._write(partition, self._buffers.pop(partition))
+
+    def flush(self):
+        """버퍼에 남은 행을 모두 기록합니다."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, {}
+            for partition, rows in buffers.items():
+                self._write(partition, rows)
+
+    def close(self):
+        self.flush()
+        logger.info(f"Parquet 내보내기 완료: {self.rows_written}행, 파일 {self.files_written}개 ({self.root})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, partition, rows):
+        site_type, date = partition
+        directory = os.path.join(self.root, f"site_type={_partition_value(site_type)}", f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+
+        # 파티션 컬럼은 디렉토리 이름에 있으므로 파일에는 나머지 컬럼만 열 단위로 모아 씀
+        columns = {name: [row[name] for row in rows] for name in self.schema.names if name != "site_type"}
+        table = pa.table(columns, schema=pa.schema([field for field in self.schema if field.name != "site_type"]))
+
+        path = os.path.join(directory, f"part-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}.parquet")
+        tmp_path = f"{path}.tmp"
+        pq.write_table(table, tmp_path, compression=self.compression, row_group_size=len(rows))
+        os.replace(tmp_path, path)
+
+        self.rows_written += len(rows)
+        self.files_written += 1
+        logger.info(f"Parquet 파일 기록: {path} ({len(rows)}행)")
+
+
+def _load_manifest(root):
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return set(json.load(f))
+
+
+def _save_manifest(root, exported):
+    path = os.path.join(root, MANIFEST_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(sorted(exported), f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def mark_exported(root, metadata_files):
+    """
+    다른 경로(main.py 배치 내보내기)로 내보낸 메타데이터 파일을 매니페스트에 추가합니다.
+    (export_metadata_dir가 같은 기사를 다시 내보내지 않도록)
+    """
+    names = {os.path.basename(path) for path in metadata_files if path}
+    if not names:
+        return
+    exported = _load_manifest(root)
+    if not names - exported:
+        return
+    os.makedirs(root, exist_ok=True)
+    _save_manifest(root, exported | names)
+
+
+def export_metadata_dir(metadata_dir=DEFAULT_METADATA_DIR, root=DEFAULT_DATASET_DIR, batch_size=DEFAULT_BATCH_SIZE, full=False):
+    """
+    metadata/*.json 파일을 Parquet 데이터셋으로 내보냅니다.
+
+    이전에 내보낸 파일은 매니페스트에 기록되어 있어 새로 생긴 메타데이터만 추가됩니다.
+
+    Args:
+        metadata_dir (str): 메타데이터 디렉토리
+        root (str): 데이터셋 루트 디렉토리
+        batch_size (int): 파일 하나에 쓸 행 수
+        full (bool): 매니페스트를 무시하고 전체를 다시 내보냄 (기존 데이터셋은 직접 지워야 함)
+
+    Returns:
+        int: 내보낸 행 수
+    """
+    exported = set() if full else _load_manifest(root)
+    pending = [path for path in sorted(glob.glob(os.path.join(metadata_dir, "*.json")))
+               if os.path.basename(path) not in exported]
+    if not pending:
+        logger.info("새로 내보낼 메타데이터가 없습니다")
+        return 0
+
+    count = 0
+    with ParquetDatasetWriter(root, batch_size=batch_size) as writer:
+        # 파일을 하나씩 읽어 바로 버퍼에 넣으므로 메모리에는 batch_size 행만 유지됨
+        for path in pending:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    metadata = json.load(f)
+            except Exception as e:
+                logger.warning(f"메타데이터 읽기 실패: {path} ({e})")
+                continue
+            writer.append(metadata_to_row(metadata, path))
+            exported.add(os.path.basename(path))
+            count += 1
+
+    _save_manifest(root, exported)
+    return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="메타데이터를 사이트/날짜별 Parquet 데이터셋으로 내보내기")
+    parser.add_argument("--metadata-dir", default=DEFAULT_METADATA_DIR, help="메타데이터 디렉토리")
+    parser.add_argument("--output", default=DEFAULT_DATASET_DIR, help="데이터셋 루트 디렉토리")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="파일(row group) 하나에 쓸 행 수")
+    parser.add_argument("--full", action="store_true", help="이전 내보내기 기록을 무시하고 전체 내보내기")
+    args = parser.parse_args()
+
+    rows = export_metadata_dir(args.metadata_dir, args.output, args.batch_size, args.full)
+    print(f"{rows}행 내보냄 -> {args.output}")
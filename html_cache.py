@@ -0,0 +1,146 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from archive_reader import detect_encoding, mapped_file
+
+logger = logging.getLogger("html_cache")
+
+# 파싱된 BeautifulSoup 트리는 원본 HTML보다 훨씬 크므로 원본 크기에 곱해 메모리 사용량을 추정
+SOUP_SIZE_FACTOR = 8
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 32
+
+
+def content_hash(html_bytes):
+    """HTML 바이트(또는 mmap 버퍼)의 내용 해시 (캐시 키)"""
+    return hashlib.sha1(html_bytes).hexdigest()
+
+
+class ParsedDocumentCache:
+    """
+    내용 해시를 키로 파싱된 문서와 분석 결과를 보관하는 LRU 캐시
+
+    extract_content_from_html과 디버그 사이드바가 같은 캐시를 공유하므로, 한 번 파싱한 페이지는
+    Streamlit 재실행(selectbox 변경 등)마다 다시 읽거나 파싱하지 않습니다.
+
+    Args:
+        max_bytes (int): 추정 메모리 사용량 상한 (초과하면 오래된 문서부터 제거)
+        max_entries (int): 보관할 최대 문서 수
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # 해시 -> {'soup', 'size', 'analysis'}
+        self._file_hashes = {}         # 파일 경로 -> (mtime, 크기, 해시)
+        self._lock = threading.RLock()
+
+    def get_soup(self, html_bytes=None, key=None, parser="html.parser", encoding=None):
+        """
+        파싱된 문서를 반환합니다. (캐시에 없으면 파싱 후 보관)
+
+        Args:
+            html_bytes (bytes | mmap): HTML 바이트 버퍼 (key로 캐시에 있으면 생략 가능)
+            key (str): 미리 계산한 내용 해시
+            encoding (str): 버퍼의 인코딩 (None이면 detect_encoding()으로 감지)
+
+        Returns:
+            tuple: (해시, BeautifulSoup 객체) - 반환된 트리는 공유되므로 수정하면 안 됨
+        """
+        key = key or content_hash(html_bytes)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry["soup"]
+
+        if html_bytes is None:
+            raise KeyError(f"캐시에 없는 문서입니다: {key}")
+
+        from bs4 import BeautifulSoup
+        # 인코딩을 미리 알려주면 파서가 여러 인코딩을 시험 삼아 디코딩하지 않음
+        soup = BeautifulSoup(html_bytes, parser, from_encoding=encoding or detect_encoding(html_bytes))
+        size = len(html_bytes) * SOUP_SIZE_FACTOR
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries:
+                self._entries[key] = {"soup": soup, "size": size, "analysis": {}}
+                self.total_bytes += size
+                self._evict()
+            return key, self._entries[key]["soup"]
+
+    def get_file_soup(self, path):
+        """
+        파일 경로로 파싱된 문서를 반환합니다. Returns: (해시, BeautifulSoup 객체)
+
+        파일의 수정 시각과 크기가 같고 이미 캐시된 문서라면 파일을 다시 열지 않습니다.
+        그 외에는 파일을 메모리 매핑하여 bytes로 복사하지 않고 해시와 인코딩 감지를 한 뒤 파서에 넘깁니다.
+        """
+        stat = os.stat(path)
+        with self._lock:
+            known = self._file_hashes.get(path)
+        if known and known[:2] == (stat.st_mtime, stat.st_size):
+            try:
+                return self.get_soup(key=known[2])
+            except KeyError:
+                pass  # 이미 캐시에서 제거됨
+
+        with mapped_file(path) as buffer:
+            key = content_hash(buffer)
+            with self._lock:
+                self._file_hashes[path] = (stat.st_mtime, stat.st_size, key)
+            return self.get_soup(buffer, key=key)
+
+    def get_analysis(self, key, name, compute):
+        """
+        문서별 분석 결과를 메모이즈합니다.
+
+        Args:
+            key (str): 문서 해시
+            name (hashable): 분석 이름 (선택자 등 매개변수 포함)
+            compute (callable): 인자 없이 분석 결과를 계산하는 함수
+
+        Returns:
+            분석 결과
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and name in entry["analysis"]:
+                return entry["analysis"][name]
+
+        result = compute()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["analysis"][name] = result
+        return result
+
+    def _evict(self):
+        while self._entries and (self.total_bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            if len(self._entries) == 1:
+                # 상한보다 큰 문서 하나는 방금 요청된 것이므로 유지
+                break
+            key, entry = self._entries.popitem(last=False)
+            self.total_bytes -= entry["size"]
+            logger.info(f"파싱 캐시에서 제거: {key[:12]} (추정 {entry['size'] // 1024} KB)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "estimated_bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# 모듈은 Streamlit 재실행 사이에도 유지되므로 모든 세션이 이 캐시를 공유
+document_cache = ParsedDocumentCache()
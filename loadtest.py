@@ -0,0 +1,337 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from browser_watchdog import process_tree, process_usage, supported
+from log_setup import setup_logging
+from resilience import classify_failure
+from wait_stats import percentile
+
+logger = logging.getLogger("loadtest")
+
+# 사이트 구조만 흉내 낸 로컬 기사 페이지 (파일명에 사이트 유형이 들어 있어 extract 대상에서 사이트별 선택자가 쓰임)
+FIXTURE_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+TARGETS = ("extract", "scrape", "batch")
+
+# 자원 사용량 샘플링 주기 (초)
+SAMPLE_INTERVAL = 0.5
+
+
+class FixtureServer:
+    """
+    로컬 기사 페이지를 제공하는 HTTP 서버 (scrape/batch 대상용)
+
+    Args:
+        directory (str): 제공할 디렉토리
+        latency (float): 응답마다 추가할 지연 시간 (초, 실제 사이트의 네트워크 지연 흉내)
+    """
+
+    def __init__(self, directory=FIXTURE_PAGES_DIR, latency=0.0):
+        latency_seconds = latency
+
+        class Handler(SimpleHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                if latency_seconds:
+                    time.sleep(latency_seconds)
+                super().do_GET()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=directory))
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="fixture-server", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def fixture_pages(directory=FIXTURE_PAGES_DIR):
+    """부하 테스트에 쓸 HTML 파일 목록"""
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".html"))
+
+
+def make_target(name, pages, base_url=None, batch_size=None, cache_hits=False):
+    """
+    요청 번호를 받아 한 번의 요청을 실행하는 함수를 만듭니다. (실패하면 예외 또는 'error'가 든 결과 반환)
+
+    - extract: 저장된 HTML에서 추출 (extract_content_from_html, 브라우저 없음)
+      cache_hits가 False면 요청마다 내용을 조금씩 바꿔 파싱 캐시를 거치지 않은 새 기사처럼 처리
+    - scrape: 로컬 서버의 페이지를 브라우저로 스크랩 (scrape_article)
+    - batch: 로컬 서버의 페이지 batch_size개를 배치 경로로 스크랩 (main.scrape_wishket_articles)
+    """
+    if name == "extract":
+        from article_scraper import extract_content_from_html
+        sources = []
+        for path in pages:
+            with open(path, "rb") as f:
+                sources.append((path, f.read()))
+
+        def run(index):
+            path, html_bytes = sources[index % len(sources)]
+            if not cache_hits:
+                html_bytes += f"<!-- loadtest {index} -->".encode("ascii")
+            return extract_content_from_html(path, html_bytes)
+        return run
+
+    urls = [f"{base_url}/{os.path.basename(path)}" for path in pages]
+
+    if name == "scrape":
+        from article_scraper import scrape_article
+
+        def run(index):
+            return scrape_article(urls[index % len(urls)])
+        return run
+
+    if name == "batch":
+        from main import scrape_wishket_articles
+        size = batch_size or len(urls)
+
+        def run(index):
+            batch = [urls[(index * size + offset) % len(urls)] for offset in range(size)]
+            results = scrape_wishket_articles(batch, skip_known=False)
+            failed = [url for url, data in results.items() if not data]
+            return {'error': f"{len(failed)}/{len(batch)}개 실패"} if failed else results
+        return run
+
+    raise ValueError(f"알 수 없는 대상: {name} ({', '.join(TARGETS)})")
+
+
+class ResourceSampler:
+    """부하 테스트 중 이 프로세스 트리(브라우저 포함)의 메모리/핸들/프로세스 수와 호스트 부하를 주기적으로 기록"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_processes = 0
+        self.peak_handles = 0
+        self.peak_load = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._times = os.times()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        if supported():
+            tree = process_tree(os.getpid())
+            rss = handles = 0
+            for pid in tree:
+                pid_rss, pid_handles = process_usage(pid)
+                rss += pid_rss
+                handles += pid_handles
+            self.peak_rss = max(self.peak_rss, rss)
+            self.peak_processes = max(self.peak_processes, len(tree))
+            self.peak_handles = max(self.peak_handles, handles)
+        if hasattr(os, "getloadavg"):
+            load = os.getloadavg()[0]
+            self.peak_load = load if self.peak_load is None else max(self.peak_load, load)
+
+    def _run(self):
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        elapsed = time.perf_counter() - self._started
+        end = os.times()
+        cpu_seconds = (end.user - self._times.user) + (end.system - self._times.system)
+        child_cpu_seconds = (end.children_user - self._times.children_user) + (end.children_system - self._times.children_system)
+        return {
+            'cpu_seconds': round(cpu_seconds, 2),
+            'child_cpu_seconds': round(child_cpu_seconds, 2),
+            # 호스트 전체 CPU 대비 이 프로세스가 쓴 비율
+            'cpu_utilization': round(cpu_seconds / (elapsed * (os.cpu_count() or 1)), 3) if elapsed else None,
+            'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1),
+            'peak_processes': self.peak_processes,
+            'peak_handles': self.peak_handles,
+            'peak_load_1m': self.peak_load,
+        }
+
+
+def latency_summary(values):
+    """지연 시간 목록(초)의 p50/p95/p99/최대/평균 (ms)"""
+    if not values:
+        return None
+    return {
+        'p50': round(percentile(values, 50) * 1000, 1),
+        'p95': round(percentile(values, 95) * 1000, 1),
+        'p99': round(percentile(values, 99) * 1000, 1),
+        'max': round(max(values) * 1000, 1),
+        'mean': round(sum(values) / len(values) * 1000, 1),
+    }
+
+
+def run_load(func, requests, concurrency, rate=None, poisson=False):
+    """
+    func를 requests번 실행합니다.
+
+    rate가 없으면 closed loop: 동시 사용자 concurrency명이 응답을 받자마자 다음 요청을 보냄
+    rate가 있으면 open loop: 초당 rate개씩 도착하고 (poisson이면 지수 분포 간격) 워커가 모두 바쁘면 대기열에서 기다림.
+    open loop의 지연 시간은 도착 시각부터 재므로 대기열 대기 시간이 포함됩니다. (coordinated omission 방지)
+
+    Returns:
+        dict: 지연 시간, 처리 시간, 오류, 처리량
+    """
+    latencies = []
+    service_times = []
+    error_kinds = {}
+    lock = threading.Lock()
+
+    def execute(index, arrival):
+        started = time.perf_counter()
+        try:
+            result = func(index)
+            kind = (result.get('failure_kind') or "error") if isinstance(result, dict) and 'error' in result else None
+        except Exception as e:
+            kind = classify_failure(e)
+            logger.debug(f"요청 {index} 실패: {e}")
+        finished = time.perf_counter()
+        with lock:
+            latencies.append(finished - (arrival if arrival is not None else started))
+            service_times.append(finished - started)
+            if kind:
+                error_kinds[kind] = error_kinds.get(kind, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest") as executor:
+        next_arrival = started
+        for index in range(requests):
+            if rate:
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(execute, index, next_arrival)
+                next_arrival += random.expovariate(rate) if poisson else 1.0 / rate
+            else:
+                executor.submit(execute, index, None)
+    elapsed = time.perf_counter() - started
+
+    errors = sum(error_kinds.values())
+    return {
+        'completed': len(latencies),
+        'errors': errors,
+        'error_rate': round(errors / len(latencies), 4) if latencies else None,
+        'error_kinds': error_kinds,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else None,
+        'latency_ms': latency_summary(latencies),
+        'service_time_ms': latency_summary(service_times),
+    }
+
+
+def load_test(target, concurrency_levels, requests, rate=None, poisson=False, latency=0.0, batch_size=None,
+              cache_hits=False, warmup=1, pages_dir=FIXTURE_PAGES_DIR):
+    """
+    동시 실행 수마다 부하 테스트를 실행하고 결과 목록을 반환합니다.
+
+    Args:
+        target (str): extract, scrape, batch
+        concurrency_levels (list): 동시 실행 수 목록 (예: [1, 10, 50])
+        requests (int): 단계마다 보낼 요청 수
+        rate (float): 초당 도착 요청 수 (None이면 closed loop)
+        poisson (bool): 도착 간격을 지수 분포로
+        latency (float): 로컬 서버 응답 지연 (초)
+        batch_size (int): batch 대상의 배치당 URL 수
+        cache_hits (bool): extract 대상에서 같은 내용을 반복해 파싱 캐시를 사용
+        warmup (int): 측정 전에 순차 실행할 요청 수 (모듈 로딩/드라이버 다운로드 등 첫 실행 비용 제외)
+        pages_dir (str): 로컬 기사 페이지 디렉토리
+    """
+    pages = fixture_pages(pages_dir)
+    if not pages:
+        raise FileNotFoundError(f"부하 테스트용 페이지가 없습니다: {pages_dir}")
+
+    server = FixtureServer(pages_dir, latency).start() if target != "extract" else None
+    try:
+        func = make_target(target, pages, server.base_url if server else None, batch_size, cache_hits)
+        for index in range(warmup):
+            try:
+                func(-1 - index)
+            except Exception as e:
+                logger.warning(f"준비 실행 실패: {e}")
+
+        reports = []
+        for concurrency in concurrency_levels:
+            logger.info(f"부하 테스트: {target}, 동시 {concurrency}, 요청 {requests}개" + (f", 초당 {rate}개 도착" if rate else ""))
+            sampler = ResourceSampler().start()
+            report = {
+                'target': target,
+                'concurrency': concurrency,
+                'rate': rate,
+                'arrival': ("poisson" if poisson else "uniform") if rate else "closed",
+                'requests': requests,
+                'started_at': datetime.now().isoformat(),
+            }
+            report.update(run_load(func, requests, concurrency, rate, poisson))
+            report['resources'] = sampler.stop()
+            reports.append(report)
+        return reports
+    finally:
+        if server:
+            server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스크랩 경로 부하 테스트 (로컬 기사 페이지 사용, JSON 보고서 출력)")
+    parser.add_argument("--target", choices=TARGETS, default="extract", help="부하를 줄 경로")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50], help="동시 실행 수 (여러 개면 차례로 실행)")
+    parser.add_argument("--requests", type=int, default=200, help="단계마다 보낼 요청 수")
+    parser.add_argument("--rate", type=float, help="초당 도착 요청 수 (생략하면 closed loop)")
+    parser.add_argument("--poisson", action="store_true", help="도착 간격을 지수 분포로")
+    parser.add_argument("--latency", type=float, default=0.0, help="로컬 서버 응답 지연 (초)")
+    parser.add_argument("--batch-size", type=int, help="batch 대상의 배치당 URL 수 (기본: 페이지 수)")
+    parser.add_argument("--cache-hits", action="store_true", help="extract 대상에서 파싱 캐시 적중 허용")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 순차 실행 수")
+    parser.add_argument("--pages-dir", default=FIXTURE_PAGES_DIR, help="로컬 기사 페이지 디렉토리")
+    parser.add_argument("--workdir", help="스크랩 결과/인덱스/통계 파일을 쓸 디렉토리 (기본: 임시 디렉토리)")
+    parser.add_argument("--output", help="JSON 보고서 파일 (생략하면 표준 출력)")
+    args = parser.parse_args()
+
+    pages_dir = os.path.abspath(args.pages_dir)
+    output = os.path.abspath(args.output) if args.output else None
+    # 부하 테스트가 실제 page_sources/, 검색 인덱스, 대기/선택자 통계를 건드리지 않도록 별도 디렉토리에서 실행
+    workdir = args.workdir or tempfile.mkdtemp(prefix="loadtest_")
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    # 요청마다 나오는 INFO 로그가 측정을 왜곡하지 않도록 WARNING 이상만 기록 (부하 테스트 진행 상황은 INFO)
+    setup_logging("loadtest.log", level=logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    reports = load_test(args.target, args.concurrency, args.requests, args.rate, args.poisson, args.latency,
+                        args.batch_size, args.cache_hits, args.warmup, pages_dir)
+    document = {
+        'host': {'platform': platform.platform(), 'python': platform.python_version(), 'cpu_count': os.cpu_count()},
+        'workdir': workdir,
+        'reports': reports,
+    }
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        logger.info(f"보고서 저장: {output}")
+    else:
+        print(text)
@@ -0,0 +1,199 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 로그 파일 회전 설정
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# 큐가 가득 차면(디스크가 매우 느린 경우) 스크랩 스레드를 막지 않고 기록을 버림
+DEFAULT_QUEUE_SIZE = 10000
+
+# 샘플링 비율 환경 변수 (예: "INFO=0.2,network_replay:DEBUG=0.1")
+SAMPLE_RATES_ENV = "LOG_SAMPLE_RATES"
+
+# LogRecord 기본 속성 (이 외의 속성은 extra로 넘긴 구조화 필드로 보고 JSON에 포함)
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체로 로그를 기록하는 포매터"""
+
+    def format(self, record):
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc_info"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def parse_sample_rates(spec):
+    """
+    "INFO=0.2,network_replay:DEBUG=0.1" 형식의 샘플링 설정을 읽습니다.
+
+    Returns:
+        dict: {(로거 이름 또는 None, 레벨 번호): 비율}
+    """
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" not in item:
+            continue
+        target, rate = item.strip().split("=", 1)
+        logger_name, _, level = target.rpartition(":")
+        level_number = logging.getLevelName(level.strip().upper())
+        if isinstance(level_number, int):
+            rates[(logger_name or None, level_number)] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    레벨(및 로거)별로 자주 나오는 로그를 일정 비율만 남기는 필터
+
+    비율 r이면 같은 (로거, 레벨) 기록 중 1/r개마다 하나를 결정적으로 남기고,
+    남긴 기록에 그 사이 버린 개수(sampled_out)를 붙입니다. WARNING 이상은 항상 남깁니다.
+
+    Args:
+        rates (dict): {(로거 이름 또는 None, 레벨 번호): 0~1 비율} - 로거 이름이 None이면 모든 로거
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+        self._counts = {}
+        self._dropped = {}
+        self._lock = threading.Lock()
+
+    def _rate(self, record):
+        rate = self.rates.get((record.name, record.levelno))
+        if rate is None:
+            rate = self.rates.get((None, record.levelno), 1.0)
+        return rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self._rate(record)
+        if rate >= 1.0:
+            return True
+
+        key = (record.name, record.levelno)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            keep = rate > 0 and int((count + 1) * rate) > int(count * rate)
+            if not keep:
+                self._dropped[key] = self._dropped.get(key, 0) + 1
+                return False
+            dropped = self._dropped.pop(key, 0)
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+class _StructuredQueueHandler(logging.handlers.QueueHandler):
+    """
+    메시지만 미리 만들어 큐에 넣는 QueueHandler
+
+    기본 QueueHandler는 큐에 넣기 전에 예외 내용까지 메시지에 합치므로,
+    JSON 포매터가 예외를 별도 필드로 남길 수 있도록 예외 텍스트만 따로 보관합니다.
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        if record.exc_text and record.exc_text not in text:
+            text = f"{text}\n{record.exc_text}"
+        return text
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(log_file, level=logging.INFO, json_format=True, max_bytes=DEFAULT_MAX_BYTES,
+                  backup_count=DEFAULT_BACKUP_COUNT, sample_rates=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """
+    큐 기반 비동기 로깅을 설정합니다.
+
+    로그 호출 스레드는 기록을 큐에 넣기만 하고, 파일/콘솔 쓰기는 별도 리스너 스레드가 처리하므로
+    동시 스크랩 중에도 핸들러 잠금과 디스크 쓰기가 스크랩 경로를 막지 않습니다.
+    Streamlit처럼 스크립트가 다시 실행되어도 한 번만 설정됩니다.
+
+    Args:
+        log_file (str): 로그 파일 경로 (크기 기준 회전)
+        level (int): 루트 로거 레벨
+        json_format (bool): 파일 로그를 JSON Lines로 기록 (콘솔은 항상 사람이 읽는 형식)
+        max_bytes (int): 회전 기준 크기
+        backup_count (int): 보관할 이전 로그 파일 수
+        sample_rates (dict | str): 레벨별 샘플링 비율 (None이면 LOG_SAMPLE_RATES 환경 변수)
+        queue_size (int): 큐 최대 길이
+
+    Returns:
+        logging.handlers.QueueListener: 리스너 (프로세스 종료 시 자동으로 남은 기록을 씀)
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter() if json_format else _ConsoleFormatter(DEFAULT_FORMAT))
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(_ConsoleFormatter(DEFAULT_FORMAT))
+
+        log_queue = queue.Queue(queue_size)
+        queue_handler = _StructuredQueueHandler(log_queue)
+        if sample_rates is None:
+            sample_rates = os.environ.get(SAMPLE_RATES_ENV)
+        if isinstance(sample_rates, str):
+            sample_rates = parse_sample_rates(sample_rates)
+        # 샘플링은 큐에 넣기 전에 해서 버릴 기록이 큐/리스너 비용을 쓰지 않도록
+        queue_handler.addFilter(SamplingFilter(sample_rates))
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
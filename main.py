@@ -11,23 +11,40 @@ import os
 import logging
 import random
 import json
+import argparse
+import functools
 from datetime import datetime
+from resilience import CircuitOpenError, ScrapeCancelled, check_blocked, check_cancelled, classify_failure, load_with_retry
+from scheduler import DEFAULT_RATE_PER_SECOND, DomainScheduler, domain_key
+from near_duplicates import get_fingerprint_index
+from search_index import get_search_index
+from browser_profiles import PROFILE_MODES, acquire_profile, bind_profile
+from log_setup import setup_logging
+from network_replay import NETWORK_LIVE, NETWORK_MODES, NetworkSession
+from scrape_service import SERVICE_URL_ENV, ServiceBusyError, get_service_client
+from discovery import page_key
+from selector_stats import TITLE, get_selector_stats
+from browser_watchdog import get_driver_watchdog, quit_driver
+from archive_reader import write_page_source
+from wait_stats import document_ready, get_wait_stats_store, wait_for_settle
+from change_detection import CHANGED, MARKUP_ONLY, UNCHANGED, get_content_state_store, read_fingerprint
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+# 로깅 설정 (큐 기반 비동기 기록, 파일은 JSON Lines + 크기 기준 회전)
+setup_logging("scraper.log")
 logger = logging.getLogger("wishket_scraper")
 
-def setup_chrome_options():
+# 메타데이터에 남길 추출 방법별 내용 최대 길이
+METADATA_CONTENT_LIMIT = 500
+
+def setup_chrome_options(profile_dir=None, disk_cache_dir=None, disk_cache_size=None):
     """
     Chrome 브라우저 옵션을 설정하는 함수
     
+    Args:
+        profile_dir (str): 유지할 user-data-dir (None이면 임시 프로필)
+        disk_cache_dir (str): 유지할 디스크 캐시 디렉토리
+        disk_cache_size (int): 디스크 캐시 상한(바이트)
+    
     Returns:
         Options: 설정된 Chrome 옵션 객체
     """
@@ -50,6 +67,14 @@ def setup_chrome_options():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
     
+    # 사이트별 영구 프로필/디스크 캐시 (browser_profiles.py, 공통 CSS/JS 재사용)
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if disk_cache_dir:
+        chrome_options.add_argument(f"--disk-cache-dir={disk_cache_dir}")
+    if disk_cache_size:
+        chrome_options.add_argument(f"--disk-cache-size={disk_cache_size}")
+    
     return chrome_options
 
 def save_page_source(driver, url, output_dir="page_sources"):
@@ -80,9 +105,8 @@ def save_page_source(driver, url, output_dir="page_sources"):
     # 파일명 생성
     filename = f"{output_dir}/article_{article_id}_{timestamp}.html"
     
-    # HTML 소스 저장
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(driver.page_source)
+    # HTML 소스 저장 (브라우저에서 조각 단위로 받아 기록)
+    write_page_source(driver, filename)
     
     logger.info(f"HTML 소스가 {filename}에 저장되었습니다.")
     return filename
@@ -120,6 +144,12 @@ def clean_content(content):
     
     return content.strip()
 
+# 제목 선택자 -> 메타데이터의 title_method 값
+TITLE_METHODS = {
+    "h1.article-title": "h1.article-title",
+    "h1": "h1 태그",
+}
+
 def extract_article_content(driver):
     """
     여러 방법으로 기사 내용을 추출하는 함수
@@ -133,25 +163,32 @@ def extract_article_content(driver):
     result = {}
     extraction_methods = {}
     
-    # 제목 추출
-    try:
-        title = driver.find_element(By.CSS_SELECTOR, "h1.article-title").text
-        result['title_method'] = "h1.article-title"
-    except Exception as e:
-        logger.warning(f"h1.article-title로 제목 추출 실패: {e}")
-        try:
-            title = driver.find_element(By.TAG_NAME, "h1").text
-            result['title_method'] = "h1 태그"
-        except Exception as e:
-            logger.error(f"h1 태그로 제목 추출 실패: {e}")
-            title = "제목을 찾을 수 없습니다"
-            result['title_method'] = "찾을 수 없음"
+    # 제목 추출 (지금까지 더 자주 맞은 선택자를 먼저 시도, 없으면 빈 목록이므로 예외 처리 비용이 없음)
+    selector_stats = get_selector_stats()
+    title = "제목을 찾을 수 없습니다"
+    result['title_method'] = "찾을 수 없음"
+    for selector in selector_stats.order("wishket", TITLE, list(TITLE_METHODS)):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        if elements:
+            title = elements[0].text
+            result['title_method'] = TITLE_METHODS[selector]
+            break
+    else:
+        selector = None
+        logger.error("h1.article-title, h1 태그로 제목 추출 실패")
+    selector_stats.record("wishket", TITLE, selector)
     
     result['title'] = title
     
+    # 본문 컨테이너는 한 번만 찾고 방법 1~3이 함께 사용
+    containers = driver.find_elements(By.CSS_SELECTOR, "div.article-body-container")
+    article_container = containers[0] if containers else None
+    missing_container = "div.article-body-container를 찾을 수 없습니다"
+    
     # 방법 1: 원본 코드 방식 - p 태그 추출
     try:
-        article_container = driver.find_element(By.CSS_SELECTOR, "div.article-body-container")
+        if article_container is None:
+            raise LookupError(missing_container)
         paragraphs = article_container.find_elements(By.TAG_NAME, "p")
         p_content = "\n\n".join([p.text for p in paragraphs if p.text])
         extraction_methods['p_tags'] = {
@@ -165,7 +202,8 @@ def extract_article_content(driver):
     
     # 방법 2: 강화된 방식 - 여러 태그 혼합
     try:
-        article_container = driver.find_element(By.CSS_SELECTOR, "div.article-body-container")
+        if article_container is None:
+            raise LookupError(missing_container)
         
         # 내용 요소 수집
         content_elements = []
@@ -204,7 +242,8 @@ def extract_article_content(driver):
     
     # 방법 3: 컨테이너 텍스트 전체
     try:
-        article_container = driver.find_element(By.CSS_SELECTOR, "div.article-body-container")
+        if article_container is None:
+            raise LookupError(missing_container)
         container_text = article_container.text
         extraction_methods['container_text'] = {
             'content': container_text,
@@ -251,100 +290,242 @@ def extract_article_content(driver):
     
     return result
 
-def scrape_wishket_article(url):
+def scrape_wishket_article(url, skip_duplicates=False, detect_changes=False, profile_mode=None, network_mode=None):
     """
     Selenium을 이용하여 Wishket 사이트의 기사 내용을 스크랩핑하는 함수
 
     Args:
         url (str): 스크랩핑할 기사의 URL
+        skip_duplicates (bool): 이미 보관된 글의 유사 중복이면 HTML/메타데이터를 보관하지 않음
+        profile_mode (str): 브라우저 프로필 모드 (off/cache/profile, None이면 CHROME_PROFILE_MODE 환경 변수)
+        network_mode (str): live, record(응답을 recordings/에 HAR로 기록), replay(기록만으로 오프라인 실행)
+        detect_changes (bool): 이전 스크랩과 본문이 같으면 보관/추출 없이 바로 반환 (변경은 change_log.jsonl에 기록)
 
     Returns:
         dict: 제목, 내용을 포함한 딕셔너리
     """
     logger.info(f"스크랩 시작: {url}")
-    
-    # Chrome 옵션 설정
-    chrome_options = setup_chrome_options()
-    
-    try:
-        # Chrome WebDriver 설정
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
+    started = time.perf_counter()
+    timings = {}
+    
+    # 네트워크 기록/재생 설정
+    network = NetworkSession(url, network_mode)
+    
+    # 최근 로드 시간으로 정한 대기 예산 (python wait_stats.py로 확인)
+    wait_stats = get_wait_stats_store()
+    budget = wait_stats.budget("wishket")
+    # 대기 시간은 실제 접속(live)일 때만 기록 (재생 모드의 짧은 로드 시간이 예산을 줄이지 않도록)
+    record_waits = network.mode == NETWORK_LIVE
+    
+    # 브라우저 프로세스 트리의 메모리/페이지 수 감시 (한도를 넘으면 재시도 전에 새 드라이버로 교체)
+    watchdog = get_driver_watchdog()
+    
+    def create_driver():
+        # 사이트별 영구 프로필 슬롯 (모두 사용 중이거나 모드가 off이면 임시 프로필)
+        slot = acquire_profile(domain_key(url), profile_mode)
+        # Chrome 옵션 설정 (재시도마다 새로 만들어 네트워크 설정이 중복되지 않도록)
+        options = network.configure(setup_chrome_options(**slot.chrome_kwargs()) if slot else setup_chrome_options())
         
-        # Selenium Stealth 적용 (봇 감지 회피)
-        stealth(
-            driver,
-            languages=["ko-KR", "ko", "en-US", "en"],
-            vendor="Google Inc.",
-            platform="Win32",
-            webgl_vendor="Intel Inc.",
-            renderer="Intel Iris OpenGL Engine",
-            fix_hairline=True
-        )
+        # Chrome WebDriver 설정
+        try:
+            service = Service(ChromeDriverManager().install())
+            # 프로세스 감시를 먼저 걸어 quit() 시 남은 프로세스 정리가 끝난 뒤 프로필 슬롯이 풀리도록
+            new_driver = bind_profile(watchdog.watch(webdriver.Chrome(service=service, options=options)), slot)
+        except Exception:
+            if slot:
+                slot.release()
+            raise
         
-        # 자동화 스크립트 감지 방지
-        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        try:
+            new_driver.set_page_load_timeout(30)
+            
+            # Selenium Stealth 적용 (봇 감지 회피)
+            stealth(
+                new_driver,
+                languages=["ko-KR", "ko", "en-US", "en"],
+                vendor="Google Inc.",
+                platform="Win32",
+                webgl_vendor="Intel Inc.",
+                renderer="Intel Iris OpenGL Engine",
+                fix_hairline=True
+            )
+            
+            # 자동화 스크립트 감지 방지
+            new_driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        except Exception:
+            # 설정 중 실패해도 방금 띄운 브라우저가 남지 않도록
+            quit_driver(new_driver)
+            raise
+        return new_driver
+    
+    def load_page(driver):
+        # async_scraper에서 취소된 스크랩이면 페이지를 열지 않음
+        check_cancelled()
         
         # 웹 페이지 로드
+        load_started = time.perf_counter()
+        watchdog.note_page(driver)
         driver.get(url)
         
         # 페이지가 완전히 로드될 때까지 대기
         try:
-            WebDriverWait(driver, 15).until(
+            WebDriverWait(driver, budget.timeout, poll_frequency=budget.poll_frequency).until(
                 EC.presence_of_element_located((By.TAG_NAME, "article"))
             )
+            if record_waits:
+                wait_stats.record("wishket", time.perf_counter() - load_started)
             logger.info("기사 컨텐츠 로드 완료")
         except Exception as e:
+            # 차단 페이지면 재시도 없이 실패
+            check_blocked(driver)
+            # 페이지는 다 받았는데 article만 없으면 느린 것이 아니므로 대기 시간으로 기록하지 않음
+            elapsed = None if document_ready(driver) else time.perf_counter() - load_started
+            if record_waits:
+                wait_stats.record("wishket", elapsed, timed_out=True)
             logger.warning(f"기사 콘텐츠 로드 대기 시간 초과: {e}")
+    
+    driver = None
+    try:
+        # 재생 모드면 기록된 응답만 돌려주는 로컬 프록시 시작
+        network.start()
+        
+        # 드라이버 충돌/시간 초과는 백오프 후 재시도, 차단 중인 도메인은 바로 실패
+        driver = load_with_retry(create_driver, load_page, domain_key(url), should_recycle=watchdog.needs_recycle)
+        stage_started = _record_stage(timings, 'load', started)
+        
+        # 추가 대기 (JavaScript가 모두 로드되도록) - 본문 길이가 더 이상 바뀌지 않으면 바로 진행
+        settle_seconds, _ = wait_for_settle(driver, "article", budget)
+        if record_waits:
+            wait_stats.record("wishket", settle_seconds=settle_seconds)
+        stage_started = _record_stage(timings, 'settle', stage_started)
         
-        # 추가 대기 (JavaScript가 모두 로드되도록)
-        time.sleep(3)
+        # 기록 모드면 지금까지 받은 응답을 HAR로 저장
+        network.record(driver)
+        
+        # 변경 감지: 컨테이너/정리된 본문 해시가 그대로면 페이지 로드 비용만 들이고 종료
+        change_status = None
+        if detect_changes:
+            state_store = get_content_state_store()
+            fingerprint = read_fingerprint(driver, clean_content)
+            change_status = state_store.classify(url, fingerprint)
+            if change_status in (UNCHANGED, MARKUP_ONLY):
+                driver.quit()
+                state_store.record(url, fingerprint, change_status)
+                previous = state_store.get(url)
+                logger.info(f"본문 변경 없음 ({change_status}), 보관 생략: {url}")
+                return {
+                    'title': previous.get('title'),
+                    'content': None,
+                    'extraction_method': None,
+                    'page_source_file': previous.get('page_source_file'),
+                    'unchanged': True,
+                    'change_status': change_status,
+                    'timings': timings
+                }
         
         # 페이지 소스 저장
         page_source_file = save_page_source(driver, url)
+        stage_started = _record_stage(timings, 'save_source', stage_started)
         
         # 콘텐츠 추출
         article_data = extract_article_content(driver)
+        _record_stage(timings, 'extract', stage_started)
+        timings['total'] = round((time.perf_counter() - started) * 1000, 1)
         
         # 추출 데이터에 URL 및 소스 파일 정보 추가
         article_data['url'] = url
+        article_data['site_type'] = "wishket"
         article_data['page_source_file'] = page_source_file
         article_data['timestamp'] = datetime.now().isoformat()
+        article_data['timings'] = timings
         
         # 웹드라이버 종료
         driver.quit()
         
+        # 유사 중복 검사 (다른 URL로 이미 보관된 같은 글인지)
+        if article_data['extraction_method'] != "실패":
+            duplicates = get_fingerprint_index().check_and_add(url, article_data['content'], article_data['title'])
+            if duplicates:
+                article_data['near_duplicate_of'] = duplicates[0][0]
+                if skip_duplicates:
+                    logger.info(f"유사 중복 기사이므로 보관하지 않음: {url} ≈ {duplicates[0][0]}")
+                    os.remove(page_source_file)
+                    return {
+                        'title': article_data['title'],
+                        'content': article_data['content'],
+                        'extraction_method': article_data['extraction_method'],
+                        'page_source_file': None,
+                        'near_duplicate_of': duplicates[0][0],
+                        'timestamp': article_data['timestamp'],
+                        'timings': timings
+                    }
+        
         # 메타데이터 저장
         metadata_file = f"metadata/{os.path.basename(page_source_file).replace('.html', '.json')}"
         os.makedirs("metadata", exist_ok=True)
         
         with open(metadata_file, 'w', encoding='utf-8') as f:
             # 콘텐츠 크기 제한 (JSON 파일 크기 관리)
-            metadata = article_data.copy()
-            for method, data in metadata['extraction_methods'].items():
-                if 'content' in data and len(data['content']) > 500:
-                    data['content'] = data['content'][:500] + '...(생략)'
+            # 얕은 복사로는 중첩된 extraction_methods가 공유되므로 방법별 dict를 새로 만듦
+            metadata = {key: value for key, value in article_data.items() if key != 'extraction_methods'}
+            metadata['extraction_methods'] = {}
+            for method, data in article_data['extraction_methods'].items():
+                data = dict(data)
+                if 'content' in data and len(data['content']) > METADATA_CONTENT_LIMIT:
+                    data['content'] = data['content'][:METADATA_CONTENT_LIMIT] + '...(생략)'
+                metadata['extraction_methods'][method] = data
             
             json.dump(metadata, f, ensure_ascii=False, indent=2)
         
+        # 선택되지 않은 추출 결과는 더 이상 필요 없으므로 바로 해제
+        article_data['extraction_methods'] = None
+        
+        if detect_changes:
+            state_store.record(url, fingerprint, change_status or CHANGED, content=article_data['content'],
+                               page_source_file=page_source_file, metadata_file=metadata_file)
+        
+        # 전문 검색 인덱스 갱신
+        if article_data['extraction_method'] != "실패":
+            try:
+                get_search_index().add_document(page_source_file, article_data['title'], article_data['content'], url=url, site_type="wishket")
+            except Exception as e:
+                logger.warning(f"검색 인덱스 갱신 실패: {e}")
+        
         logger.info(f"스크랩 완료: {url}")
         return {
             'title': article_data['title'],
             'content': article_data['content'],
             'extraction_method': article_data['extraction_method'],
-            'page_source_file': page_source_file
+            'page_source_file': page_source_file,
+            'metadata_file': metadata_file,
+            'near_duplicate_of': article_data.get('near_duplicate_of'),
+            'timestamp': article_data['timestamp'],
+            'timings': timings,
+            'change_status': change_status
         }
     
     except Exception as e:
-        logger.error(f"스크랩 과정에서 오류 발생: {e}", exc_info=True)
-        if 'driver' in locals():
+        logger.error(f"스크랩 과정에서 오류 발생 ({classify_failure(e)}): {e}", exc_info=not isinstance(e, (CircuitOpenError, ScrapeCancelled)))
+        driver = driver or getattr(e, 'driver', None)
+        if driver is not None:
             try:
                 # 오류 발생 시에도 페이지 소스 저장 시도
                 save_page_source(driver, url, "error_pages")
-                driver.quit()
             except:
                 pass
+            finally:
+                # 소스 저장에 실패해도 브라우저 프로세스가 남지 않도록
+                quit_driver(driver)
         return None
+    
+    finally:
+        network.stop()
+
+def _record_stage(timings, stage, stage_started):
+    """단계 소요 시간(ms)을 기록하고 다음 단계 시작 시각을 반환합니다."""
+    now = time.perf_counter()
+    timings[stage] = round((now - stage_started) * 1000, 1)
+    return now
 
 def save_to_file(data, filename="wishket_article.txt"):
     """
@@ -365,13 +546,217 @@ def save_to_file(data, filename="wishket_article.txt"):
     else:
         logger.warning("저장할 데이터가 없습니다.")
 
+def scrape_wishket_articles(urls, workers=1, rate=None, domain_concurrency=1, skip_known=True, export_dir=None, detect_changes=False,
+                            profile_mode=None, network_mode=None):
+    """
+    여러 기사 URL을 스크랩핑하는 배치 함수
+
+    Args:
+        urls (list): 스크랩핑할 기사 URL 목록
+        workers (int): 동시에 실행할 브라우저 수 (1이면 순차 실행)
+        rate (float): 도메인당 초당 요청 수 (None이면 scheduler 기본값)
+        domain_concurrency (int): 도메인당 동시 실행 수
+        skip_known (bool): 지문 인덱스에 있는 URL은 건너뛰고, 유사 중복 글은 보관하지 않음
+        export_dir (str): 지정하면 성공한 기사를 이 Parquet 데이터셋에 추가 (export_parquet.py)
+        detect_changes (bool): 알려진 URL을 다시 스크랩하되 본문이 바뀐 기사만 보관 (skip_known 무시)
+        profile_mode (str): 브라우저 프로필 모드 (off/cache/profile)
+        network_mode (str): 네트워크 모드 (live/record/replay)
+
+    Returns:
+        dict: URL별 스크랩 결과 (실패한 URL은 None)
+    """
+    options = {'profile_mode': profile_mode, 'network_mode': network_mode}
+    scrape_func = functools.partial(scrape_wishket_article, **options)
+    if detect_changes:
+        # 변경 감지 이전에 보관된 기사도 처음부터 비교할 수 있도록
+        get_content_state_store().seed_from_metadata()
+        scrape_func = functools.partial(scrape_wishket_article, detect_changes=True, **options)
+    elif skip_known:
+        index = get_fingerprint_index()
+        known = [url for url in urls if index.contains_url(url)]
+        if known:
+            logger.info(f"이미 알려진 내용의 URL {len(known)}개 건너뜀")
+        urls = [url for url in urls if not index.contains_url(url)]
+        scrape_func = functools.partial(scrape_wishket_article, skip_duplicates=True, **options)
+    
+    # 같은 페이지를 가리키는 URL(끝 슬래시/프래그먼트만 다른 경우 등)은 한 번만 스크랩하고 결과를 공유
+    # (쿼리로 기사를 구분하는 사이트가 있으므로 쿼리는 비교에 포함)
+    requested = urls
+    unique = {}
+    for url in requested:
+        unique.setdefault(page_key(url), url)
+    urls = list(unique.values())
+    if len(urls) < len(requested):
+        logger.info(f"같은 기사를 가리키는 URL {len(requested) - len(urls)}개를 합쳐서 스크랩")
+    
+    if workers > 1:
+        # 병렬 실행 시 도메인별 속도/동시 실행 제한을 지키며 도메인을 번갈아 처리
+        scheduler = DomainScheduler(
+            max_workers=workers,
+            rate=rate or DEFAULT_RATE_PER_SECOND,
+            max_concurrency=domain_concurrency
+        )
+        results = scheduler.run(urls, scrape_func)
+    else:
+        results = {}
+        for i, url in enumerate(urls, 1):
+            logger.info(f"배치 스크랩 진행 중 ({i}/{len(urls)}): {url}")
+            results[url] = scrape_func(url)
+    
+    succeeded = sum(1 for data in results.values() if data and 'error' not in data)
+    if detect_changes:
+        unchanged = sum(1 for data in results.values() if data and data.get('unchanged'))
+        logger.info(f"변경 감지: 변경 없음 {unchanged}개 / 다시 보관 {succeeded - unchanged}개")
+    
+    if export_dir:
+        export_results(results, export_dir)
+    
+    logger.info(f"배치 스크랩 완료: 성공 {succeeded}개 / 전체 {len(urls)}개")
+    # 합쳐진 URL도 요청한 URL로 결과를 찾을 수 있도록 (내보내기 뒤에 추가해 같은 기사가 두 번 내보내지지 않게)
+    for url in requested:
+        if url not in results:
+            results[url] = results.get(unique[page_key(url)])
+    return results
+
+def export_results(results, export_dir):
+    """
+    배치 스크랩 결과를 사이트/날짜별 Parquet 데이터셋에 추가하는 함수
+
+    Args:
+        results (dict): scrape_wishket_articles()의 URL별 결과
+        export_dir (str): 데이터셋 루트 디렉토리
+    """
+    from export_parquet import ParquetDatasetWriter, article_row, mark_exported
+    
+    exported = []
+    with ParquetDatasetWriter(export_dir) as writer:
+        for url, data in results.items():
+            if not data or 'error' in data or data.get('unchanged') or data['extraction_method'] == "실패":
+                continue
+            writer.append(article_row(
+                url, "wishket", data['title'], data['content'], data['extraction_method'],
+                scraped_at=data.get('timestamp'), timings=data.get('timings'),
+                page_source_file=data.get('page_source_file')
+            ))
+            exported.append(data.get('metadata_file'))
+    # export_parquet.py를 같은 데이터셋에 실행해도 이 기사들을 다시 내보내지 않도록
+    mark_exported(export_dir, exported)
+
+def scrape_via_service(urls, client, **options):
+    """
+    스크랩 서비스에 URL을 모두 제출하고 결과를 모으는 함수 (브라우저는 서비스의 워커 풀에서 실행)
+
+    Args:
+        urls (list): 스크랩할 URL 목록
+        client (ScrapeServiceClient): 서비스 클라이언트
+        options: profile_mode, network_mode
+
+    Returns:
+        dict: URL별 결과 (실패한 URL은 {'error': ..})
+    """
+    options = {key: value for key, value in options.items() if value}
+    jobs = {}
+    pending = list(urls)
+    results = {}
+    
+    # 대기열이 가득 차면 Retry-After만큼 기다리며 나머지를 제출
+    while pending:
+        url = pending[0]
+        try:
+            jobs[url] = client.submit(url, **options)['job_id']
+            pending.pop(0)
+        except ServiceBusyError as e:
+            logger.info(f"스크랩 서비스 대기열이 가득 참, {e.retry_after}초 후 재시도 (남은 URL {len(pending)}개)")
+            time.sleep(e.retry_after)
+        except Exception as e:
+            logger.error(f"작업 제출 실패: {url} ({e})")
+            results[url] = {'error': str(e)}
+            pending.pop(0)
+    
+    for url, job_id in jobs.items():
+        results[url] = client.wait(job_id)
+    return results
+
+def read_url_file(path):
+    """
+    URL 목록 파일을 읽는 함수 (한 줄에 하나, 빈 줄과 #으로 시작하는 줄은 무시)
+
+    Args:
+        path (str): URL 목록 파일 경로
+
+    Returns:
+        list: URL 목록
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wishket 기사 스크래퍼")
+    parser.add_argument("urls", nargs="*", help="스크랩핑할 기사 URL")
+    parser.add_argument("--url-file", help="URL 목록 파일 (discovery.py 출력 등)")
+    parser.add_argument("--discover", action="store_true", help="sitemap에서 아직 보관되지 않은 기사를 찾아 스크랩")
+    parser.add_argument("--fixture-dir", help="탐색 시 네트워크 대신 사용할 로컬 픽스처 디렉토리")
+    parser.add_argument("--workers", type=int, default=1, help="동시에 실행할 브라우저 수")
+    parser.add_argument("--rate", type=float, help="도메인당 초당 요청 수")
+    parser.add_argument("--domain-concurrency", type=int, default=1, help="도메인당 동시 실행 수")
+    parser.add_argument("--parquet-dir", help="배치 결과를 추가할 Parquet 데이터셋 디렉토리")
+    parser.add_argument("--chrome-profile", choices=PROFILE_MODES,
+                        help="사이트별 브라우저 캐시/프로필 유지 (기본: CHROME_PROFILE_MODE 환경 변수 또는 off)")
+    parser.add_argument("--network", choices=NETWORK_MODES,
+                        help="record: 응답을 recordings/에 HAR로 기록, replay: 기록만으로 오프라인 실행 (기본: NETWORK_MODE 환경 변수 또는 live)")
+    parser.add_argument("--service", help=f"스크랩 서비스 주소 (기본: {SERVICE_URL_ENV} 환경 변수, 없으면 직접 실행)")
+    parser.add_argument("--refresh", action="store_true", help="알려진 URL을 다시 확인하고 본문이 바뀐 기사만 보관")
+    args = parser.parse_args()
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate는 0보다 커야 합니다")
+    if args.workers < 1 or args.domain_concurrency < 1:
+        parser.error("--workers와 --domain-concurrency는 1 이상이어야 합니다")
+    
+    if args.parquet_dir:
+        # 배치를 다 스크랩한 뒤에야 pyarrow가 없다는 것을 알게 되지 않도록 미리 확인
+        from export_parquet import require_pyarrow
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            parser.error(str(e))
+    
+    urls = list(args.urls)
+    if args.url_file:
+        urls.extend(read_url_file(args.url_file))
+    if args.discover:
+        from discovery import discover_articles
+        urls.extend(discover_articles("wishket", fixture_dir=args.fixture_dir))
+    if not urls and (args.url_file or args.discover):
+        # 탐색/URL 파일에서 아무것도 나오지 않으면 기본 기사를 대신 스크랩하지 않음
+        print("새로 스크랩할 URL이 없습니다.")
+        raise SystemExit(0)
+    
+    client = get_service_client(args.service)
+    if client is not None and urls:
+        # 서비스 모드: 이 프로세스는 작업만 제출하고 결과를 출력
+        results = scrape_via_service(urls, client, profile_mode=args.chrome_profile, network_mode=args.network)
+        for url, data in results.items():
+            print(f"{url}: {data['title'] if data and 'error' not in data else '실패 - ' + str((data or {}).get('error'))}")
+        raise SystemExit(0)
+    
+    if len(urls) > 1 or (urls and args.refresh):
+        # 배치 모드: 이미 보관된 기사는 탐색 단계에서 제외됨
+        results = scrape_wishket_articles(urls, args.workers, args.rate, args.domain_concurrency,
+                                          export_dir=args.parquet_dir, detect_changes=args.refresh,
+                                          profile_mode=args.chrome_profile, network_mode=args.network)
+        for url, data in results.items():
+            status = data['title'] if data and 'error' not in data else "실패"
+            if data and data.get('change_status'):
+                status = f"{status} ({data['change_status']})"
+            print(f"{url}: {status}")
+        raise SystemExit(0)
+    
     # 타겟 URL
-    url = "https://yozm.wishket.com/magazine/detail/3005/"
+    url = urls[0] if urls else "https://yozm.wishket.com/magazine/detail/3005/"
     
     try:
         # 스크랩핑 실행
-        article_data = scrape_wishket_article(url)
+        article_data = scrape_wishket_article(url, profile_mode=args.chrome_profile, network_mode=args.network)
         
         # 결과 출력
         if article_data:
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from discovery import normalize_url
+
+logger = logging.getLogger("near_duplicates")
+
+DEFAULT_INDEX_FILE = "fingerprint_index.json"
+
+FINGERPRINT_BITS = 64
+# 64비트를 16비트 4개 밴드로 나눔: 해밍 거리 3 이하인 두 지문은 최소 한 밴드가 정확히 일치 (비둘기집 원리)
+LSH_BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // LSH_BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# 이 거리 이하면 같은 글로 판단
+DEFAULT_MAX_DISTANCE = 3
+
+# 한국어는 띄어쓰기가 일정하지 않으므로 단어 대신 문자 n-gram을 특징으로 사용
+SHINGLE_SIZE = 4
+
+# 이보다 짧은 본문은 지문이 서로 쉽게 겹치므로(빈 본문은 0) 검사/등록하지 않음
+MIN_CONTENT_CHARS = 100
+
+# 등록마다 전체 파일을 다시 쓰지 않고 로그에 한 줄씩 추가, 로그가 인덱스 크기(최소 이 값)만큼 쌓이면 스냅샷으로 합침
+COMPACT_MIN_ENTRIES = 500
+
+
+def _shingles(text):
+    normalized = "".join(text.split()).lower()
+    if len(normalized) <= SHINGLE_SIZE:
+        return [normalized] if normalized else []
+    return [normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)]
+
+
+def simhash(text):
+    """
+    clean_content()로 정리된 본문의 64비트 SimHash 지문을 계산합니다.
+
+    Args:
+        text (str): 정리된 본문
+
+    Returns:
+        int: 64비트 지문 (본문이 비어 있으면 0)
+    """
+    weights = [0] * FINGERPRINT_BITS
+    counts = {}
+    for shingle in _shingles(text):
+        counts[shingle] = counts.get(shingle, 0) + 1
+
+    for shingle, count in counts.items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if value >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    """두 지문의 해밍 거리"""
+    return bin(a ^ b).count("1")
+
+
+def _bands(fingerprint):
+    return [(band, fingerprint >> (band * BAND_BITS) & BAND_MASK) for band in range(LSH_BANDS)]
+
+
+class FingerprintIndex:
+    """
+    보관된 기사 본문의 SimHash 지문 인덱스
+
+    밴드별 버킷(LSH)으로 후보만 비교하므로 조회 비용이 전체 기사 수에 선형으로 늘지 않습니다.
+
+    인덱스 파일(스냅샷)과 추가 로그(<path>.log, JSON Lines)로 저장됩니다. 등록은 로그에 한 줄만 추가하므로
+    배치가 길어져도 등록 비용이 인덱스 크기에 비례하지 않고, 로그가 충분히 쌓이면 스냅샷으로 합칩니다.
+
+    Args:
+        path (str): 인덱스 파일 경로
+        max_distance (int): 중복으로 판단할 최대 해밍 거리 (LSH_BANDS - 1 이하여야 누락이 없음)
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = path
+        self.log_path = f"{path}.log"
+        self.max_distance = max_distance
+        self.entries = {}   # 정규화 URL -> {'url', 'fingerprint', 'title'}
+        self.buckets = {}   # (밴드, 값) -> [정규화 URL]
+        self._lock = threading.Lock()
+        # 스냅샷 저장과 로그 추가가 겹치지 않도록 (스냅샷 뒤 로그를 지울 때 새 줄이 사라지지 않게)
+        self._file_lock = threading.Lock()
+        self._log_lines = 0
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for key, entry in data.get("entries", {}).items():
+                    entry["fingerprint"] = int(entry["fingerprint"], 16)
+                    self._insert(key, entry)
+            except Exception as e:
+                logger.warning(f"지문 인덱스 읽기 실패: {self.path} ({e})")
+
+        # 스냅샷 이후 등록분 재적용 (중간에 죽어 마지막 줄이 깨졌으면 그 줄만 버림)
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        key = record.pop("key")
+                        record["fingerprint"] = int(record["fingerprint"], 16)
+                    except (ValueError, KeyError):
+                        logger.warning(f"지문 인덱스 로그의 깨진 줄 무시: {self.log_path}")
+                        continue
+                    self._insert(key, record)
+                    self._log_lines += 1
+        if self.entries:
+            logger.info(f"지문 인덱스 로드: {len(self.entries)}개")
+
+    def save(self):
+        """전체 인덱스를 스냅샷으로 저장하고 추가 로그를 비웁니다."""
+        with self._file_lock:
+            with self._lock:
+                entries = {
+                    key: dict(entry, fingerprint=f"{entry['fingerprint']:016x}")
+                    for key, entry in self.entries.items()
+                }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            # 스냅샷에 모두 들어갔으므로 로그 삭제 (삭제 전에 죽어도 로그 재적용은 같은 결과)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._log_lines = 0
+
+    def _append(self, key, entry):
+        with self._file_lock:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(dict(entry, key=key, fingerprint=f"{entry['fingerprint']:016x}"), ensure_ascii=False) + "\n")
+            self._log_lines += 1
+            compact = self._log_lines >= max(COMPACT_MIN_ENTRIES, len(self.entries))
+        if compact:
+            self.save()
+
+    def _insert(self, key, entry):
+        # 같은 URL의 지문이 바뀌었으면 이전 지문의 밴드 버킷에서 빼서 옛 본문과 비교되지 않도록
+        previous = self.entries.get(key)
+        if previous is not None and previous["fingerprint"] != entry["fingerprint"]:
+            for band in _bands(previous["fingerprint"]):
+                bucket = self.buckets.get(band)
+                if bucket and key in bucket:
+                    bucket.remove(key)
+                    if not bucket:
+                        del self.buckets[band]
+        self.entries[key] = entry
+        for band in _bands(entry["fingerprint"]):
+            bucket = self.buckets.setdefault(band, [])
+            if key not in bucket:
+                bucket.append(key)
+
+    def contains_url(self, url):
+        """이미 지문이 등록된 URL인지 여부"""
+        return normalize_url(url) in self.entries
+
+    def find_near_duplicates(self, fingerprint, exclude_url=None):
+        """
+        지문과 가까운 기존 기사를 찾습니다.
+
+        Returns:
+            list: [(원본 URL, 해밍 거리)] 거리순
+        """
+        exclude = normalize_url(exclude_url) if exclude_url else None
+        candidates = set()
+        with self._lock:
+            for band in _bands(fingerprint):
+                candidates.update(self.buckets.get(band, []))
+            matches = []
+            for key in candidates:
+                if key == exclude:
+                    continue
+                distance = hamming_distance(fingerprint, self.entries[key]["fingerprint"])
+                if distance <= self.max_distance:
+                    matches.append((self.entries[key]["url"], distance))
+        return sorted(matches, key=lambda match: match[1])
+
+    def check_and_add(self, url, content, title=None, save=True):
+        """
+        수집 시점에 본문을 검사하고 인덱스에 등록합니다.
+
+        Args:
+            url (str): 기사 URL
+            content (str): clean_content()로 정리된 본문 (MIN_CONTENT_CHARS보다 짧으면 검사/등록하지 않음)
+            title (str): 기사 제목
+            save (bool): 등록을 파일(추가 로그)에 기록할지 (False면 메모리에만, 나중에 save() 호출)
+
+        Returns:
+            list: 가까운 기존 기사 [(URL, 해밍 거리)] - 비어 있으면 새 글
+        """
+        if not content or len(content.strip()) < MIN_CONTENT_CHARS:
+            logger.info(f"본문이 너무 짧아 유사 중복 검사를 건너뜀: {url} ({len((content or '').strip())}자)")
+            return []
+        fingerprint = simhash(content)
+        duplicates = self.find_near_duplicates(fingerprint, exclude_url=url)
+        if duplicates:
+            logger.info(f"유사 중복 기사 감지: {url} ≈ {duplicates[0][0]} (거리 {duplicates[0][1]})")
+        key = normalize_url(url)
+        entry = {"url": url, "fingerprint": fingerprint, "title": title}
+        with self._lock:
+            self._insert(key, entry)
+        if save:
+            self._append(key, entry)
+        return duplicates
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_fingerprint_index(path=DEFAULT_INDEX_FILE):
+    """프로세스에서 공유하는 지문 인덱스를 반환합니다."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None or _default_index.path != path:
+            _default_index = FingerprintIndex(path)
+        return _default_index
@@ -0,0 +1,432 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import ssl
+import subprocess
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from discovery import page_key
+
+logger = logging.getLogger("network_replay")
+
+DEFAULT_ARCHIVE_DIR = "recordings"
+
+# 네트워크 모드
+NETWORK_LIVE = "live"      # 기존 동작
+NETWORK_RECORD = "record"  # 실제 사이트에서 받은 응답을 HAR로 기록
+NETWORK_REPLAY = "replay"  # 기록된 HAR만으로 응답 (네트워크 사용 안 함)
+NETWORK_MODES = [NETWORK_LIVE, NETWORK_RECORD, NETWORK_REPLAY]
+
+# 재생 프록시가 HTTPS를 가로챌 때 쓰는 자체 서명 인증서 (브라우저는 --ignore-certificate-errors로 허용)
+REPLAY_CERT_FILE = os.path.join(".cache", "replay_cert.pem")
+REPLAY_KEY_FILE = os.path.join(".cache", "replay_key.pem")
+
+# 재생 응답에서 제거할 헤더 (본문은 이미 디코딩되어 저장되므로 길이/인코딩은 다시 계산)
+HOP_BY_HOP_HEADERS = {
+    "content-encoding", "content-length", "transfer-encoding", "connection",
+    "keep-alive", "proxy-connection", "alt-svc", "strict-transport-security",
+}
+
+
+def archive_path(url, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    URL별 HAR 파일 경로 (discovery.page_key 기준이므로 www./끝 슬래시/프래그먼트 차이는 같은 파일)
+
+    쿼리로 기사를 구분하는 사이트(view.php?no=1)의 기록이 서로 덮어쓰지 않도록 쿼리는 키에 포함합니다.
+    쿼리가 없는 URL은 예전과 같은 파일이므로 기존 기록을 그대로 재생할 수 있습니다.
+    """
+    key = page_key(url)
+    host = urlparse(key).hostname or "unknown"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(archive_dir, host, f"{digest}.har")
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class NetworkRecorder:
+    """
+    페이지를 불러오는 동안 브라우저가 받은 모든 응답을 HAR 파일로 기록합니다.
+
+    Chrome 성능 로그(CDP Network 이벤트)로 요청/응답을 모으고, 본문은 Network.getResponseBody로 가져옵니다.
+    리다이렉트 응답도 함께 기록하므로 재생할 때 같은 경로를 그대로 따라갑니다.
+
+    Args:
+        archive_dir (str): HAR 파일을 저장할 디렉토리
+    """
+
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+
+    def configure(self, chrome_options):
+        """드라이버 생성 전에 성능 로그를 켭니다."""
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return chrome_options
+
+    def save(self, driver, url):
+        """
+        지금까지의 네트워크 응답을 HAR로 저장합니다. (페이지 로드/대기가 끝난 뒤, driver.quit() 전에 호출)
+
+        Returns:
+            str: HAR 파일 경로 (기록할 응답이 없으면 None)
+        """
+        entries = self._collect(driver)
+        if not entries:
+            logger.warning(f"기록할 네트워크 응답이 없습니다: {url}")
+            return None
+
+        har = {
+            "log": {
+                "version": "1.2",
+                "creator": {"name": "article_scraper", "version": "1"},
+                "pages": [{"id": "page_1", "title": url, "startedDateTime": entries[0]["startedDateTime"], "pageTimings": {}}],
+                "entries": entries,
+            }
+        }
+        path = archive_path(url, self.archive_dir)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(har, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"네트워크 기록 저장: {path} (응답 {len(entries)}개)")
+        return path
+
+    def _collect(self, driver):
+        requests = {}
+        entries = []
+
+        def add_entry(request, response, timestamp, body=None, base64_encoded=False):
+            headers = response.get("headers", {})
+            mime_type = response.get("mimeType", "")
+            content = {"size": len(body or ""), "mimeType": mime_type}
+            if body is not None:
+                content["text"] = body
+                if base64_encoded:
+                    content["encoding"] = "base64"
+            started = request.get("wallTime") or time.time()
+            entries.append({
+                "pageref": "page_1",
+                "startedDateTime": _iso(started),
+                "time": max(0.0, (timestamp - request.get("timestamp", timestamp)) * 1000),
+                "request": {
+                    "method": request.get("method", "GET"),
+                    "url": request["url"],
+                    "httpVersion": response.get("protocol", "http/1.1"),
+                    "headers": [{"name": k, "value": v} for k, v in request.get("headers", {}).items()],
+                    "queryString": [],
+                    "cookies": [],
+                    "headersSize": -1,
+                    "bodySize": len(request.get("postData", "")),
+                },
+                "response": {
+                    "status": response.get("status", 200),
+                    "statusText": response.get("statusText", ""),
+                    "httpVersion": response.get("protocol", "http/1.1"),
+                    "headers": [{"name": k, "value": v} for k, v in headers.items()],
+                    "cookies": [],
+                    "content": content,
+                    "redirectURL": headers.get("location") or headers.get("Location") or "",
+                    "headersSize": -1,
+                    "bodySize": content["size"],
+                },
+                "cache": {},
+                "timings": {"send": 0, "wait": 0, "receive": 0},
+            })
+
+        responses = []
+        for log_entry in driver.get_log("performance"):
+            message = json.loads(log_entry["message"])["message"]
+            method = message.get("method")
+            params = message.get("params", {})
+
+            if method == "Network.requestWillBeSent":
+                request_id = params["requestId"]
+                previous = requests.get(request_id)
+                if previous and params.get("redirectResponse"):
+                    # 같은 requestId로 이어지는 리다이렉트: 이전 요청의 응답을 기록
+                    add_entry(previous, params["redirectResponse"], params.get("timestamp", 0))
+                request = dict(params.get("request", {}))
+                request["timestamp"] = params.get("timestamp", 0)
+                request["wallTime"] = params.get("wallTime")
+                requests[request_id] = request
+            elif method == "Network.responseReceived":
+                responses.append((params["requestId"], params.get("response", {}), params.get("timestamp", 0)))
+
+        for request_id, response, timestamp in responses:
+            request = requests.get(request_id)
+            if not request or not request.get("url", "").startswith("http"):
+                continue
+            try:
+                body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception:
+                # 캐시에서 제거되었거나 본문이 없는 응답(204 등)
+                body = {"body": None, "base64Encoded": False}
+            add_entry(request, response, timestamp, body.get("body"), body.get("base64Encoded", False))
+
+        return entries
+
+
+def load_har_responses(paths):
+    """
+    HAR 파일들에서 (메서드, URL) -> 응답 목록을 만듭니다.
+
+    Returns:
+        dict: {(method, url): deque([{'status', 'headers', 'body'}])}
+    """
+    responses = defaultdict(deque)
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            har = json.load(f)
+        for entry in har["log"]["entries"]:
+            content = entry["response"].get("content", {})
+            text = content.get("text")
+            if text is None:
+                body = b""
+            elif content.get("encoding") == "base64":
+                body = base64.b64decode(text)
+            else:
+                body = text.encode("utf-8")
+            headers = [(h["name"], h["value"]) for h in entry["response"]["headers"]
+                       if h["name"].lower() not in HOP_BY_HOP_HEADERS and not h["name"].startswith(":")]
+            key = (entry["request"]["method"].upper(), entry["request"]["url"])
+            responses[key].append({
+                "status": entry["response"]["status"],
+                "headers": headers,
+                "body": body,
+                "time": entry.get("time", 0),
+            })
+    return responses
+
+
+def ensure_replay_certificate(cert_file=REPLAY_CERT_FILE, key_file=REPLAY_KEY_FILE):
+    """HTTPS 재생용 자체 서명 인증서를 만듭니다. (openssl 명령 사용, 이미 있으면 재사용)"""
+    if os.path.exists(cert_file) and os.path.exists(key_file):
+        return cert_file, key_file
+    os.makedirs(os.path.dirname(cert_file) or ".", exist_ok=True)
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "3650",
+         "-subj", "/CN=article-scraper-replay", "-keyout", key_file, "-out", cert_file],
+        check=True, capture_output=True
+    )
+    logger.info(f"재생용 인증서 생성: {cert_file}")
+    return cert_file, key_file
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_CONNECT(self):
+        # HTTPS 터널: 연결을 받은 뒤 자체 인증서로 TLS를 풀어 같은 핸들러로 요청을 처리
+        host = self.path.split(":")[0]
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        try:
+            tls_socket = self.server.ssl_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            logger.debug(f"TLS 연결 실패: {host} ({e})")
+            self.close_connection = True
+            return
+        self.connection = tls_socket
+        self.rfile = tls_socket.makefile("rb", buffering=0)
+        self.wfile = tls_socket.makefile("wb", buffering=0)
+        self.tunnel_host = f"https://{self.path}"
+        while True:
+            self.raw_requestline = self.rfile.readline(65537)
+            if not self.raw_requestline or not self.parse_request():
+                break
+            self._serve()
+            if self.close_connection:
+                break
+        self.close_connection = True
+
+    def do_GET(self):
+        self._serve()
+
+    do_POST = do_HEAD = do_OPTIONS = do_PUT = do_DELETE = do_PATCH = do_GET
+
+    def _request_url(self):
+        if self.path.startswith("http"):
+            return self.path
+        tunnel = getattr(self, "tunnel_host", None)
+        if tunnel:
+            origin = tunnel[:-4] if tunnel.endswith(":443") else tunnel
+            return origin + self.path
+        return f"http://{self.headers.get('Host', '')}{self.path}"
+
+    def _serve(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        url = self._request_url()
+        response = self.server.next_response(self.command, url)
+        if response is None:
+            logger.info(f"기록에 없는 요청: {self.command} {url}")
+            self.server.misses.append(url)
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.server.latency_scale and response["time"]:
+            time.sleep(response["time"] / 1000 * self.server.latency_scale)
+
+        body = b"" if self.command == "HEAD" else response["body"]
+        self.send_response(response["status"])
+        for name, value in response["headers"]:
+            for line in str(value).split("\n"):
+                self.send_header(name, line)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    기록된 HAR 응답만 돌려주는 로컬 HTTP/HTTPS 프록시
+
+    같은 URL이 여러 번 기록되었으면 기록 순서대로 돌려주고, 마지막 응답은 이후 요청에도 반복합니다.
+    기록에 없는 요청은 실제 네트워크로 보내지 않고 404로 응답하므로 실행 결과가 항상 같습니다.
+
+    Args:
+        har_paths (list): 재생할 HAR 파일 목록
+        latency_scale (float): 기록된 응답 시간을 곱해 지연 (0이면 즉시 응답)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, har_paths, latency_scale=0.0):
+        super().__init__(("127.0.0.1", 0), _ReplayHandler)
+        self.responses = load_har_responses(har_paths)
+        self.latency_scale = latency_scale
+        self.misses = []
+        self._lock = threading.Lock()
+        cert_file, key_file = ensure_replay_certificate()
+        self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.ssl_context.load_cert_chain(cert_file, key_file)
+        self._thread = None
+
+    @property
+    def proxy_address(self):
+        return f"127.0.0.1:{self.server_address[1]}"
+
+    def next_response(self, method, url):
+        with self._lock:
+            queue = self.responses.get((method.upper(), url))
+            if not queue:
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def configure(self, chrome_options):
+        """모든 요청이 이 프록시를 거치도록 Chrome 옵션을 설정합니다."""
+        chrome_options.add_argument(f"--proxy-server=http://{self.proxy_address}")
+        chrome_options.add_argument("--proxy-bypass-list=<-loopback>")
+        chrome_options.add_argument("--ignore-certificate-errors")
+        # QUIC은 프록시를 거치지 않으므로 끔
+        chrome_options.add_argument("--disable-quic")
+        return chrome_options
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="replay-proxy", daemon=True)
+        self._thread.start()
+        logger.info(f"네트워크 재생 프록시 시작: {self.proxy_address} (응답 {sum(len(q) for q in self.responses.values())}개)")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.misses:
+            logger.info(f"기록에 없어 404로 응답한 요청 {len(self.misses)}개")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def start_replay(url, archive_dir=DEFAULT_ARCHIVE_DIR, latency_scale=0.0):
+    """
+    URL의 기록으로 재생 프록시를 시작합니다.
+
+    Raises:
+        FileNotFoundError: 해당 URL의 기록이 없는 경우
+    """
+    path = archive_path(url, archive_dir)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"네트워크 기록이 없습니다: {path} (먼저 record 모드로 실행하세요)")
+    return ReplayServer([path], latency_scale).start()
+
+
+def resolve_network_mode(mode=None):
+    """모드 인자 또는 NETWORK_MODE 환경 변수에서 네트워크 모드를 결정합니다."""
+    mode = (mode or os.environ.get("NETWORK_MODE") or NETWORK_LIVE).lower()
+    if mode not in NETWORK_MODES:
+        logger.warning(f"알 수 없는 네트워크 모드: {mode} (live로 실행)")
+        return NETWORK_LIVE
+    return mode
+
+
+class NetworkSession:
+    """
+    스크랩 한 번의 네트워크 모드(live/record/replay) 처리
+
+    사용 순서: start() -> 드라이버 생성 전 configure(options) -> 페이지 로드 후 record(driver) -> stop()
+
+    Args:
+        url (str): 스크랩할 URL
+        mode (str): 네트워크 모드 (None이면 NETWORK_MODE 환경 변수)
+        archive_dir (str): HAR 저장/재생 디렉토리
+        latency_scale (float): 재생 시 기록된 응답 시간 반영 비율
+    """
+
+    def __init__(self, url, mode=None, archive_dir=DEFAULT_ARCHIVE_DIR, latency_scale=0.0):
+        self.url = url
+        self.mode = resolve_network_mode(mode)
+        self.archive_dir = archive_dir
+        self.latency_scale = latency_scale
+        self.recorder = None
+        self.server = None
+
+    def start(self):
+        if self.mode == NETWORK_RECORD:
+            self.recorder = NetworkRecorder(self.archive_dir)
+        elif self.mode == NETWORK_REPLAY:
+            self.server = start_replay(self.url, self.archive_dir, self.latency_scale)
+        return self
+
+    def configure(self, chrome_options):
+        if self.recorder:
+            self.recorder.configure(chrome_options)
+        if self.server:
+            self.server.configure(chrome_options)
+        return chrome_options
+
+    def record(self, driver):
+        """record 모드면 지금까지의 응답을 HAR로 저장하고 경로를 반환합니다."""
+        if not self.recorder:
+            return None
+        try:
+            return self.recorder.save(driver, self.url)
+        except Exception as e:
+            # 기록 실패가 스크랩 자체를 실패시키지 않도록
+            logger.warning(f"네트워크 기록 실패: {e}")
+            return None
+
+    def stop(self):
+        if self.server:
+            self.server.stop()
+            self.server = None
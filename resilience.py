@@ -0,0 +1,332 @@
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger("scrape_resilience")
+
+# 실패 유형
+DRIVER_CRASH = "driver_crash"    # 브라우저/드라이버 세션이 죽음 -> 새 드라이버로 재시도
+TIMEOUT = "timeout"              # 페이지 로드 시간 초과 -> 같은 드라이버로 재시도
+SELECTOR_MISS = "selector_miss"  # 페이지는 열렸지만 선택자를 찾지 못함 -> 재시도하지 않음
+HTTP_BLOCK = "http_block"        # 차단/캡차/요청 제한 페이지 -> 재시도하지 않고 서킷 브레이커에 기록
+CANCELLED = "cancelled"          # 호출한 쪽이 취소함 (async_scraper) -> 재시도하지 않음
+UNKNOWN = "unknown"
+
+# 예외 메시지로 드라이버 충돌을 판별하는 문구 (selenium 예외 클래스를 import하지 않기 위해 문자열로 비교)
+DRIVER_CRASH_MARKERS = [
+    "chrome not reachable",
+    "invalid session id",
+    "session deleted",
+    "disconnected",
+    "tab crashed",
+    "page crash",
+    "no such window",
+    "chrome failed to start",
+    "devtoolsactiveport",
+]
+
+TIMEOUT_MARKERS = [
+    "timed out",
+    "timeout",
+    "err_timed_out",
+    "err_connection",
+]
+
+# 차단 페이지 제목에 자주 나오는 문구
+BLOCK_TITLE_MARKERS = [
+    "access denied",
+    "attention required",
+    "just a moment",
+    "too many requests",
+    "403 forbidden",
+    "captcha",
+    "접근이 차단",
+]
+
+
+class ScrapeFailure(Exception):
+    """
+    유형이 분류된 스크랩 실패
+
+    Args:
+        kind (str): 실패 유형 (DRIVER_CRASH, TIMEOUT, SELECTOR_MISS, HTTP_BLOCK, UNKNOWN)
+        message (str): 오류 메시지
+    """
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+        # 재시도를 포기했을 때 아직 살아있는 드라이버 (오류 페이지 저장용)
+        self.driver = None
+
+
+class CircuitOpenError(ScrapeFailure):
+    """도메인의 서킷 브레이커가 열려 있어 요청하지 않고 바로 실패함"""
+
+    def __init__(self, key, retry_after):
+        super().__init__(HTTP_BLOCK, f"{key} 요청이 일시 중단되었습니다 ({retry_after:.0f}초 후 재시도 가능)")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class ScrapeCancelled(ScrapeFailure):
+    """호출한 쪽이 스크랩을 취소함 (시간 초과 포함)"""
+
+    def __init__(self, message="스크랩이 취소되었습니다"):
+        super().__init__(CANCELLED, message)
+
+
+# 스크랩을 실행 중인 스레드별 취소 이벤트 (async_scraper가 실행기 스레드에 설정)
+_cancel_state = threading.local()
+
+
+def set_cancel_event(event):
+    """현재 스레드의 취소 이벤트를 설정합니다. (None이면 해제)"""
+    _cancel_state.event = event
+
+
+def check_cancelled():
+    """현재 스레드의 스크랩이 취소되었으면 ScrapeCancelled를 발생시킵니다."""
+    event = getattr(_cancel_state, "event", None)
+    if event is not None and event.is_set():
+        raise ScrapeCancelled()
+
+
+def _sleep(seconds):
+    # 취소 이벤트가 있으면 백오프 대기 중에도 바로 깨어남
+    event = getattr(_cancel_state, "event", None)
+    if event is None:
+        time.sleep(seconds)
+    elif event.wait(seconds):
+        raise ScrapeCancelled()
+
+
+def classify_failure(exc):
+    """
+    예외를 실패 유형으로 분류합니다.
+
+    Args:
+        exc (Exception): 발생한 예외
+
+    Returns:
+        str: 실패 유형
+    """
+    if isinstance(exc, ScrapeFailure):
+        return exc.kind
+
+    name = type(exc).__name__
+    message = str(exc).lower()
+
+    if name == "NoSuchElementException":
+        return SELECTOR_MISS
+    if any(marker in message for marker in DRIVER_CRASH_MARKERS):
+        return DRIVER_CRASH
+    if name == "TimeoutException" or any(marker in message for marker in TIMEOUT_MARKERS):
+        return TIMEOUT
+    if getattr(exc, "code", None) in (403, 429, 503):
+        return HTTP_BLOCK
+    if name in ("WebDriverException", "SessionNotCreatedException", "InvalidSessionIdException"):
+        return DRIVER_CRASH
+    return UNKNOWN
+
+
+def check_blocked(driver):
+    """
+    현재 페이지가 차단/캡차 페이지인지 확인하고, 그렇다면 HTTP_BLOCK 실패를 발생시킵니다.
+    """
+    title = (driver.title or "").lower()
+    for marker in BLOCK_TITLE_MARKERS:
+        if marker in title:
+            raise ScrapeFailure(HTTP_BLOCK, f"차단 페이지 감지: {driver.title}")
+
+
+class RetryPolicy:
+    """
+    지터가 적용된 지수 백오프 재시도 정책
+
+    Args:
+        max_attempts (int): 최대 시도 횟수 (첫 시도 포함)
+        base_delay (float): 첫 재시도 기본 대기 시간(초)
+        max_delay (float): 최대 대기 시간(초)
+        retry_on (tuple): 재시도할 실패 유형
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=30.0, retry_on=(DRIVER_CRASH, TIMEOUT, UNKNOWN)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def should_retry(self, kind, attempt):
+        """attempt(0부터 시작)번째 시도가 kind 유형으로 실패했을 때 재시도할지 여부"""
+        return kind in self.retry_on and attempt + 1 < self.max_attempts
+
+    def delay(self, attempt):
+        """attempt번째 실패 후 대기 시간 (full jitter: 0 ~ min(max_delay, base * 2^attempt))"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    도메인별 서킷 브레이커
+
+    연속 실패가 failure_threshold에 도달하면 reset_timeout 동안 요청을 바로 거부(open)하고,
+    그 뒤 한 번의 시험 요청(half-open)이 성공하면 다시 닫힙니다.
+
+    Args:
+        failure_threshold (int): 서킷을 여는 연속 실패 횟수
+        reset_timeout (float): 열린 상태 유지 시간(초)
+        counted_kinds (tuple): 실패로 집계할 유형 (사이트 측 문제로 보이는 것만)
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=120.0, counted_kinds=(HTTP_BLOCK, TIMEOUT)):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.counted_kinds = counted_kinds
+        self.failures = 0
+        self.opened_at = None
+        # half-open에서 시험 요청을 내보냈고 아직 결과가 없음
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def retry_after(self):
+        """요청이 다시 허용되기까지 남은 시간(초)"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """요청을 보내도 되는지 여부 (half-open 상태에서는 시험 요청 하나만 허용)"""
+        with self._lock:
+            state = self.state
+            if state == "half_open":
+                # 시험 요청이 끝날 때까지 다른 요청은 다시 막음
+                self.opened_at = time.monotonic()
+                self._trial = True
+                return True
+            return state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self, kind):
+        with self._lock:
+            trial, self._trial = self._trial, False
+            if kind not in self.counted_kinds:
+                if trial:
+                    # 시험 요청이 사이트와 무관한 이유(드라이버 충돌 등)로 끝났으면 판단할 수 없으므로
+                    # reset_timeout을 다시 기다리지 않고 바로 다음 요청을 시험 요청으로 보냄 (half-open 유지)
+                    self.opened_at = time.monotonic() - self.reset_timeout
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"서킷 브레이커 열림: 연속 실패 {self.failures}회, {self.reset_timeout:.0f}초 동안 요청 중단")
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(key):
+    """도메인 키별 서킷 브레이커를 반환합니다. (프로세스 안에서 공유)"""
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker()
+        return _breakers[key]
+
+
+def load_with_retry(create_driver, load_page, key, policy=None, breaker=None, should_recycle=None):
+    """
+    드라이버를 만들고 페이지를 로드하는 과정을 분류된 실패에 따라 재시도합니다.
+
+    - DRIVER_CRASH: 기존 드라이버를 종료하고 새 드라이버로 재시도
+    - TIMEOUT/UNKNOWN: 같은 드라이버를 재사용하여 재시도
+    - HTTP_BLOCK/SELECTOR_MISS: 재시도하지 않음
+    - 서킷이 열려 있으면 브라우저를 띄우지 않고 CircuitOpenError 발생
+    - 현재 스레드의 스크랩이 취소되면(set_cancel_event) 다음 시도/백오프 대기 없이 ScrapeCancelled 발생
+
+    Args:
+        create_driver (callable): 새 WebDriver를 반환하는 함수
+        load_page (callable): driver를 받아 페이지를 로드하는 함수 (실패 시 예외)
+        key (str): 서킷 브레이커 도메인 키
+        policy (RetryPolicy): 재시도 정책
+        breaker (CircuitBreaker): 서킷 브레이커 (기본: get_circuit_breaker(key))
+        should_recycle (callable): driver를 받아 교체 사유(없으면 None)를 반환하는 함수 -
+            재시도 전에 사유가 있으면 기존 드라이버를 종료하고 새로 만듦 (browser_watchdog)
+
+    Returns:
+        WebDriver: 페이지 로드에 성공한 드라이버
+
+    Raises:
+        ScrapeFailure: 재시도를 포기한 경우 (e.driver에 살아있는 드라이버가 있을 수 있음)
+    """
+    policy = policy or RetryPolicy()
+    breaker = breaker or get_circuit_breaker(key)
+    driver = None
+
+    for attempt in range(policy.max_attempts):
+        try:
+            check_cancelled()
+        except ScrapeCancelled as e:
+            e.driver = driver
+            raise
+
+        if not breaker.allow():
+            if driver is not None:
+                driver.quit()
+            raise CircuitOpenError(key, breaker.retry_after())
+
+        if driver is not None and should_recycle is not None:
+            reason = should_recycle(driver)
+            if reason:
+                logger.info(f"드라이버 교체 ({reason})")
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+
+        try:
+            if driver is None:
+                driver = create_driver()
+            load_page(driver)
+            breaker.record_success()
+            return driver
+        except Exception as e:
+            kind = classify_failure(e)
+            breaker.record_failure(kind)
+            logger.warning(f"페이지 로드 실패 ({attempt + 1}/{policy.max_attempts}, {kind}): {e}")
+
+            if kind == DRIVER_CRASH and driver is not None:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+
+            if not policy.should_retry(kind, attempt):
+                failure = e if isinstance(e, ScrapeFailure) else ScrapeFailure(kind, str(e))
+                failure.driver = driver
+                raise failure from e
+
+            delay = policy.delay(attempt)
+            logger.info(f"{delay:.1f}초 후 재시도합니다")
+            try:
+                _sleep(delay)
+            except ScrapeCancelled as cancelled:
+                cancelled.driver = driver
+                raise cancelled from e
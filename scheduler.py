@@ -0,0 +1,179 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+logger = logging.getLogger("domain_scheduler")
+
+# 도메인별 기본 예절(politeness) 설정
+DEFAULT_RATE_PER_SECOND = 0.5   # 도메인당 초당 요청 수 (2초에 1회)
+DEFAULT_BURST = 1               # 버킷 크기 (연속으로 허용되는 요청 수)
+DEFAULT_DOMAIN_CONCURRENCY = 1  # 도메인당 동시 실행 수
+
+
+def domain_key(url):
+    """URL의 호스트 이름을 도메인 키로 사용합니다. ('www.' 접두어 제거)"""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class TokenBucket:
+    """
+    도메인별 요청 속도를 제한하는 토큰 버킷
+
+    Args:
+        rate (float): 초당 채워지는 토큰 수
+        burst (int): 버킷에 쌓일 수 있는 최대 토큰 수
+    """
+
+    def __init__(self, rate, burst):
+        if not rate > 0:
+            # 0이면 토큰이 다시 채워지지 않아 대기 시간이 무한대가 됨
+            raise ValueError(f"초당 요청 수는 0보다 커야 합니다: {rate}")
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now=None):
+        """토큰 하나를 얻기까지 기다려야 하는 시간(초)을 반환합니다. (0이면 즉시 가능)"""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now=None):
+        """토큰 하나를 사용합니다. wait_time()이 0일 때만 호출해야 합니다."""
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= 1
+
+
+class DomainScheduler:
+    """
+    도메인별 토큰 버킷과 동시 실행 제한을 지키면서 여러 도메인의 URL을 번갈아 실행하는 스케줄러
+
+    하나의 공유 워커 풀을 사용하므로, 느린 도메인은 자기 동시 실행 한도만 차지하고
+    나머지 워커는 다른 도메인의 URL을 계속 처리합니다.
+
+    Args:
+        max_workers (int): 전체 워커 수
+        key_func (callable): URL -> 도메인 키 (기본: 호스트 이름, detect_site_type 등으로 교체 가능)
+        rate (float): 도메인당 기본 초당 요청 수
+        burst (int): 도메인당 기본 버킷 크기
+        max_concurrency (int): 도메인당 기본 동시 실행 수
+        domain_limits (dict): 도메인별 설정 덮어쓰기 {키: {'rate': .., 'burst': .., 'concurrency': ..}}
+    """
+
+    def __init__(self, max_workers=4, key_func=domain_key, rate=DEFAULT_RATE_PER_SECOND,
+                 burst=DEFAULT_BURST, max_concurrency=DEFAULT_DOMAIN_CONCURRENCY, domain_limits=None):
+        if max_workers < 1:
+            raise ValueError(f"워커 수는 1 이상이어야 합니다: {max_workers}")
+        self.max_workers = max_workers
+        self.key_func = key_func
+        self.default_limits = {"rate": rate, "burst": burst, "concurrency": max_concurrency}
+        self.domain_limits = domain_limits or {}
+        # 잘못된 속도/동시 실행 수는 URL을 처리하기 시작한 뒤가 아니라 만들 때 알림
+        # (동시 실행 수가 0이면 그 도메인의 URL이 영원히 실행되지 않아 run()이 끝나지 않음)
+        for key, limits in [(None, self.default_limits)] + list(self.domain_limits.items()):
+            where = f" ({key})" if key else ""
+            if "rate" in limits and not limits["rate"] > 0:
+                raise ValueError(f"초당 요청 수는 0보다 커야 합니다: {limits['rate']}{where}")
+            if "concurrency" in limits and limits["concurrency"] < 1:
+                raise ValueError(f"도메인당 동시 실행 수는 1 이상이어야 합니다: {limits['concurrency']}{where}")
+        self._buckets = {}
+        self._in_flight = {}
+        self._condition = threading.Condition()
+
+    def _limits(self, key):
+        limits = dict(self.default_limits)
+        limits.update(self.domain_limits.get(key, {}))
+        return limits
+
+    def _bucket(self, key):
+        if key not in self._buckets:
+            limits = self._limits(key)
+            self._buckets[key] = TokenBucket(limits["rate"], limits["burst"])
+        return self._buckets[key]
+
+    def _on_done(self, key):
+        with self._condition:
+            self._in_flight[key] -= 1
+            self._condition.notify_all()
+
+    def run(self, urls, func):
+        """
+        URL 목록을 도메인 예절을 지키며 실행합니다.
+
+        Args:
+            urls (list): 처리할 URL 목록
+            func (callable): URL 하나를 처리하는 함수 (예: scrape_wishket_article)
+
+        Returns:
+            dict: URL별 결과 (예외가 발생한 URL은 {'error': 메시지})
+        """
+        # 도메인별 대기열 (삽입 순서대로 라운드 로빈)
+        queues = OrderedDict()
+        for url in urls:
+            queues.setdefault(self.key_func(url), deque()).append(url)
+        logger.info(f"스케줄 시작: URL {len(urls)}개, 도메인 {len(queues)}개, 워커 {self.max_workers}개")
+
+        results = {}
+        futures = []
+
+        def task(key, url):
+            try:
+                results[url] = func(url)
+            except Exception as e:
+                logger.error(f"작업 실패: {url} ({e})")
+                results[url] = {'error': str(e)}
+            finally:
+                self._on_done(key)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            with self._condition:
+                while queues:
+                    now = time.monotonic()
+                    next_wake = None
+                    dispatched = False
+                    total_in_flight = sum(self._in_flight.values())
+
+                    for key in list(queues):
+                        if total_in_flight >= self.max_workers:
+                            break
+                        if self._in_flight.get(key, 0) >= self._limits(key)["concurrency"]:
+                            continue
+                        bucket = self._bucket(key)
+                        wait = bucket.wait_time(now)
+                        if wait > 0:
+                            next_wake = wait if next_wake is None else min(next_wake, wait)
+                            continue
+
+                        bucket.consume(now)
+                        url = queues[key].popleft()
+                        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+                        total_in_flight += 1
+                        futures.append(executor.submit(task, key, url))
+                        dispatched = True
+
+                        # 다음 순회에서 다른 도메인이 먼저 오도록 뒤로 보냄
+                        if queues[key]:
+                            queues.move_to_end(key)
+                        else:
+                            del queues[key]
+
+                    if not dispatched:
+                        # 작업 완료 알림 또는 가장 빠른 토큰 충전 시점까지 대기
+                        self._condition.wait(timeout=next_wake)
+
+            for future in futures:
+                future.result()
+
+        logger.info(f"스케줄 완료: {len(results)}개 처리")
+        return results
@@ -0,0 +1,395 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+
+logger = logging.getLogger("scrape_service")
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Streamlit 앱/main.py가 이 주소가 설정되어 있으면 서비스에 작업을 맡김
+SERVICE_URL_ENV = "SCRAPE_SERVICE_URL"
+
+DEFAULT_WORKERS = 2
+# 대기열이 이 길이를 넘으면 새 작업을 받지 않고 429로 응답 (브라우저 수보다 작업이 너무 쌓이지 않도록)
+DEFAULT_MAX_QUEUE = 16
+# 완료된 작업 결과 보관 수 (오래된 것부터 제거)
+DEFAULT_RESULT_RETENTION = 1000
+# 429 응답의 Retry-After 기준 (작업 하나의 대략적인 소요 시간)
+ESTIMATED_JOB_SECONDS = 20
+
+# 작업 상태
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ServiceBusyError(Exception):
+    """대기열이 가득 차 작업을 받을 수 없음"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"스크랩 서비스 대기열이 가득 찼습니다 ({retry_after}초 후 재시도)")
+        self.retry_after = retry_after
+
+
+class ScrapeService:
+    """
+    공유 워커 풀로 스크랩 작업을 처리하는 서비스
+
+    워커 수만큼만 브라우저가 동시에 뜨고, 대기열 길이가 max_queue를 넘으면 submit()이 거절됩니다.
+    작업 상태와 결과는 메모리에 보관되며 최근 result_retention개까지만 유지됩니다.
+    같은 URL(정규화 기준, 같은 네트워크 모드)의 작업이 대기/실행 중이면 새 작업을 만들지 않고
+    그 작업의 ID를 돌려주므로, 여러 클라이언트가 같은 기사를 요청해도 브라우저는 한 번만 뜹니다.
+
+    Args:
+        scrape_func (callable): URL과 옵션을 받아 결과 dict를 반환하는 함수 (기본: article_scraper.scrape_article)
+        workers (int): 워커 스레드 수 (동시에 실행할 브라우저 수)
+        max_queue (int): 대기열 최대 길이
+        result_retention (int): 보관할 작업 수
+    """
+
+    def __init__(self, scrape_func=None, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 result_retention=DEFAULT_RESULT_RETENTION):
+        if scrape_func is None:
+            from article_scraper import scrape_article
+            scrape_func = scrape_article
+        self.scrape_func = scrape_func
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_retention = result_retention
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = 0
+        # 합류 키 -> 대기/실행 중인 작업 ID
+        self._inflight = {}
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scrape-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"스크랩 워커 {self.workers}개 시작 (대기열 최대 {self.max_queue})")
+        return self
+
+    def submit(self, url, options=None):
+        """
+        작업을 대기열에 넣습니다.
+
+        Returns:
+            dict: 작업 상태
+
+        Raises:
+            ServiceBusyError: 대기열이 가득 찬 경우
+        """
+        options = options or {}
+        key = self._flight_key(url, options)
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'url': url,
+            'options': options,
+            'status': QUEUED,
+            'submitted_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            # 이 작업에 합류한 요청 수
+            'coalesced': 0,
+        }
+        with self._lock:
+            job_id = self._inflight.get(key)
+            if job_id is not None:
+                self.jobs[job_id]['coalesced'] += 1
+                logger.info(f"진행 중인 작업에 합류: {job_id} {url}")
+                return self._status(job_id)
+            try:
+                self._queue.put_nowait(job['job_id'])
+            except queue.Full:
+                raise ServiceBusyError(self._retry_after())
+            self.jobs[job['job_id']] = job
+            self._inflight[key] = job['job_id']
+            self._trim()
+        logger.info(f"작업 접수: {job['job_id']} {url} (대기 {self._queue.qsize()}개)")
+        return self.status(job['job_id'])
+
+    def status(self, job_id):
+        """작업 상태 (결과 제외), 없는 작업이면 None"""
+        with self._lock:
+            return self._status(job_id)
+
+    def _status(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if key not in ('result', 'options')}
+
+    def result(self, job_id):
+        """완료된 작업의 결과 (작업이 없으면 KeyError, 아직 끝나지 않았으면 None)"""
+        with self._lock:
+            job = self.jobs[job_id]
+            return job['result'] if job['status'] in (DONE, FAILED) else None
+
+    def health(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': self._running,
+                'queue_depth': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'jobs': len(self.jobs),
+            }
+
+    @staticmethod
+    def _flight_key(url, options):
+        from discovery import page_key
+        from network_replay import resolve_network_mode
+        return page_key(url), resolve_network_mode(options.get('network_mode'))
+
+    def _retry_after(self):
+        # 대기 작업이 모두 처리될 때까지의 대략적인 시간
+        return max(1, int(self._queue.qsize() / max(1, self.workers) * ESTIMATED_JOB_SECONDS))
+
+    def _trim(self):
+        # 오래된 완료 작업부터 제거 (대기/실행 중인 작업은 유지)
+        excess = len(self.jobs) - self.result_retention
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self.jobs.items() if job['status'] in (DONE, FAILED)][:excess]:
+            del self.jobs[job_id]
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None:
+                    continue
+                job['status'] = RUNNING
+                job['started_at'] = time.time()
+                self._running += 1
+            try:
+                result = self.scrape_func(job['url'], **job['options'])
+                status = FAILED if not result or 'error' in result else DONE
+            except Exception as e:
+                logger.error(f"작업 실패: {job_id} {job['url']} ({e})", exc_info=True)
+                result = {'error': str(e)}
+                status = FAILED
+            with self._lock:
+                job['result'] = result
+                job['status'] = status
+                job['finished_at'] = time.time()
+                self._running -= 1
+                key = self._flight_key(job['url'], job['options'])
+                if self._inflight.get(key) == job_id:
+                    del self._inflight[key]
+            logger.info(f"작업 완료: {job_id} ({status}, {job['finished_at'] - job['started_at']:.1f}초)")
+
+
+# submit 요청에서 받아들이는 scrape_func 옵션
+ALLOWED_OPTIONS = ("profile_mode", "network_mode")
+
+
+class _ServiceHandler(BaseHTTPRequestHandler):
+    """
+    POST /jobs                  {"url": ..., "profile_mode": ..., "network_mode": ...} -> 202 작업 상태 (가득 차면 429)
+    GET  /jobs/<id>             작업 상태
+    GET  /jobs/<id>/result      결과 (끝나지 않았으면 202)
+    GET  /health                워커/대기열 상태
+    """
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send_json(404, {'error': "없는 경로입니다"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {'error': "JSON 본문이 필요합니다"})
+
+        url = payload.get("url", "")
+        if urlparse(url).scheme not in ("http", "https"):
+            return self._send_json(400, {'error': f"올바른 URL이 아닙니다: {url}"})
+        options = {key: payload[key] for key in ALLOWED_OPTIONS if payload.get(key)}
+
+        try:
+            job = self.server.service.submit(url, options)
+        except ServiceBusyError as e:
+            return self._send_json(429, {'error': str(e), 'retry_after': e.retry_after},
+                                   {"Retry-After": str(e.retry_after)})
+        self._send_json(202, job, {"Location": f"/jobs/{job['job_id']}"})
+
+    def do_GET(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        service = self.server.service
+        if parts == ["health"]:
+            return self._send_json(200, service.health())
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            status = service.status(parts[1])
+            if status is None:
+                return self._send_json(404, {'error': "없는 작업입니다"})
+            if len(parts) == 2:
+                return self._send_json(200, status)
+            if parts[2] == "result":
+                result = service.result(parts[1])
+                if result is None:
+                    return self._send_json(202, status)
+                return self._send_json(200, result)
+        self._send_json(404, {'error': "없는 경로입니다"})
+
+
+class ScrapeServiceServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        super().__init__((host, port), _ServiceHandler)
+        self.service = service
+
+
+class ScrapeServiceClient:
+    """
+    스크랩 서비스 HTTP 클라이언트
+
+    Args:
+        base_url (str): 서비스 주소 (예: http://127.0.0.1:8765)
+        timeout (float): HTTP 요청 하나의 제한 시간(초)
+    """
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = Request(f"{self.base_url}{path}", data=data, method=method,
+                          headers={"Content-Type": "application/json"})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return response.status, json.loads(response.read() or b"null")
+        except HTTPError as e:
+            raw = e.read()
+            try:
+                body = json.loads(raw or b"null")
+            except ValueError:
+                # 프록시 등이 돌려준 JSON이 아닌 오류 페이지
+                body = {'error': f"스크랩 서비스 오류 ({e.code}): {raw[:200].decode('utf-8', errors='replace')}"}
+            if e.code == 429:
+                raise ServiceBusyError(int(e.headers.get("Retry-After") or 1)) from e
+            return e.code, body
+
+    def submit(self, url, **options):
+        """작업 제출 -> 작업 상태 dict (가득 차면 ServiceBusyError)"""
+        status, body = self._request("POST", "/jobs", dict(options, url=url))
+        if status != 202:
+            raise RuntimeError((body.get('error') if isinstance(body, dict) else None) or f"작업 제출 실패 ({status})")
+        return body
+
+    def status(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")[1]
+
+    def result(self, job_id):
+        """완료된 작업의 결과 (아직이면 None)"""
+        status, body = self._request("GET", f"/jobs/{job_id}/result")
+        if status == 404:
+            raise KeyError(job_id)
+        return body if status == 200 else None
+
+    def health(self):
+        return self._request("GET", "/health")[1]
+
+    def wait(self, job_id, timeout=300, poll_interval=1.0):
+        """
+        작업이 끝날 때까지 기다렸다가 결과를 반환합니다.
+
+        서비스가 재시작되었거나 끝난 작업이 정리되어 결과를 받을 수 없으면 예외 대신 {'error': ..}를 반환합니다.
+        (배치나 Streamlit 화면 전체가 중단되지 않도록)
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                result = self.result(job_id)
+                if result is not None:
+                    return result
+                time.sleep(poll_interval)
+        except KeyError:
+            return {'error': f"스크랩 서비스에서 작업을 찾을 수 없습니다: {job_id}"}
+        except (URLError, OSError) as e:
+            return {'error': f"스크랩 서비스에 연결할 수 없습니다: {e}"}
+        except ValueError as e:
+            return {'error': f"스크랩 서비스 응답을 해석할 수 없습니다: {e}"}
+        return {'error': f"스크랩 서비스 응답 대기 시간 초과 ({timeout}초)"}
+
+    def scrape(self, url, timeout=300, busy_retries=3, **options):
+        """
+        작업을 제출하고 결과를 기다립니다. 대기열이 가득 차면 Retry-After만큼 기다렸다가 다시 제출합니다.
+
+        Returns:
+            dict: scrape_article()과 같은 형식의 결과 (실패 시 'error' 포함)
+        """
+        for attempt in range(busy_retries + 1):
+            try:
+                job = self.submit(url, **options)
+                break
+            except ServiceBusyError as e:
+                if attempt == busy_retries:
+                    return {'error': str(e)}
+                logger.info(f"스크랩 서비스가 바쁨, {e.retry_after}초 후 재시도")
+                time.sleep(e.retry_after)
+            except (URLError, OSError) as e:
+                return {'error': f"스크랩 서비스에 연결할 수 없습니다: {e}"}
+            except (RuntimeError, ValueError) as e:
+                # 서비스가 거부한 요청(잘못된 URL 등)이나 해석할 수 없는 응답 - 직접 실행할 때처럼 결과로 전달
+                return {'error': str(e)}
+        return self.wait(job['job_id'], timeout)
+
+
+def get_service_client(base_url=None):
+    """SCRAPE_SERVICE_URL(또는 base_url)이 설정되어 있으면 클라이언트를, 아니면 None을 반환합니다."""
+    base_url = base_url or os.environ.get(SERVICE_URL_ENV)
+    return ScrapeServiceClient(base_url) if base_url else None
+
+
+if __name__ == "__main__":
+    from log_setup import setup_logging
+    setup_logging("scrape_service.log")
+
+    parser = argparse.ArgumentParser(description="기사 스크랩 서비스")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="동시에 실행할 브라우저 수")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="대기열 최대 길이 (넘으면 429)")
+    args = parser.parse_args()
+
+    service = ScrapeService(workers=args.workers, max_queue=args.max_queue).start()
+    server = ScrapeServiceServer(service, args.host, args.port)
+    logger.info(f"스크랩 서비스 시작: http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
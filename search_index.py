@@ -0,0 +1,300 @@
+import argparse
+import glob
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger("search_index")
+
+DEFAULT_INDEX_FILE = "search_index.db"
+
+# 제목에 나온 단어는 본문보다 가중치를 높게
+TITLE_WEIGHT = 3
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 한글은 음절 bigram, 영문/숫자는 단어 단위로 색인
+TOKEN_RE = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+PREVIEW_LENGTH = 200
+
+# 이 값보다 idf가 낮은 용어(전체 문서의 약 절반 이상에 등장)는 드문 용어가 있으면 검색에서 제외
+COMMON_TERM_IDF = 0.5
+
+
+def tokenize(text):
+    """
+    한국어를 고려한 토큰화: 한글 연속 구간은 음절 bigram(한 글자면 unigram), 영문/숫자는 소문자 단어
+
+    띄어쓰기나 조사와 무관하게 '스크래퍼'와 '스크래퍼를'이 같은 bigram을 공유하므로
+    형태소 분석기 없이도 부분 일치 검색이 됩니다.
+    """
+    tokens = []
+    for run in TOKEN_RE.findall(text.lower()):
+        if run[0] >= "가" and len(run) > 1:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            tokens.append(run)
+    return tokens
+
+
+class SearchIndex:
+    """
+    제목/본문 역색인 (SQLite 파일 하나에 저장)
+
+    문서를 추가할 때마다 해당 문서의 포스팅만 갱신하므로 새 스크랩이 들어오는 대로 증분 색인됩니다.
+
+    Args:
+        path (str): 인덱스 DB 파일 경로
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                title TEXT,
+                url TEXT,
+                site_type TEXT,
+                length INTEGER NOT NULL,
+                preview TEXT,
+                indexed_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+        """)
+        self._conn.commit()
+
+    def add_document(self, path, title, content, url=None, site_type=None):
+        """
+        문서를 색인합니다. 같은 path가 이미 있으면 교체합니다.
+
+        Args:
+            path (str): 문서 키 (저장된 HTML 파일 경로)
+            title (str): 제목
+            content (str): 추출된 본문
+            url (str): 원본 URL
+            site_type (str): 사이트 유형
+        """
+        counts = Counter(tokenize(content))
+        for token in tokenize(title or ""):
+            counts[token] += TITLE_WEIGHT
+        length = sum(counts.values())
+
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT doc_id FROM docs WHERE path = ?", (path,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                self._conn.execute(
+                    "UPDATE docs SET title = ?, url = ?, site_type = ?, length = ?, preview = ?, indexed_at = ? WHERE doc_id = ?",
+                    (title, url, site_type, length, content[:PREVIEW_LENGTH], time.time(), row[0])
+                )
+                doc_id = row[0]
+            else:
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (path, title, url, site_type, length, preview, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, title, url, site_type, length, content[:PREVIEW_LENGTH], time.time())
+                )
+                doc_id = cursor.lastrowid
+            # 검색 시 docs와 조인하지 않도록 문서 길이를 포스팅에 함께 저장
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf, length) VALUES (?, ?, ?, ?)",
+                ((term, doc_id, tf, length) for term, tf in counts.items())
+            )
+        logger.info(f"검색 인덱스 갱신: {path} (토큰 {len(counts)}종)")
+
+    def remove_document(self, path):
+        """색인에서 문서를 제거합니다."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT doc_id FROM docs WHERE path = ?", (path,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (row[0],))
+
+    def clear(self):
+        """모든 문서를 색인에서 제거합니다."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM docs")
+
+    def search(self, query, limit=20):
+        """
+        BM25로 순위를 매긴 검색 결과를 반환합니다.
+
+        Args:
+            query (str): 검색어
+            limit (int): 최대 결과 수
+
+        Returns:
+            list: [{'path', 'title', 'url', 'site_type', 'preview', 'score'}] 점수 내림차순
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            doc_count, avg_length = self._conn.execute("SELECT COUNT(*), AVG(length) FROM docs").fetchone()
+            if not doc_count:
+                return []
+
+            # 용어별 문서 빈도로 idf 계산
+            idf = {}
+            for term in terms:
+                df = self._conn.execute("SELECT COUNT(*) FROM postings WHERE term = ?", (term,)).fetchone()[0]
+                if df:
+                    idf[term] = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            if not idf:
+                return []
+
+            # '니다', '있는'처럼 대부분의 문서에 나오는 bigram은 점수 기여가 거의 없으면서 포스팅만 길므로,
+            # 더 드문 용어가 있을 때는 건너뜀
+            rare_terms = {term: value for term, value in idf.items() if value >= COMMON_TERM_IDF}
+            if rare_terms:
+                idf = rare_terms
+
+            # 점수 합산/정렬은 SQLite 안에서 처리하고, 상위 문서만 docs에서 조회
+            idf_case = " ".join("WHEN ? THEN ?" for _ in idf)
+            rows = self._conn.execute(
+                f"""
+                SELECT doc_id,
+                       SUM((CASE term {idf_case} END) * tf * ({BM25_K1} + 1)
+                           / (tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * length / ?))) AS score
+                FROM postings
+                WHERE term IN ({", ".join("?" for _ in idf)})
+                GROUP BY doc_id
+                ORDER BY score DESC
+                LIMIT ?
+                """,
+                [value for item in idf.items() for value in item] + [avg_length] + list(idf) + [limit]
+            ).fetchall()
+
+            results = []
+            for doc_id, score in rows:
+                path, title, url, site_type, preview = self._conn.execute(
+                    "SELECT path, title, url, site_type, preview FROM docs WHERE doc_id = ?", (doc_id,)
+                ).fetchone()
+                results.append({
+                    'path': path,
+                    'title': title,
+                    'url': url,
+                    'site_type': site_type,
+                    'preview': preview,
+                    'score': round(score, 3)
+                })
+        return results
+
+    def document_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+def rebuild_index(index, page_sources_dir="page_sources", metadata_dir="metadata"):
+    """
+    보관된 기사로 색인을 처음부터 다시 만듭니다. (색인 기능 이전에 보관된 기사, 추출 실패 문구가 색인된 경우)
+
+    metadata/의 본문(main.py 배치 스크랩)을 먼저 색인하고, 메타데이터가 없는 page_sources/의 HTML은
+    다시 추출해서 색인합니다. 추출에 실패한 기사는 색인하지 않습니다.
+
+    Args:
+        index (SearchIndex): 다시 만들 색인
+        page_sources_dir (str): 저장된 HTML 디렉토리
+        metadata_dir (str): 메타데이터 JSON 디렉토리
+
+    Returns:
+        tuple: (색인한 문서 수, 건너뛴 문서 수)
+    """
+    from article_scraper import extract_content_from_html
+
+    index.clear()
+    indexed = set()
+    skipped = 0
+    for path in sorted(glob.glob(os.path.join(metadata_dir, "*.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+        except Exception as e:
+            logger.warning(f"메타데이터 읽기 실패: {path} ({e})")
+            skipped += 1
+            continue
+        content = metadata.get('content') or ""
+        method = metadata.get('extraction_method') or metadata.get('best_method')
+        if method == "실패" or metadata.get('extraction_failed') or not content.strip():
+            skipped += 1
+            continue
+        doc_path = metadata.get('page_source_file') or path
+        index.add_document(doc_path, metadata.get('title'), content, url=metadata.get('url'),
+                           site_type=metadata.get('site_type') or "wishket")
+        indexed.add(os.path.normpath(doc_path))
+
+    for path in sorted(glob.glob(os.path.join(page_sources_dir, "*.html"))):
+        if os.path.normpath(path) in indexed:
+            continue
+        result = extract_content_from_html(path, index=False)
+        if 'error' in result or result.get('extraction_failed'):
+            skipped += 1
+            continue
+        index.add_document(path, result['title'], result['content'], site_type=result['site_type'])
+        indexed.add(os.path.normpath(path))
+
+    logger.info(f"검색 인덱스 재구성 완료: {len(indexed)}개 색인, {skipped}개 건너뜀")
+    return len(indexed), skipped
+
+
+_default_index = None
+_default_index_lock = threading.Lock()
+
+
+def get_search_index(path=DEFAULT_INDEX_FILE):
+    """프로세스에서 공유하는 검색 인덱스를 반환합니다. (Streamlit 세션 간 공유)"""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None or _default_index.path != path:
+            _default_index = SearchIndex(path)
+        return _default_index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="추출된 기사 검색")
+    parser.add_argument("query", nargs="?", help="검색어")
+    parser.add_argument("--index", default=DEFAULT_INDEX_FILE, help="인덱스 DB 파일 경로")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--rebuild", action="store_true", help="page_sources/와 metadata/로 색인을 다시 만듦")
+    parser.add_argument("--page-sources", default="page_sources", help="저장된 HTML 디렉토리")
+    parser.add_argument("--metadata-dir", default="metadata", help="메타데이터 JSON 디렉토리")
+    args = parser.parse_args()
+
+    if not args.query and not args.rebuild:
+        parser.error("검색어 또는 --rebuild가 필요합니다")
+
+    index = SearchIndex(args.index)
+    if args.rebuild:
+        logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        count, skipped = rebuild_index(index, args.page_sources, args.metadata_dir)
+        print(f"색인 {count}개, 건너뜀 {skipped}개")
+
+    if args.query:
+        started = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            print(f"{hit['score']:8.3f}  {hit['title']}  ({hit['path']})")
+        print(f"{len(hits)}건, {elapsed_ms:.1f} ms")
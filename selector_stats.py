@@ -0,0 +1,133 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger("selector_stats")
+
+DEFAULT_STATS_FILE = "selector_stats.json"
+
+# 이 횟수 이상 기록되고 한 선택자가 이 비율 이상 이겼을 때만 그 선택자를 먼저 시도
+MIN_SAMPLES = 5
+CONFIDENT_SHARE = 0.8
+# 기록이 이만큼 쌓이면 모든 횟수를 절반으로 줄여 사이트 개편 후 새 선택자로 빨리 넘어가도록
+DECAY_TOTAL = 200
+
+# 선택자 종류
+TITLE = "title"
+CONTAINER = "container"
+HTML_TITLE = "html_title"
+HTML_CONTAINER = "html_container"
+
+
+class SelectorStats:
+    """
+    사이트별 선택자 적중 기록
+
+    (사이트, 종류)마다 어떤 선택자로 제목/본문 컨테이너를 찾았는지 세고, 한 선택자가 충분히 자주 이겼으면
+    그 선택자를 먼저 시도하도록 순서를 바꿔 줍니다. 나머지 선택자는 원래 순서를 그대로 유지하므로
+    우선 선택자가 빗나가면 기존과 같은 순서로 찾고, 그 결과가 다시 기록되어 우선 선택자가 자연스럽게 바뀝니다.
+
+    Args:
+        path (str): 기록 파일 경로
+    """
+
+    def __init__(self, path=DEFAULT_STATS_FILE):
+        self.path = path
+        self.counts = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.counts = json.load(f)
+            except Exception as e:
+                logger.warning(f"선택자 기록 파일 읽기 실패: {path} ({e})")
+
+    @staticmethod
+    def _key(site, kind):
+        return f"{site}:{kind}"
+
+    def preferred(self, site, kind):
+        """충분히 자주 이긴 선택자 (없으면 None)"""
+        with self._lock:
+            counts = self.counts.get(self._key(site, kind))
+            if not counts:
+                return None
+            total = sum(counts.values())
+            selector, wins = max(counts.items(), key=lambda item: item[1])
+        if total >= MIN_SAMPLES and selector and wins / total >= CONFIDENT_SHARE:
+            return selector
+        return None
+
+    def order(self, site, kind, selectors):
+        """우선 선택자를 맨 앞으로 옮긴 선택자 목록"""
+        winner = self.preferred(site, kind)
+        if winner is None or winner not in selectors or selectors[0] == winner:
+            return list(selectors)
+        return [winner] + [selector for selector in selectors if selector != winner]
+
+    def record(self, site, kind, selector):
+        """
+        이번에 이긴 선택자를 기록합니다.
+
+        Args:
+            selector (str): 찾은 선택자 (모두 빗나갔으면 None - 빈 문자열로 기록되어 우선 선택자 비율을 낮춤)
+        """
+        key = self._key(site, kind)
+        with self._lock:
+            counts = self.counts.setdefault(key, {})
+            counts[selector or ""] = counts.get(selector or "", 0) + 1
+            if sum(counts.values()) >= DECAY_TOTAL:
+                self.counts[key] = {name: count // 2 for name, count in counts.items() if count // 2}
+            try:
+                self._save()
+            except Exception as e:
+                # 통계 저장 실패가 스크랩/추출 자체를 실패시키지 않도록 (기록은 메모리에 남아 다음 저장 때 함께 씀)
+                logger.warning(f"선택자 통계 저장 실패: {self.path} ({e})")
+
+    def summary(self):
+        with self._lock:
+            return {key: dict(sorted(counts.items(), key=lambda item: -item[1]))
+                    for key, counts in sorted(self.counts.items())}
+
+    def _save(self):
+        # 같은 디렉토리를 쓰는 다른 프로세스(CLI, 스크랩 서비스, Streamlit, 워커)와 임시 파일이 겹치지 않도록 고유한 이름
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.counts, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+_default_stats = None
+_default_stats_lock = threading.Lock()
+
+
+def get_selector_stats(path=DEFAULT_STATS_FILE):
+    """프로세스에서 공유하는 선택자 기록을 반환합니다."""
+    global _default_stats
+    with _default_stats_lock:
+        if _default_stats is None or _default_stats.path != path:
+            _default_stats = SelectorStats(path)
+        return _default_stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사이트별 선택자 적중 기록 확인")
+    parser.add_argument("--stats-file", default=DEFAULT_STATS_FILE, help="선택자 기록 파일")
+    args = parser.parse_args()
+
+    stats = SelectorStats(args.stats_file)
+    for key, counts in stats.summary().items():
+        site, kind = key.rsplit(":", 1)
+        preferred = stats.preferred(site, kind)
+        print(f"{key}\t우선: {preferred or '-'}\t" + ", ".join(f"{name or '(없음)'} {count}" for name, count in counts.items()))
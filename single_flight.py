@@ -0,0 +1,66 @@
+import logging
+import threading
+
+logger = logging.getLogger("single_flight")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키의 동시 호출을 하나로 합치는 도구
+
+    키가 같은 호출이 진행 중이면 새 호출은 함수를 다시 실행하지 않고 진행 중인 호출이 끝나기를 기다려
+    같은 결과(또는 같은 예외)를 받습니다. 호출이 끝나면 키는 바로 지워지므로 결과를 캐시하지는 않습니다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        func()를 실행하거나, 같은 키로 진행 중인 실행의 결과를 기다립니다.
+
+        Returns:
+            tuple: (결과, 공유 여부) - 공유 여부가 True면 다른 호출의 결과를 받은 것
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            logger.info(f"진행 중인 작업에 합류: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.info(f"작업 결과를 {call.waiters}개 호출과 공유: {key}")
+        return call.result, False
+
+    def in_flight(self):
+        """진행 중인 키 목록"""
+        with self._lock:
+            return list(self._calls)
@@ -0,0 +1,279 @@
+import argparse
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+# soupsieve(bs4 의존성)는 import 비용이 크므로 선택자를 처음 쓸 때 컴파일
+# (Streamlit 앱 첫 렌더링과 스크랩 서비스 기동이 기다리지 않도록 - article_scraper와 같은 이유)
+
+UNKNOWN = "unknown"
+
+# 일반적인 제목 선택자 (다른 사이트용, 마지막은 첫 번째 h1 태그)
+GENERIC_TITLE_SELECTORS = ['h1.article-title', 'h1.post-title', 'h1.entry-title', 'h1.title', 'h1']
+
+# 일반 컨테이너 (대부분의 사이트에 적용 가능)
+GENERIC_CONTAINER_SELECTORS = [
+    'article',              # 일반 아티클 태그
+    'main',                 # 메인 태그
+    'div.article-content',  # 일반 아티클 콘텐츠
+    'div.entry-content',    # 일반 엔트리 콘텐츠
+    'div.post-content',     # 일반 포스트 콘텐츠
+    'div.content',          # 일반 콘텐츠
+]
+
+# 모든 사이트에서 제거할 문구
+COMMON_PHRASES = [
+    "목록으로",
+    "복사 완료!",
+    "공유하기",
+    "좋아요",
+    "댓글",
+    "신고",
+    "구독하기"
+]
+
+
+class SiteProfile:
+    """
+    사이트 하나에 대한 스크랩 설정
+
+    Args:
+        name (str): 사이트 유형 (파일명 접두어, 통계 키로도 쓰임)
+        hosts (list): 호스트 이름 ('www.' 제외, 하위 도메인도 이 사이트로 처리)
+        wait_selector (str): 페이지 로드 대기 선택자
+        title_selectors (list): 브라우저에서 제목을 찾을 선택자
+        container_selectors (list): 브라우저에서 본문 컨테이너를 찾을 선택자
+        html_title_selectors (list): 저장된 HTML의 사이트별 제목 선택자 (일반 선택자보다 먼저 시도)
+        html_container_selectors (list): 저장된 HTML의 사이트별 본문 컨테이너 후보 (일반 컨테이너와 함께 평가)
+        phrases (list): 본문에서 제거할 사이트별 문구
+        min_div_chars (int): 브라우저 추출에서 본문으로 인정할 div의 최소 길이
+        figure_captions (bool): 그림 설명(figcaption)을 본문에 포함할지
+        inspect_selector (str): 디버그 사이드바에서 주요 컨테이너를 찾을 선택자 (기본: 본문 컨테이너 선택자)
+    """
+
+    def __init__(self, name, hosts, wait_selector, title_selectors, container_selectors,
+                 html_title_selectors=(), html_container_selectors=(), phrases=(),
+                 min_div_chars=50, figure_captions=False, inspect_selector=None):
+        self.name = name
+        self.hosts = list(hosts)
+        self.wait_selector = wait_selector
+        self.title_selectors = list(title_selectors)
+        self.container_selectors = list(container_selectors)
+        self.html_title_selectors = list(dict.fromkeys(list(html_title_selectors) + GENERIC_TITLE_SELECTORS))
+        self.html_container_selectors = list(dict.fromkeys(list(html_container_selectors) + GENERIC_CONTAINER_SELECTORS))
+        self.min_div_chars = min_div_chars
+        self.figure_captions = figure_captions
+        self.inspect_selector = inspect_selector or ", ".join(self.container_selectors)
+
+        # 문구를 긴 것부터 하나의 정규식으로 묶어 본문을 한 번만 훑음
+        # (짧은 공통 문구가 긴 사이트 문구의 일부를 먼저 지워 긴 문구가 남는 일이 없도록)
+        phrases = sorted(dict.fromkeys(COMMON_PHRASES + list(phrases)), key=len, reverse=True)
+        self.phrase_pattern = re.compile("|".join(re.escape(phrase) for phrase in phrases))
+
+        self._compiled = None
+        self._compile_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"SiteProfile({self.name!r})"
+
+    def _matchers(self):
+        if self._compiled is None:
+            with self._compile_lock:
+                if self._compiled is None:
+                    import soupsieve
+                    selectors = self.html_title_selectors + self.html_container_selectors + [self.inspect_selector]
+                    self._compiled = {selector: soupsieve.compile(selector) for selector in dict.fromkeys(selectors)}
+        return self._compiled
+
+    def matcher(self, selector):
+        """미리 컴파일된 선택자 (목록에 없는 선택자는 컴파일해서 보관)"""
+        compiled = self._matchers().get(selector)
+        if compiled is None:
+            import soupsieve
+            compiled = soupsieve.compile(selector)
+            with self._compile_lock:
+                self._compiled = {**self._compiled, selector: compiled}
+        return compiled
+
+    def select_one(self, soup, selector):
+        return self.matcher(selector).select_one(soup)
+
+    def select(self, soup, selector):
+        return self.matcher(selector).select(soup)
+
+    def remove_phrases(self, content):
+        """공통/사이트별 문구를 제거합니다."""
+        return self.phrase_pattern.sub("", content)
+
+
+SITE_PROFILES = [
+    SiteProfile(
+        "wishket",
+        hosts=["yozm.wishket.com"],
+        wait_selector="article",
+        title_selectors=["h1.article-title", "h1"],
+        container_selectors=["div.article-body-container", "div.content-body"],
+        html_container_selectors=[
+            'div.article-body-container',  # 위시켓 기본 선택자
+            'div.content-body',            # 위시켓 대체 선택자
+        ],
+        phrases=[
+            "요즘IT가 PICK 한 뉴스레터를 매주 목요일 에 만나보세요.",
+            "개인정보 수집·이용 에 동의해 주세요. 무료로 구독하기",
+            "요즘IT",
+            "이메일 주소를 입력해주세요.",
+            "현재 글",
+            "관련 글 보기"
+        ],
+    ),
+    SiteProfile(
+        "brunch",
+        hosts=["brunch.co.kr"],
+        wait_selector="div.wrap_body_frame, div.article_body",
+        title_selectors=["h1.cover_title", "h1.article_title", "h1"],
+        container_selectors=["div.wrap_body_frame", "div.article_body"],
+        html_title_selectors=['h1.cover_title', 'h1.article_title'],
+        html_container_selectors=[
+            'div.wrap_body_frame',  # 브런치 메인 컨텐츠
+            'div.article_body',     # 브런치 본문
+            'div.wrap_item',        # 브런치 아이템 래퍼
+        ],
+        phrases=[
+            "이 글이 좋으셨다면 추천을 눌러주세요",
+            "선택한 텍스트를 드래그하여 하이라이트 해보세요",
+            "공유하기",
+            "브런치에서 보기",
+            "작가의 글을 공유하세요",
+            "작가의 글에 공감하시면 ♡를 누르세요",
+            "작가정보",
+            "You can make anything by writing",
+            "C.S.Lewis",
+            "브런치스토리 홈",
+            "브런치스토리 나우",
+            "브런치스토리 책방",
+            "계정을 잊어버리셨나요?",
+            "로그인 회원가입"
+        ],
+        # 브런치는 div에 중요 내용이 많으므로 길이 제한 완화
+        min_div_chars=20,
+        figure_captions=True,
+    ),
+    SiteProfile(
+        "medium",
+        hosts=["medium.com"],
+        wait_selector="article, div[data-testid='postContent']",
+        title_selectors=["h1[data-testid='article-title']", "h1.pw-post-title", "h1"],
+        container_selectors=["article", "div[data-testid='postContent']"],
+        html_title_selectors=['h1[data-testid="article-title"]', 'h1.pw-post-title'],
+        html_container_selectors=[
+            'article',                          # 미디엄 아티클
+            'div[data-testid="postContent"]',   # 미디엄 포스트 콘텐츠
+        ],
+        phrases=[
+            "Medium is an open platform where",
+            "Read more from",
+            "More from",
+            "Recommended from Medium",
+            "Get the Medium app",
+            "A button that says 'Download on the App Store'"
+        ],
+    ),
+    SiteProfile(
+        "velog",
+        hosts=["velog.io"],
+        wait_selector="div.atom-one, h1.head-title",
+        title_selectors=["h1.head-title", "h1"],
+        container_selectors=["div.atom-one", "div.sc-gZMcBi"],
+        html_title_selectors=['h1.head-title'],
+        html_container_selectors=[
+            'div.atom-one',   # 벨로그 본문
+            'div.sc-gZMcBi',  # 벨로그 컨텐츠
+        ],
+        phrases=[
+            "댓글 작성하기",
+            "댓글을 작성하려면",
+            "로그인",
+            "태그",
+            "시리즈에 추가",
+            "이 블로그 구독하기"
+        ],
+    ),
+]
+
+UNKNOWN_PROFILE = SiteProfile(
+    UNKNOWN,
+    hosts=[],
+    wait_selector="article, main, div.content",
+    title_selectors=["h1.article-title", "h1.post-title", "h1.entry-title", "h1"],
+    container_selectors=["article", "main", "div.content"],
+    inspect_selector="div.article-body-container, div.content-body, article, main, div.article-content, div.content",
+)
+
+
+class SiteRegistry:
+    """
+    사이트 이름/호스트 이름 -> SiteProfile 조회
+
+    URL은 호스트 이름을 뒤에서부터 줄여 가며(blog.medium.com -> medium.com) 딕셔너리에서 찾으므로
+    조회 비용은 등록된 사이트 수가 아니라 호스트 이름의 점 개수에만 비례합니다.
+
+    Args:
+        profiles (list): 등록할 SiteProfile 목록
+        default (SiteProfile): 어느 사이트에도 해당하지 않을 때의 프로필
+    """
+
+    def __init__(self, profiles=(), default=UNKNOWN_PROFILE):
+        self.default = default
+        self._by_name = {default.name: default}
+        self._by_host = {}
+        for profile in profiles:
+            self.register(profile)
+
+    def register(self, profile):
+        for host in profile.hosts:
+            owner = self._by_host.get(host)
+            if owner is not None and owner.name != profile.name:
+                raise ValueError(f"호스트가 이미 다른 사이트에 등록되어 있습니다: {host} ({owner.name})")
+        self._by_name[profile.name] = profile
+        for host in profile.hosts:
+            self._by_host[host] = profile
+
+    def names(self):
+        return [name for name in self._by_name if name != self.default.name]
+
+    def for_name(self, name):
+        """사이트 유형 이름의 프로필 (없으면 기본 프로필)"""
+        return self._by_name.get(name, self.default)
+
+    def for_url(self, url):
+        """URL의 호스트 이름으로 찾은 프로필 (없으면 기본 프로필)"""
+        host = (urlparse(url).hostname or "").lower()
+        while host:
+            profile = self._by_host.get(host)
+            if profile is not None:
+                return profile
+            host = host.partition(".")[2]
+        return self.default
+
+    def for_file(self, path):
+        """저장된 HTML 파일명의 사이트 유형 접두어(<사이트>_article_...)로 찾은 프로필"""
+        return self.for_name(os.path.basename(path).split("_", 1)[0])
+
+
+# 프로세스 전체에서 공유하는 사이트 프로필 목록
+site_registry = SiteRegistry(SITE_PROFILES)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="URL/파일이 어느 사이트 프로필로 처리되는지 확인")
+    parser.add_argument("targets", nargs="*", help="URL 또는 저장된 HTML 파일 경로 (생략하면 등록된 사이트 목록)")
+    args = parser.parse_args()
+
+    if not args.targets:
+        for name in site_registry.names():
+            profile = site_registry.for_name(name)
+            print(f"{name}\t{', '.join(profile.hosts)}\t대기: {profile.wait_selector}")
+    for target in args.targets:
+        profile = site_registry.for_url(target) if "://" in target else site_registry.for_file(target)
+        print(f"{target}\t{profile.name}")
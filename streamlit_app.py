@@ -1,37 +1,31 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium_stealth import stealth
 import time
 import os
-import random
 import logging
 from datetime import datetime
-from bs4 import BeautifulSoup
 import glob
 import re
 import json
+import hashlib
 import platform
 import subprocess
 import shutil
 import sys
-from pathlib import Path
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.core.os_manager import ChromeType
+import sysconfig
+import threading
+from importlib import metadata as importlib_metadata
+# 스크랩 핵심 로직은 article_scraper.py (selenium 등 무거운 모듈은 그 안에서 필요할 때 import)
+from article_scraper import clean_content, extract_content_from_html, longest_text_blocks, scrape_article_shared
+from scrape_service import get_service_client
+from search_index import get_search_index
+from html_cache import document_cache
+from log_setup import setup_logging
+from network_replay import NETWORK_MODES, resolve_network_mode
+from browser_profiles import PROFILE_MODES, resolve_profile_mode
+from site_profiles import site_registry
 
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("article_scraper.log"),
-        logging.StreamHandler()
-    ]
-)
+# 로깅 설정 (큐 기반 비동기 기록, 파일은 JSON Lines + 크기 기준 회전)
+setup_logging("article_scraper.log")
 logger = logging.getLogger("article_scraper")
 
 # Streamlit 페이지 설정
@@ -49,19 +43,18 @@ def check_environment():
         "is_streamlit_cloud": os.environ.get('IS_STREAMLIT_CLOUD') == 'true'
     }
     
-    # pip 패키지 목록 확인
+    # 설치된 패키지 목록 확인 (pip 하위 프로세스 대신 현재 인터프리터의 메타데이터를 직접 읽음)
     try:
-        pip_list = subprocess.run(
-            [sys.executable, "-m", "pip", "list"], 
-            capture_output=True, 
-            text=True
+        packages = sorted(
+            (dist.metadata["Name"] or "", dist.version)
+            for dist in importlib_metadata.distributions()
         )
-        env_info["pip_packages"] = pip_list.stdout
+        env_info["pip_packages"] = "\n".join(f"{name} {version}" for name, version in packages)
         
         # webdriver-manager 버전 확인
-        for line in pip_list.stdout.splitlines():
-            if "webdriver-manager" in line:
-                env_info["webdriver_manager_version"] = line.strip()
+        for name, version in packages:
+            if name.lower() == "webdriver-manager":
+                env_info["webdriver_manager_version"] = f"{name} {version}"
                 break
     except Exception as e:
         env_info["pip_error"] = str(e)
@@ -101,382 +94,98 @@ def check_environment():
         except Exception as e:
             env_info["chrome_error"] = str(e)
     
-    logger.info(f"환경 정보: {env_info}")
+    # 전체 패키지 목록은 너무 길어 DEBUG로만 남김
+    summary = {key: value for key, value in env_info.items() if key != "pip_packages"}
+    package_count = env_info.get("pip_packages", "").count("\n") + 1 if env_info.get("pip_packages") else 0
+    logger.info(f"환경 정보: {summary} (패키지 {package_count}개)")
+    logger.debug(f"설치된 패키지:\n{env_info.get('pip_packages', '')}")
     return env_info
 
-def detect_site_type(url):
-    """URL을 기반으로 사이트 유형을 감지합니다."""
-    if "yozm.wishket.com" in url:
-        return "wishket"
-    elif "brunch.co.kr" in url:
-        return "brunch"
-    elif "medium.com" in url:
-        return "medium"
-    elif "velog.io" in url:
-        return "velog"
-    else:
-        return "unknown"
-
-def get_compatible_chromedriver():
-    """
-    Streamlit Cloud와 호환되는 ChromeDriver를 설정하는 함수
-    
-    Returns:
-        Service: Chrome WebDriver 서비스 객체
-    """
-    try:
-        # 환경 감지
-        is_streamlit_cloud = os.environ.get('IS_STREAMLIT_CLOUD') == 'true'
-        
-        if is_streamlit_cloud:
-            logger.info("Streamlit Cloud 환경 감지됨")
-            
-            # 시스템에 설치된 chromium-driver를 찾아봄
-            system_driver_path = "/usr/bin/chromedriver"
-            if os.path.exists(system_driver_path):
-                logger.info(f"시스템에 설치된 ChromeDriver 사용: {system_driver_path}")
-                return Service(executable_path=system_driver_path)
-            
-            # 시스템에 드라이버가 없으면 Chromium 사용
-            CHROMIUM_PATH = "/usr/bin/chromium"
-            
-            # Chromium 버전 확인
-            chromium_version = ""
-            try:
-                chromium_version_cmd = subprocess.run(
-                    [CHROMIUM_PATH, "--version"], 
-                    capture_output=True, 
-                    text=True
-                )
-                chromium_version = chromium_version_cmd.stdout.strip().split(" ")[-1]
-                logger.info(f"감지된 Chromium 버전: {chromium_version}")
-            except Exception as e:
-                logger.error(f"Chromium 버전 확인 실패: {e}")
-                chromium_version = "120.0.6099.224"  # 기본 버전
-            
-            # ChromeDriver 다운로드 경로 설정
-            chromium_major_version = chromium_version.split('.')[0]
-            driver_path = Path("/tmp/chromedriver")
-            
-            # 환경에 맞는 ChromeDriver 설치
-            if not driver_path.exists():
-                logger.info(f"ChromeDriver 설치 중 (Chromium {chromium_major_version}용)")
-                
-                # webdriver-manager 최신 버전 사용 방식 (3.8.0+)
-                try:
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    from webdriver_manager.core.os_manager import ChromeType
-                    
-                    # 명시적으로 크롬 유형을 지정하고 브라우저 버전과 일치하는 드라이버 설치
-                    driver_path = ChromeDriverManager(
-                        chrome_type=ChromeType.CHROMIUM
-                    ).install()
-                    logger.info(f"최신 webdriver-manager 방식으로 ChromeDriver 설치 성공")
-                except Exception as e1:
-                    logger.warning(f"최신 방식의 ChromeDriver 설치 실패: {e1}")
-                    
-                    # 구버전 webdriver-manager 사용 방식 시도
-                    try:
-                        # 정확한 버전 없이 기본 ChromeDriver 설치
-                        driver_path = ChromeDriverManager().install()
-                        logger.info(f"기본 ChromeDriver 설치 성공")
-                    except Exception as e2:
-                        logger.error(f"모든 ChromeDriver 설치 방법 실패: {e1}, {e2}")
-                        raise Exception(f"ChromeDriver 설치 실패: {e2}")
-            
-            logger.info(f"ChromeDriver 경로: {driver_path}")
-            return Service(executable_path=driver_path)
-        else:
-            # 로컬 환경에서는 webdriver-manager 사용
-            logger.info("로컬 환경 감지됨, webdriver-manager 사용")
-            return Service(ChromeDriverManager().install())
-    
-    except Exception as e:
-        logger.error(f"ChromeDriver 설정 중 오류 발생: {e}", exc_info=True)
-        # 오류 발생 시 기본 ChromeDriverManager 사용 시도
-        try:
-            return Service(ChromeDriverManager().install())
-        except Exception as e2:
-            logger.error(f"최종 ChromeDriver 설정 실패: {e2}", exc_info=True)
-            # 최후의 수단: 시스템에 설치된 기본 chromedriver 사용 시도
-            if os.path.exists("/usr/bin/chromedriver"):
-                return Service(executable_path="/usr/bin/chromedriver")
-            else:
-                raise Exception("ChromeDriver를 설정할 수 없습니다. 시스템에 설치된 chromedriver가 없습니다.")
+# 환경 정보 디스크 캐시 (인터프리터/패키지 디렉토리/브라우저 바이너리가 바뀌면 다시 수집)
+ENV_INFO_CACHE_FILE = os.path.join(".cache", "env_info.json")
+BROWSER_BINARY_PATHS = [
+    "/usr/bin/chromium",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
 
-def setup_chrome_options():
-    """Chrome/Chromium 브라우저 옵션을 설정하는 함수"""
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--window-size=1920,1080")
-    
-    # Streamlit Cloud에서는 추가 설정
-    is_streamlit_cloud = os.environ.get('IS_STREAMLIT_CLOUD') == 'true'
-    if is_streamlit_cloud:
-        logger.info("Streamlit Cloud 환경에 맞는 브라우저 옵션 설정")
-        # Chromium 경로 명시
-        CHROMIUM_PATH = "/usr/bin/chromium"
-        if os.path.exists(CHROMIUM_PATH):
-            chrome_options.binary_location = CHROMIUM_PATH
-            logger.info(f"Chromium 경로 설정: {CHROMIUM_PATH}")
-        else:
-            logger.warning(f"Chromium 경로를 찾을 수 없음: {CHROMIUM_PATH}")
-    
-    # 봇 감지 우회를 위한 설정
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36", 
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    ]
-    chrome_options.add_argument(f"--user-agent={random.choice(user_agents)}")
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    chrome_options.add_experimental_option("useAutomationExtension", False)
-    
-    return chrome_options
+def environment_cache_key():
+    """환경 정보 캐시 키: 인터프리터 경로/버전, site-packages 및 브라우저 바이너리 수정 시각"""
+    parts = [sys.executable, sys.version, os.environ.get('IS_STREAMLIT_CLOUD', '')]
+    for path in [sysconfig.get_paths()["purelib"]] + BROWSER_BINARY_PATHS:
+        if os.path.exists(path):
+            parts.append(f"{path}:{os.path.getmtime(path)}")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
 
-def save_page_source(driver, url, output_dir="page_sources"):
-    """현재 페이지의 HTML 소스를 파일로 저장합니다."""
-    # 디렉토리가 없으면 생성
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # 파일명에 사용할 타임스탬프 생성
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # 사이트 유형 감지
-    site_type = detect_site_type(url)
-    
-    # URL에서 기사 ID 추출
+@st.cache_resource(show_spinner=False)
+def get_environment_info():
+    """환경 정보를 프로세스당 한 번만 수집하고, 같은 환경이면 디스크 캐시를 재사용합니다."""
+    cache_key = environment_cache_key()
     try:
-        # URL의 마지막 부분을 ID로 사용
-        article_id = url.strip('/').split('/')[-1]
-        # 쿼리 파라미터 제거
-        if '?' in article_id:
-            article_id = article_id.split('?')[0]
-    except:
-        article_id = "unknown"
-    
-    # 파일명 생성
-    filename = f"{output_dir}/{site_type}_article_{article_id}_{timestamp}.html"
-    
-    # HTML 소스 저장
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write(driver.page_source)
-    
-    logger.info(f"HTML 소스가 {filename}에 저장되었습니다.")
-    return filename
-
-def extract_content_from_html(html_file):
-    """저장된 HTML 파일에서 내용을 추출합니다."""
-    logger.info(f"HTML 파일에서 내용 추출: {html_file}")
-    
+        with open(ENV_INFO_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get("key") == cache_key:
+            return cached["env_info"]
+    except (OSError, ValueError):
+        pass
+    
+    env_info = check_environment()
     try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # 파일명에서 사이트 유형 추출
-        file_basename = os.path.basename(html_file)
-        site_type = "unknown"
-        site_types = ["wishket", "brunch", "medium", "velog"]
-        for st in site_types:
-            if st in file_basename:
-                site_type = st
-                break
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 제목 추출 (사이트별 선택자)
-        title_elem = None
-        if site_type == "brunch":
-            title_elem = soup.select_one('h1.cover_title') or soup.select_one('h1.article_title')
-        elif site_type == "medium":
-            title_elem = soup.select_one('h1[data-testid="article-title"]') or soup.select_one('h1.pw-post-title')
-        elif site_type == "velog":
-            title_elem = soup.select_one('h1.head-title')
-        
-        # 일반적인 제목 선택자 (다른 사이트용)
-        if not title_elem:
-            for selector in ['h1.article-title', 'h1.post-title', 'h1.entry-title', 'h1.title']:
-                title_elem = soup.select_one(selector)
-                if title_elem:
+        os.makedirs(os.path.dirname(ENV_INFO_CACHE_FILE), exist_ok=True)
+        with open(ENV_INFO_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({"key": cache_key, "env_info": env_info}, f, ensure_ascii=False)
+    except OSError as e:
+        logger.warning(f"환경 정보 캐시 저장 실패: {e}")
+    return env_info
+
+def analyze_container(container):
+    """디버그 사이드바용 컨테이너 내부 요소 분석"""
+    p_tags = container.select("p")
+    div_tags = [div for div in container.select("div") if div.text.strip() and len(div.text.strip()) > 20]
+    return {
+        'p_count': len(p_tags),
+        'p_preview': "\n".join([f"{i+1}. ({len(p.text)}자) {p.text[:50]}..." for i, p in enumerate(p_tags) if p.text.strip()]),
+        'div_count': len(div_tags),
+        'div_preview': "\n".join([f"{i+1}. ({len(div.text)}자) {div.text[:50]}..." for i, div in enumerate(div_tags)])
+    }
+
+def extract_test_content(container):
+    """선택한 컨테이너로 본문 추출을 시험합니다. (p, div, span 태그)"""
+    test_elements = []
+    # P 태그 추출 (길이 제한 없음)
+    for p in container.select("p"):
+        if p.text.strip():
+            test_elements.append(p.text.strip())
+    
+    # DIV 태그 추출 (길이 제한 낮춤: 20자)
+    for div in container.select("div"):
+        div_text = div.text.strip()
+        if div_text and len(div_text) > 20:
+            # 중복 방지
+            is_duplicate = False
+            for existing in test_elements:
+                if div_text in existing or existing in div_text:
+                    is_duplicate = True
                     break
-        
-        # 그래도 찾지 못한 경우 첫 번째 h1 태그 사용
-        if not title_elem:
-            title_elem = soup.select_one('h1')
-        
-        title = title_elem.text.strip() if title_elem else "제목을 찾을 수 없습니다"
-        
-        # 여러 컨테이너 후보 탐색 (사이트별 특화)
-        containers = []
-        
-        # 브런치 특화 컨테이너
-        if site_type == "brunch":
-            containers.extend([
-                soup.select_one('div.wrap_body_frame'),  # 브런치 메인 컨텐츠
-                soup.select_one('div.article_body'),     # 브런치 본문
-                soup.select_one('div.wrap_item')         # 브런치 아이템 래퍼
-            ])
-        
-        # 미디엄 특화 컨테이너
-        elif site_type == "medium":
-            containers.extend([
-                soup.select_one('article'),              # 미디엄 아티클
-                soup.select_one('div[data-testid="postContent"]')  # 미디엄 포스트 콘텐츠
-            ])
             
-        # 벨로그 특화 컨테이너
-        elif site_type == "velog":
-            containers.extend([
-                soup.select_one('div.atom-one'),         # 벨로그 본문
-                soup.select_one('div.sc-gZMcBi')         # 벨로그 컨텐츠
-            ])
-        
-        # Wishket 특화 컨테이너
-        elif site_type == "wishket":
-            containers.extend([
-                soup.select_one('div.article-body-container'),  # 위시켓 기본 선택자
-                soup.select_one('div.content-body')             # 위시켓 대체 선택자
-            ])
-        
-        # 일반 컨테이너 (대부분의 사이트에 적용 가능)
-        containers.extend([
-            soup.select_one('article'),                  # 일반 아티클 태그
-            soup.select_one('main'),                     # 메인 태그
-            soup.select_one('div.article-content'),      # 일반 아티클 콘텐츠
-            soup.select_one('div.entry-content'),        # 일반 엔트리 콘텐츠
-            soup.select_one('div.post-content'),         # 일반 포스트 콘텐츠
-            soup.select_one('div.content')               # 일반 콘텐츠
-        ])
-        
-        # 유효한 컨테이너 필터링
-        valid_containers = [c for c in containers if c is not None]
-        
-        if not valid_containers:
-            # 컨테이너를 찾을 수 없는 경우, 대체 방법 시도
-            logger.warning("HTML에서 주요 컨테이너를 찾을 수 없습니다. 대체 방법 시도...")
-            
-            # 전체 텍스트에서 가장 긴 텍스트 블록 찾기
-            all_tags = soup.find_all(["p", "div", "article", "section", "main", "span"])
-            text_blocks = [(tag, " ".join(tag.text.split())) 
-                        for tag in all_tags if tag.text.strip()]
-            
-            # 길이순 정렬
-            text_blocks.sort(key=lambda x: len(x[1]), reverse=True)
+            if not is_duplicate:
+                test_elements.append(div_text)
+    
+    # SPAN 태그도 추가 (길이가 길면)
+    for span in container.select("span"):
+        span_text = span.text.strip()
+        if span_text and len(span_text) > 30:
+            # 중복 방지
+            is_duplicate = False
+            for existing in test_elements:
+                if span_text in existing or existing in span_text:
+                    is_duplicate = True
+                    break
             
-            if text_blocks:
-                # 가장 긴 블록 사용
-                content = text_blocks[0][1]
-                content = clean_content(content, site_type)
-                
-                logger.info(f"대체 방법으로 {len(content)}자 추출됨")
-                return {
-                    'title': title,
-                    'content': content,
-                    'site_type': site_type
-                }
-            else:
-                return {
-                    'title': title, 
-                    'content': "내용을 찾을 수 없습니다. HTML 구조가 변경되었을 수 있습니다.",
-                    'site_type': site_type
-                }
-        
-        # 가장 많은 텍스트를 포함한 컨테이너 선택
-        article_container = max(valid_containers, key=lambda c: len(c.text.strip()))
-        
-        logger.info(f"선택된 컨테이너: {article_container.name}.{' '.join(article_container.get('class', []))}")
-        
-        # 다양한 태그에서 내용 추출
-        content_elements = []
-        
-        # p 태그 추출 (길이 제한 없음)
-        p_tags = article_container.select('p')
-        for p in p_tags:
-            p_text = p.text.strip()
-            if p_text:
-                content_elements.append(p_text)
-        
-        # div 태그 추출 (길이 제한 낮춤: 20자)
-        div_tags = article_container.select('div')
-        for div in div_tags:
-            div_text = div.text.strip()
-            if div_text and len(div_text) > 20:  # 실질적인 내용이 있는 div만
-                # 이미 추출된 내용과 중복되지 않는지 확인
-                is_duplicate = False
-                for existing in content_elements:
-                    if div_text in existing or existing in div_text:
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
-                    content_elements.append(div_text)
-        
-        # span 태그도 추가 (길이가 긴 것만)
-        span_tags = article_container.select('span')
-        for span in span_tags:
-            span_text = span.text.strip()
-            if span_text and len(span_text) > 30:  # 실질적인 내용이 있는 span만
-                # 이미 추출된 내용과 중복되지 않는지 확인
-                is_duplicate = False
-                for existing in content_elements:
-                    if span_text in existing or existing in span_text:
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
-                    content_elements.append(span_text)
-        
-        # li 태그도 추가 (길이 제한 없음)
-        li_tags = article_container.select('li')
-        for li in li_tags:
-            li_text = li.text.strip()
-            if li_text:
-                # 중복 검사
-                is_duplicate = False
-                for existing in content_elements:
-                    if li_text in existing or existing in li_text:
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
-                    content_elements.append(li_text)
-        
-        # 브런치 특화 처리: figure 태그 내의 figcaption 추가
-        if site_type == "brunch":
-            for fig in article_container.select('figure'):
-                caption = fig.select_one('figcaption')
-                if caption and caption.text.strip():
-                    content_elements.append(f"[이미지] {caption.text.strip()}")
-        
-        # 내용이 추출되지 않은 경우 컨테이너 전체 텍스트 사용
-        if not content_elements:
-            logger.warning("개별 요소에서 내용을 추출할 수 없습니다. 컨테이너 전체 텍스트를 사용합니다.")
-            content = article_container.text.strip()
-        else:
-            # 모든 내용을 합쳐서 하나의 텍스트로
-            content = "\n\n".join(content_elements)
-        
-        # 불필요한 텍스트 제거
-        content = clean_content(content, site_type)
-        
-        logger.info(f"HTML 파일에서 {len(content)}자 추출됨")
-        return {
-            'title': title,
-            'content': content,
-            'site_type': site_type
-        }
+            if not is_duplicate:
+                test_elements.append(span_text)
     
-    except Exception as e:
-        logger.error(f"HTML 파일에서 내용 추출 실패: {e}", exc_info=True)
-        return {
-            'error': f"HTML 파일에서 내용 추출 중 오류 발생: {str(e)}"
-        }
+    return clean_content("\n\n".join(test_elements))
 
 def get_saved_html_files():
     """저장된 HTML 파일 목록을 가져옵니다."""
@@ -484,283 +193,228 @@ def get_saved_html_files():
     error_pages = glob.glob("error_pages/*.html")
     return sorted(page_sources + error_pages, key=os.path.getmtime, reverse=True)
 
-def clean_content(content, site_type="unknown"):
-    """추출된 콘텐츠에서 불필요한 텍스트 제거"""
-    # ©️ 문자열 기준으로 내용 잘라내기
-    for copyright_marker in ["©️", "©", "ⓒ", "Copyright", "저작권"]:
-        if copyright_marker in content:
-            content = content.split(copyright_marker)[0]
-            break
-    
-    # 사이트별 제거할 문구 목록
-    common_phrases = [
-        "목록으로",
-        "복사 완료!",
-        "공유하기",
-        "좋아요",
-        "댓글",
-        "신고",
-        "구독하기"
-    ]
-    
-    site_specific_phrases = {
-        "wishket": [
-            "요즘IT가 PICK 한 뉴스레터를 매주 목요일 에 만나보세요.",
-            "개인정보 수집·이용 에 동의해 주세요. 무료로 구독하기",
-            "요즘IT",
-            "이메일 주소를 입력해주세요.",
-            "현재 글",
-            "관련 글 보기"
-        ],
-        "brunch": [
-            "이 글이 좋으셨다면 추천을 눌러주세요",
-            "선택한 텍스트를 드래그하여 하이라이트 해보세요",
-            "공유하기",
-            "브런치에서 보기",
-            "작가의 글을 공유하세요",
-            "작가의 글에 공감하시면 ♡를 누르세요",
-            "작가정보",
-            "You can make anything by writing",
-            "C.S.Lewis",
-            "브런치스토리 홈",
-            "브런치스토리 나우",
-            "브런치스토리 책방",
-            "계정을 잊어버리셨나요?",
-            "로그인 회원가입"
-        ],
-        "medium": [
-            "Medium is an open platform where",
-            "Read more from",
-            "More from",
-            "Recommended from Medium",
-            "Get the Medium app",
-            "A button that says 'Download on the App Store'"
-        ],
-        "velog": [
-            "댓글 작성하기",
-            "댓글을 작성하려면",
-            "로그인",
-            "태그",
-            "시리즈에 추가",
-            "이 블로그 구독하기"
-        ]
-    }
-    
-    # 사이트별 특화 문구 제거
-    phrases_to_remove = common_phrases + site_specific_phrases.get(site_type, [])
-    
-    for phrase in phrases_to_remove:
-        content = content.replace(phrase, "")
+# 세션에 보관할 본문 미리보기 길이 (전체 본문은 파일로 저장하고 경로만 보관)
+CONTENT_PREVIEW_LENGTH = 500
+EXTRACTED_TEXT_DIR = "extracted_texts"
+# 결과 화면에 한 번에 보여줄 본문 길이 (문단 경계에서 나눔)
+CONTENT_PAGE_CHARS = 5000
+# 복사/다운로드용 본문을 한 번만 내보내는 정적 파일 디렉토리
+# (.streamlit/config.toml의 enableStaticServing으로 앱 스크립트 옆 static/이 /app/static/ 경로로 제공됨)
+STATIC_TEXT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "texts")
+STATIC_TEXT_URL = "app/static/texts"
+# 본문 파일 보관 기한/용량 (static/은 누구나 받을 수 있는 경로이므로 지난 기사 본문이 계속 남지 않도록)
+TEXT_MAX_AGE_DAYS = 7
+TEXT_MAX_TOTAL_BYTES = 200 * 1024 * 1024
+# 마지막 정리 후 이 시간이 지나야 다시 정리 (browser_profiles와 같은 방식)
+TEXT_CLEANUP_INTERVAL_SECONDS = 60 * 60
+TEXT_CLEANUP_STAMP_FILE = os.path.join(EXTRACTED_TEXT_DIR, ".last_cleanup")
+
+def show_message(level, message):
+    """스크랩 진행 메시지를 표시합니다. (level: info/success/warning/error)"""
+    getattr(st, level, st.info)(message)
+
+def run_scrape(url, profile_mode=None, network_mode=None):
+    """
+    기사를 스크랩합니다.
     
-    # 다중 공백 정리
-    content = ' '.join(content.split())
+    SCRAPE_SERVICE_URL이 설정되어 있으면 스크랩 서비스의 공유 워커 풀에 작업을 맡기고,
+    없으면 이 프로세스에서 직접 브라우저를 띄웁니다. 다른 세션이 같은 URL을 스크랩 중이면 그 결과를 함께 받습니다.
+    """
+    client = get_service_client()
+    if client is None:
+        return scrape_article_shared(url, profile_mode, network_mode, notify=show_message)
+    
+    result = client.scrape(url, profile_mode=profile_mode, network_mode=network_mode)
+    for message in result.get('messages', []):
+        show_message(message['level'], message['message'])
+    return result
+
+def store_result(result):
+    """
+    추출 결과의 전체 본문을 파일로 저장하고, 세션에 보관할 참조와 미리보기만 반환합니다.
+    """
+    if not result or 'error' in result or 'content' not in result:
+        return result
+    
+    os.makedirs(EXTRACTED_TEXT_DIR, exist_ok=True)
+    source_name = os.path.basename(result.get('page_source_file') or f"article_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    content_file = os.path.join(EXTRACTED_TEXT_DIR, os.path.splitext(source_name)[0] + ".txt")
+    content = result['content']
+    # 페이지 오프셋이 바이트 기준이므로 줄바꿈 변환 없이 그대로 기록
+    content_bytes = content.encode('utf-8')
+    with open(content_file, 'wb') as f:
+        f.write(content_bytes)
+    
+    stored = {key: value for key, value in result.items() if key != 'content'}
+    stored['content_file'] = content_file
+    stored['content_preview'] = content[:CONTENT_PREVIEW_LENGTH]
+    stored['content_length'] = len(content)
+    stored['content_pages'] = page_offsets(content)
+    stored['content_url'] = publish_static_text(content_bytes)
+    maybe_cleanup_texts()
+    return stored
+
+def cleanup_text_files(directory, max_age_days=TEXT_MAX_AGE_DAYS, max_bytes=TEXT_MAX_TOTAL_BYTES):
+    """
+    본문 파일 디렉토리를 정리합니다.
     
-    # 문단 구분을 위한 줄바꿈 추가
-    content = content.replace(". ", ".\n\n")
+    - max_age_days보다 오래된 파일은 삭제
+    - 남은 파일의 합이 max_bytes를 넘으면 오래된 것부터 삭제
     
-    return content.strip()
+    Returns:
+        int: 삭제한 파일 수
+    """
+    if not os.path.isdir(directory):
+        return 0
+    
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.startswith('.'):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    
+    removed = 0
+    expires = time.time() - max_age_days * 86400
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in files:
+        if mtime >= expires and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"본문 파일 정리: {directory} ({removed}개 삭제)")
+    return removed
 
-def scrape_article(url):
-    """여러 사이트의 기사 내용을 스크랩하는 함수"""
-    # 사이트 타입 감지
-    site_type = detect_site_type(url)
-    logger.info(f"스크랩 시작: {url} (사이트 유형: {site_type})")
+_text_cleanup_lock = threading.Lock()
+
+def maybe_cleanup_texts():
+    """마지막 정리 후 TEXT_CLEANUP_INTERVAL_SECONDS가 지났으면 extracted_texts/와 static/texts/를 정리합니다."""
+    if not _text_cleanup_lock.acquire(blocking=False):
+        return
+    try:
+        if os.path.exists(TEXT_CLEANUP_STAMP_FILE) and time.time() - os.path.getmtime(TEXT_CLEANUP_STAMP_FILE) < TEXT_CLEANUP_INTERVAL_SECONDS:
+            return
+        os.makedirs(EXTRACTED_TEXT_DIR, exist_ok=True)
+        with open(TEXT_CLEANUP_STAMP_FILE, "w") as f:
+            f.write(str(time.time()))
+        cleanup_text_files(EXTRACTED_TEXT_DIR)
+        cleanup_text_files(STATIC_TEXT_DIR)
+    except Exception as e:
+        logger.warning(f"본문 파일 정리 실패: {e}")
+    finally:
+        _text_cleanup_lock.release()
+
+def page_offsets(content, page_chars=CONTENT_PAGE_CHARS):
+    """
+    본문을 page_chars 안팎의 페이지로 나눈 UTF-8 바이트 오프셋 목록 (첫 값 0, 마지막 값 전체 길이)
     
-    # Chrome 옵션 설정
-    chrome_options = setup_chrome_options()
+    가능하면 문단 경계(빈 줄)에서 나누므로 문단이 페이지 사이에서 잘리지 않습니다.
+    """
+    offsets = [0]
+    start = 0
+    position = 0
+    while len(content) - start > page_chars:
+        cut = content.rfind("\n\n", start + page_chars // 2, start + page_chars)
+        end = cut + 2 if cut != -1 else start + page_chars
+        position += len(content[start:end].encode('utf-8'))
+        offsets.append(position)
+        start = end
+    offsets.append(position + len(content[start:].encode('utf-8')))
+    return offsets
+
+def content_page_offsets(result):
+    """
+    화면에 보여줄 본문의 페이지 오프셋 (페이지 수 표시와 read_content_page가 같은 값을 쓰도록)
     
-    try:
-        with st.spinner('웹 페이지 로딩 중...'):
-            # ChromeDriverManager 대신 get_compatible_chromedriver 함수 사용
-            service = get_compatible_chromedriver()
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            
-            # Selenium Stealth 적용 (봇 감지 회피)
-            stealth(
-                driver,
-                languages=["ko-KR", "ko", "en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True
-            )
-            
-            # 자동화 스크립트 감지 방지
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            
-            driver.get(url)
-            
-            # 사이트별 페이지 로드 대기 설정
-            wait_selectors = {
-                "wishket": "article",
-                "brunch": "div.wrap_body_frame, div.article_body",
-                "medium": "article, div[data-testid='postContent']",
-                "velog": "div.atom-one, h1.head-title",
-                "unknown": "article, main, div.content" 
-            }
-            
-            selector = wait_selectors.get(site_type, wait_selectors["unknown"])
-            
-            try:
-                WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                logger.info("기사 컨텐츠 로드 완료")
-            except Exception as e:
-                logger.warning(f"기사 콘텐츠 로드 대기 시간 초과: {e}")
-            
-            # 추가 대기 (동적 로딩 콘텐츠 대기)
-            time.sleep(3)
-            
-            # 페이지 소스 저장
-            page_source_file = save_page_source(driver, url)
-            st.info(f"HTML 소스 저장됨: {page_source_file}")
+    본문 파일이 정리(cleanup_text_files)되어 없으면 저장된 오프셋은 전체 본문 기준이라 맞지 않으므로 버리고,
+    미리보기로 다시 나누며 결과에 'content_truncated'를 표시합니다.
+    """
+    content_file = result.get('content_file')
+    if content_file and not os.path.exists(content_file):
+        result.pop('content_pages', None)
+        result['content_truncated'] = True
+    offsets = result.get('content_pages')
+    if not offsets:
+        # 페이지 정보가 없는 이전 결과는 전체를 읽어서 나눔
+        offsets = page_offsets(load_result_content(result))
+    return offsets
 
-        # 사이트별 제목 추출 선택자
-        title_selectors = {
-            "wishket": ["h1.article-title", "h1"],
-            "brunch": ["h1.cover_title", "h1.article_title", "h1"],
-            "medium": ["h1[data-testid='article-title']", "h1.pw-post-title", "h1"],
-            "velog": ["h1.head-title", "h1"]
-        }
-        
-        selectors = title_selectors.get(site_type, ["h1.article-title", "h1.post-title", "h1.entry-title", "h1"])
-        
-        # 제목 추출
-        title = "제목을 찾을 수 없습니다"
-        for selector in selectors:
-            try:
-                title_elem = driver.find_element(By.CSS_SELECTOR, selector)
-                title = title_elem.text.strip()
-                if title:
-                    break
-            except Exception:
-                continue
-                
-        # 사이트별 내용 컨테이너 선택자
-        content_selectors = {
-            "wishket": ["div.article-body-container", "div.content-body"],
-            "brunch": ["div.wrap_body_frame", "div.article_body"],
-            "medium": ["article", "div[data-testid='postContent']"],
-            "velog": ["div.atom-one", "div.sc-gZMcBi"],
-            "unknown": ["article", "main", "div.content"]
-        }
-        
-        selectors = content_selectors.get(site_type, content_selectors["unknown"])
-        
-        # 내용 추출
-        content = None
-        article_container = None
-        
-        for selector in selectors:
-            try:
-                article_container = driver.find_element(By.CSS_SELECTOR, selector)
-                if article_container:
-                    break
-            except Exception:
-                continue
-                
-        if article_container:
-            try:
-                # 내용 요소 추출
-                content_elements = []
-                
-                # p 태그 추출
-                p_tags = article_container.find_elements(By.TAG_NAME, "p")
-                for p in p_tags:
-                    if p.text.strip():
-                        content_elements.append(p.text)
-                        
-                # div 태그 추출 (중복 방지를 위한 최소 길이 확인)
-                div_tags = article_container.find_elements(By.TAG_NAME, "div")
-                for div in div_tags:
-                    div_text = div.text.strip()
-                    # 브런치는 div에 중요 내용이 많으므로 길이 제한 완화
-                    min_length = 20 if site_type == "brunch" else 50
-                    if div_text and len(div_text) > min_length:
-                        # 이미 추출된 내용과 중복되지 않는지 확인
-                        is_duplicate = False
-                        for existing in content_elements:
-                            if div_text in existing or existing in div_text:
-                                is_duplicate = True
-                                break
-                        
-                        if not is_duplicate:
-                            content_elements.append(div_text)
-                
-                # 브런치 특화: figcaption 처리
-                if site_type == "brunch":
-                    try:
-                        figcaptions = article_container.find_elements(By.TAG_NAME, "figcaption")
-                        for caption in figcaptions:
-                            if caption.text.strip():
-                                content_elements.append(f"[이미지] {caption.text.strip()}")
-                    except Exception:
-                        pass
-                
-                # 모든 내용을 합쳐서 하나의 텍스트로
-                content = "\n\n".join(content_elements)
-                # 불필요한 텍스트 제거
-                content = clean_content(content, site_type)
-                
-            except Exception as e:
-                logger.error(f"내용 추출 실패: {e}")
-                content = None
-        
-        # 내용 추출 실패 시 저장된 HTML 파일에서 추출 시도
-        if not content:
-            st.warning("웹 페이지에서 직접 내용 추출에 실패했습니다. 저장된 HTML 파일에서 추출을 시도합니다...")
-            
-            html_result = extract_content_from_html(page_source_file)
-            if 'error' not in html_result:
-                content = html_result['content']
-                if title == "제목을 찾을 수 없습니다":
-                    title = html_result['title']
-                st.success("HTML 파일에서 내용을 성공적으로 추출했습니다!")
-            else:
-                content = "내용을 찾을 수 없습니다."
-                st.error(f"HTML 파일 추출도 실패: {html_result['error']}")
-        
-        # 드라이버 종료
-        driver.quit()
-        
-        return {
-            'title': title,
-            'content': content,
-            'page_source_file': page_source_file,
-            'site_type': site_type
-        }
+def read_content_page(result, page):
+    """세션 결과가 가리키는 본문 파일에서 한 페이지만 읽습니다. (0부터 시작, 범위를 넘으면 마지막 페이지)"""
+    offsets = content_page_offsets(result)
+    page = max(0, min(page, len(offsets) - 2))
+    content_file = result.get('content_file')
+    if not result.get('content_pages') or not content_file or not os.path.exists(content_file):
+        content = load_result_content(result)
+        return content.encode('utf-8')[offsets[page]:offsets[page + 1]].decode('utf-8')
+    with open(content_file, 'rb') as f:
+        f.seek(offsets[page])
+        return f.read(offsets[page + 1] - offsets[page]).decode('utf-8')
 
-    except Exception as e:
-        error_msg = f"스크랩 과정에서 오류 발생: {str(e)}"
-        logger.error(error_msg, exc_info=True)
-        st.error(error_msg)
-        
-        # 오류 발생 시에도 페이지 소스 저장 시도
-        if 'driver' in locals():
-            try:
-                page_source_file = save_page_source(driver, url, "error_pages")
-                st.info(f"오류 상태의 HTML 소스가 {page_source_file}에 저장되었습니다.")
-                driver.quit()
-            except Exception as e2:
-                logger.error(f"오류 처리 중 추가 예외 발생: {e2}")
-        
-        return {'error': str(e)}
+def publish_static_text(content_bytes):
+    """
+    본문을 정적 파일로 한 번만 내보내고 앱 기준 상대 URL을 반환합니다.
+    
+    파일명은 내용 해시이므로 같은 본문은 다시 쓰지 않고, 복사 버튼은 본문 대신 이 URL만 브라우저에 보냅니다.
+    """
+    name = hashlib.sha1(content_bytes).hexdigest()[:20] + ".txt"
+    path = os.path.join(STATIC_TEXT_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(STATIC_TEXT_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content_bytes)
+        os.replace(tmp_path, path)
+    return f"{STATIC_TEXT_URL}/{name}"
 
-def create_copy_button(text, button_text="복사하기"):
-    """클립보드에 복사하는 버튼 생성"""
+def load_result_content(result):
+    """세션 결과가 가리키는 전체 본문을 파일에서 읽습니다. (파일이 없으면 미리보기 반환)"""
+    content_file = result.get('content_file')
+    if content_file and os.path.exists(content_file):
+        with open(content_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    return result.get('content', result.get('content_preview', ''))
+
+def create_copy_button(text_url, button_text="복사하기", download_name=None):
+    """
+    클립보드에 복사하는 버튼 생성
+    
+    본문 전체를 HTML에 넣으면 다시 실행될 때마다 웹소켓으로 본문이 전송되므로,
+    정적 파일 URL만 넣고 버튼을 누를 때 브라우저가 본문을 받아 복사합니다.
+    """
     from streamlit.components.v1 import html
     
-    # 텍스트를 이스케이프하여 JavaScript에서 안전하게 사용할 수 있도록 함
-    escaped_text = json.dumps(text)
+    # URL을 이스케이프하여 JavaScript에서 안전하게 사용할 수 있도록 함
+    escaped_url = json.dumps(text_url)
+    download_link = ""
+    if download_name:
+        download_link = f"""<a id="downloadLink" style="font-size: 14px; margin-left: 8px;">텍스트 파일 다운로드</a>
+    <script>
+    const link = document.getElementById('downloadLink');
+    link.href = textUrl;
+    link.download = {json.dumps(download_name)};
+    </script>"""
     
     # 복사 버튼 HTML/JavaScript 코드
     copy_button_html = f"""
     <script>
+    // srcdoc iframe의 baseURI는 앱 페이지 주소이므로 앱 기준 상대 URL을 그대로 풀 수 있음
+    const textUrl = new URL({escaped_url}, document.baseURI).href;
     function copyToClipboard() {{
-        const text = {escaped_text};
-        navigator.clipboard.writeText(text)
+        const blob = fetch(textUrl).then(response => {{
+            if (!response.ok) throw new Error(response.status);
+            return response.blob();
+        }}).then(data => new Blob([data], {{type: 'text/plain'}}));
+        // ClipboardItem에 Promise를 넘기면 내려받는 동안에도 클릭 제스처가 유지됨 (Safari 포함)
+        const copied = window.ClipboardItem
+            ? navigator.clipboard.write([new ClipboardItem({{'text/plain': blob}})])
+            : blob.then(data => data.text()).then(text => navigator.clipboard.writeText(text));
+        copied
             .then(() => {{
                 const btn = document.getElementById('copyButton');
                 btn.innerHTML = '복사 완료!';
@@ -781,6 +435,7 @@ def create_copy_button(text, button_text="복사하기"):
         border-radius: 4px;">
         {button_text}
     </button>
+    {download_link}
     """
     
     # HTML 컴포넌트로 렌더링
@@ -790,10 +445,6 @@ def create_copy_button(text, button_text="복사하기"):
 st.sidebar.title("옵션")
 mode = st.sidebar.radio("작업 모드 선택", ["웹 스크래핑", "저장된 HTML 파일 읽기"])
 
-# 환경 정보 초기화 (시작 시 자동으로 수집)
-if 'env_info' not in st.session_state:
-    st.session_state.env_info = check_environment()
-
 if mode == "웹 스크래핑":
     # URL 입력 필드 (기본값 제거)
     url = st.text_input("스크랩핑할 기사 URL 입력", "")
@@ -805,11 +456,25 @@ if mode == "웹 스크래핑":
     if 'results' not in st.session_state:
         st.session_state.results = None
 
+    # 브라우저 캐시 재사용 (같은 사이트의 공통 CSS/JS를 다시 받지 않음)
+    profile_mode = st.sidebar.selectbox(
+        "브라우저 캐시 유지", PROFILE_MODES,
+        index=PROFILE_MODES.index(resolve_profile_mode()),
+        help="cache: 사이트별 디스크 캐시만 유지, profile: 쿠키를 포함한 프로필 전체 유지"
+    )
+    
+    # 네트워크 기록/재생 (재생은 기록된 응답만 사용하므로 같은 조건으로 반복 실행 가능)
+    network_mode = st.sidebar.selectbox(
+        "네트워크 모드", NETWORK_MODES,
+        index=NETWORK_MODES.index(resolve_network_mode()),
+        help="record: 받은 응답을 recordings/에 HAR로 기록, replay: 기록된 응답만으로 오프라인 실행"
+    )
+    
     # 스크랩 버튼
     if st.button("스크랩 실행"):
         if url:
             with st.spinner('기사 스크랩 중...'):
-                st.session_state.results = scrape_article(url)
+                st.session_state.results = store_result(run_scrape(url, profile_mode, network_mode))
         else:
             st.warning("URL을 입력해주세요.")
 else:  # 저장된 HTML 파일 읽기 모드
@@ -818,12 +483,36 @@ else:  # 저장된 HTML 파일 읽기 모드
     if not html_files:
         st.warning("저장된 HTML 파일이 없습니다. 먼저 웹 스크래핑 모드에서 기사를 스크랩해주세요.")
     else:
-        selected_file = st.selectbox("분석할 HTML 파일 선택", html_files, format_func=lambda x: f"{os.path.basename(x)} ({datetime.fromtimestamp(os.path.getmtime(x)).strftime('%Y-%m-%d %H:%M:%S')})")
+        # 제목/본문 전문 검색 (검색어가 있으면 순위대로 정렬된 결과 파일만 표시)
+        search_query = st.text_input("제목/본문 검색", "", placeholder="검색어를 입력하면 관련도 순으로 파일을 보여줍니다")
+        search_hits = {}
+        if search_query:
+            started = time.perf_counter()
+            hits = get_search_index().search(search_query, limit=50)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            search_hits = {hit['path']: hit for hit in hits if os.path.exists(hit['path'])}
+            st.caption(f"검색 결과 {len(search_hits)}건 ({elapsed_ms:.1f} ms)")
+            if search_hits:
+                html_files = list(search_hits)
+                with st.expander("검색 결과 미리보기"):
+                    for hit in search_hits.values():
+                        st.markdown(f"**{hit['title']}** · {hit['site_type'] or 'unknown'} · 점수 {hit['score']}")
+                        st.caption(hit['preview'])
+            else:
+                st.info("검색 결과가 없습니다. 전체 파일 목록을 표시합니다.")
+        
+        def format_html_file(x):
+            if x in search_hits:
+                return f"{search_hits[x]['title']} - {os.path.basename(x)} (점수 {search_hits[x]['score']})"
+            return f"{os.path.basename(x)} ({datetime.fromtimestamp(os.path.getmtime(x)).strftime('%Y-%m-%d %H:%M:%S')})"
+        
+        selected_file = st.selectbox("분석할 HTML 파일 선택", html_files, format_func=format_html_file)
         
         if st.button("HTML 파일 분석"):
             with st.spinner('HTML 파일에서 내용 추출 중...'):
-                st.session_state.results = extract_content_from_html(selected_file)
-                st.session_state.results['page_source_file'] = selected_file
+                html_result = extract_content_from_html(selected_file)
+                html_result['page_source_file'] = selected_file
+                st.session_state.results = store_result(html_result)
                 st.success("HTML 파일 분석 완료!")
             
 # 결과 표시
@@ -848,17 +537,34 @@ if st.session_state and 'results' in st.session_state and st.session_state.resul
             html_path = st.session_state.results['page_source_file']
             st.info(f"HTML 소스: {html_path}")
         
-        # 콘텐츠 표시
+        # 콘텐츠 표시 (세션에는 경로와 페이지 오프셋만 있으므로 현재 페이지만 파일에서 읽어 전송)
+        results = st.session_state.results
         st.markdown("### 추출된 내용")
+        offsets = content_page_offsets(results)
+        page_count = len(offsets) - 1
+        if results.get('content_truncated'):
+            st.warning("본문 파일이 정리되어 미리보기만 표시합니다. 전체 내용은 다시 스크랩해 주세요.")
+        page_key = f"content_page_{results.get('content_file', '')}"
+        page = 1
+        if page_count > 1:
+            page = st.number_input(f"페이지 (전체 {page_count}쪽)", min_value=1, max_value=page_count, step=1, key=page_key)
         # 텍스트 영역으로 표시 (원본 그대로 표시)
-        st.text_area("전체 내용", st.session_state.results['content'], 
-                   height=400, disabled=False, key="content")
+        st.text_area("전체 내용" if page_count == 1 else f"내용 ({page}/{page_count}쪽)", read_content_page(results, page - 1),
+                   height=400, disabled=False, key=f"content_{page_key}_{page}")
         
-        st.caption(f"추출된 내용 길이: {len(st.session_state.results['content'])} 글자")
+        content_length = results.get('content_length')
+        if content_length is None:
+            content_length = len(load_result_content(results))
+        st.caption(f"추출된 내용 길이: {content_length} 글자")
         
-        # 복사 기능
+        # 복사 기능 (본문은 정적 파일로 한 번만 내보내고 버튼에는 URL만 전달)
         st.markdown("### 내용 복사하기")
-        create_copy_button(st.session_state.results['content'], "본문 복사하기")
+        content_url = results.get('content_url')
+        # 정리로 정적 파일이 지워졌으면 다시 내보냄
+        if content_url is None or not os.path.exists(os.path.join(STATIC_TEXT_DIR, os.path.basename(content_url))):
+            content_url = results['content_url'] = publish_static_text(load_result_content(results).encode('utf-8'))
+        download_name = os.path.basename(results.get('content_file') or "article.txt")
+        create_copy_button(content_url, "본문 복사하기", download_name)
 
 # HTML 디버깅을 위한 함수 추가
 st.sidebar.markdown("---")
@@ -870,8 +576,9 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("시스템 환경 정보")
 show_env_info = st.sidebar.checkbox("환경 정보 표시")
 
-if show_env_info and 'env_info' in st.session_state:
-    env_info = st.session_state.env_info
+if show_env_info:
+    # 패널을 열 때만 수집 (프로세스 캐시 -> 디스크 캐시 -> 실제 수집 순)
+    env_info = get_environment_info()
     
     st.sidebar.markdown("#### 기본 정보")
     st.sidebar.text(f"Python: {env_info.get('python_version', '').split()[0]}")
@@ -897,94 +604,57 @@ if debug_mode and 'results' in st.session_state and st.session_state.results and
     html_file = st.session_state.results['page_source_file']
     
     if os.path.exists(html_file):
-        with open(html_file, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # 파싱 결과와 분석 결과는 내용 해시 기준으로 캐시되어 재실행 시 바로 재사용됨
+        doc_key, soup = document_cache.get_file_soup(html_file)
         
         # 사이트 유형별 선택자 설정
         site_type = st.session_state.results.get('site_type', 'unknown')
         
-        # 사이트별 주요 컨테이너 선택자
-        container_selectors = {
-            "wishket": "div.article-body-container, div.content-body",
-            "brunch": "div.wrap_body_frame, div.article_body",
-            "medium": "article, div[data-testid='postContent']",
-            "velog": "div.atom-one, div.sc-gZMcBi",
-            "unknown": "div.article-body-container, div.content-body, article, main, div.article-content, div.content"
-        }
-        
-        selector = container_selectors.get(site_type, container_selectors["unknown"])
+        # 사이트별 주요 컨테이너 선택자 (사이트 프로필에 미리 컴파일됨)
+        profile = site_registry.for_name(site_type)
+        selector = profile.inspect_selector
         
         # 주요 구조 분석
         st.sidebar.markdown(f"##### 주요 HTML 구조 ({site_type})")
-        main_containers = soup.select(selector)
+        main_containers = document_cache.get_analysis(doc_key, ('containers', selector), lambda: profile.select(soup, selector))
         
         if main_containers:
+            container_labels = document_cache.get_analysis(
+                doc_key, ('container_labels', selector),
+                lambda: [f"{c.name}.{' '.join(c.get('class', []))} ({len(c.text)}자)" for c in main_containers]
+            )
             st.sidebar.success(f"{len(main_containers)}개의 주요 컨테이너 찾음")
             container_selector = st.sidebar.selectbox(
                 "분석할 컨테이너 선택", 
                 options=range(len(main_containers)),
-                format_func=lambda i: f"{main_containers[i].name}.{' '.join(main_containers[i].get('class', []))} ({len(main_containers[i].text)}자)"
+                format_func=lambda i: container_labels[i]
             )
             
             selected_container = main_containers[container_selector]
+            analysis = document_cache.get_analysis(
+                doc_key, ('container_analysis', selector, container_selector),
+                lambda: analyze_container(selected_container)
+            )
             
             # 요소별 분석
             st.sidebar.markdown("##### 내부 요소 분석")
             
             # P 태그 분석
-            p_tags = selected_container.select("p")
-            st.sidebar.text(f"P 태그 수: {len(p_tags)}")
-            if p_tags:
-                p_content = "\n".join([f"{i+1}. ({len(p.text)}자) {p.text[:50]}..." for i, p in enumerate(p_tags) if p.text.strip()])
-                st.sidebar.text_area("P 태그 미리보기", p_content, height=100)
+            st.sidebar.text(f"P 태그 수: {analysis['p_count']}")
+            if analysis['p_count']:
+                st.sidebar.text_area("P 태그 미리보기", analysis['p_preview'], height=100)
             
             # DIV 태그 분석 (내용이 있는 것만)
-            div_tags = [div for div in selected_container.select("div") if div.text.strip() and len(div.text.strip()) > 20]
-            st.sidebar.text(f"의미있는 DIV 태그 수: {len(div_tags)}")
-            if div_tags:
-                div_content = "\n".join([f"{i+1}. ({len(div.text)}자) {div.text[:50]}..." for i, div in enumerate(div_tags)])
-                st.sidebar.text_area("DIV 태그 미리보기", div_content, height=100)
+            st.sidebar.text(f"의미있는 DIV 태그 수: {analysis['div_count']}")
+            if analysis['div_count']:
+                st.sidebar.text_area("DIV 태그 미리보기", analysis['div_preview'], height=100)
             
             # 테스트 추출
             if st.sidebar.button("선택 컨테이너로 추출 테스트"):
-                test_elements = []
-                # P 태그 추출 (길이 제한 없음)
-                for p in selected_container.select("p"):
-                    if p.text.strip():
-                        test_elements.append(p.text.strip())
-                
-                # DIV 태그 추출 (길이 제한 낮춤: 20자)
-                for div in selected_container.select("div"):
-                    div_text = div.text.strip()
-                    if div_text and len(div_text) > 20:
-                        # 중복 방지
-                        is_duplicate = False
-                        for existing in test_elements:
-                            if div_text in existing or existing in div_text:
-                                is_duplicate = True
-                                break
-                        
-                        if not is_duplicate:
-                            test_elements.append(div_text)
-                
-                # SPAN 태그도 추가 (길이가 길면)
-                for span in selected_container.select("span"):
-                    span_text = span.text.strip()
-                    if span_text and len(span_text) > 30:
-                        # 중복 방지
-                        is_duplicate = False
-                        for existing in test_elements:
-                            if span_text in existing or existing in span_text:
-                                is_duplicate = True
-                                break
-                        
-                        if not is_duplicate:
-                            test_elements.append(span_text)
-                
-                test_content = "\n\n".join(test_elements)
-                test_content = clean_content(test_content)
+                test_content = document_cache.get_analysis(
+                    doc_key, ('test_extract', selector, container_selector),
+                    lambda: extract_test_content(selected_container)
+                )
                 
                 st.text_area("테스트 추출 결과", test_content, height=300)
                 st.caption(f"추출된 내용 길이: {len(test_content)} 글자")
@@ -995,12 +665,7 @@ if debug_mode and 'results' in st.session_state and st.session_state.results and
             st.sidebar.markdown("##### 대체 방법 제안")
             
             # 전체 텍스트에서 가장 긴 텍스트 블록 찾기
-            all_tags = soup.find_all(["p", "div", "article", "section", "main", "span"])
-            text_blocks = [(tag.name, " ".join(tag.text.split()), len(" ".join(tag.text.split()))) 
-                          for tag in all_tags if tag.text.strip()]
-            
-            # 길이순 정렬
-            text_blocks.sort(key=lambda x: x[2], reverse=True)
+            text_blocks = longest_text_blocks(doc_key, soup)
             
             # 상위 5개 보여주기
             st.sidebar.text("가장 긴 텍스트 블록:")
@@ -0,0 +1,31 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import SQLiteWorkQueue
+
+
+def test_query_only_urls_are_separate_tasks(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    try:
+        added = queue.enqueue_many([
+            "https://news.example.com/view.php?no=1",
+            "https://news.example.com/view.php?no=2",
+        ])
+        assert added == 2
+        assert queue.stats()["pending"] == 2
+    finally:
+        queue.close()
+
+
+def test_same_page_is_enqueued_once(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    try:
+        added = queue.enqueue_many([
+            "https://news.example.com/view.php?no=1",
+            "https://www.news.example.com/view.php?no=1#comments",
+        ])
+        assert added == 1
+    finally:
+        queue.close()
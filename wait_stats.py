@@ -0,0 +1,229 @@
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger("wait_stats")
+
+DEFAULT_STATS_FILE = "wait_stats.json"
+
+# 사이트별로 최근 이 개수의 측정값만 사용 (사이트 개편/네트워크 변화에 따라가도록)
+DEFAULT_WINDOW = 50
+# 측정값이 이보다 적으면 기존 고정값 사용
+MIN_SAMPLES = 5
+
+# 기존 고정값 (WebDriverWait 15초, 추가 대기 3초)
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_SETTLE = 3.0
+DEFAULT_POLL_FREQUENCY = 0.5
+
+# 예산 = p95 * 배수 + 여유 (상/하한 안에서)
+PERCENTILE = 95
+TIMEOUT_FACTOR = 1.5
+TIMEOUT_MARGIN = 2.0
+TIMEOUT_BOUNDS = (5.0, 60.0)
+SETTLE_FACTOR = 1.2
+SETTLE_MARGIN = 0.3
+SETTLE_BOUNDS = (0.5, 10.0)
+# 폴링 간격 = 콘텐츠 표시 시간 중앙값의 1/10 (빠른 사이트는 자주, 느린 사이트는 드물게 확인)
+POLL_BOUNDS = (0.1, 0.5)
+
+# 본문 길이가 이 횟수만큼 연속으로 같으면 동적 로딩이 끝난 것으로 판단
+STABLE_POLLS = 2
+
+WaitBudget = namedtuple("WaitBudget", ["timeout", "poll_frequency", "settle_timeout"])
+
+DEFAULT_BUDGET = WaitBudget(DEFAULT_TIMEOUT, DEFAULT_POLL_FREQUENCY, DEFAULT_SETTLE)
+
+# 대기 선택자 요소(없으면 body)의 텍스트 길이
+CONTENT_LENGTH_SCRIPT = """
+var element = document.querySelector(arguments[0]) || document.body;
+return element ? element.innerText.length : 0;
+"""
+
+
+def percentile(values, p):
+    """최근접 순위 방식의 백분위수 (값이 없으면 None)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def _clamp(value, bounds):
+    low, high = bounds
+    return min(high, max(low, value))
+
+
+class WaitStatsStore:
+    """
+    사이트별 콘텐츠 표시 시간 기록과 대기 예산 계산
+
+    페이지 요청부터 대기 선택자가 나타날 때까지의 시간(content)과, 그 뒤 동적 로딩이 끝날 때까지의
+    시간(settle)을 사이트별로 최근 window개씩 보관하고, p95에 여유를 더해 다음 스크랩의
+    WebDriverWait 시간 제한, 폴링 간격, 추가 대기 한도를 정합니다.
+    시간 초과된 측정은 실제 소요 시간을 알 수 없으므로 대기한 시간 그대로 기록하며,
+    시간 초과가 잦은 사이트는 p95가 한도에 붙어 예산이 점점 늘어납니다.
+    (페이지 로드는 끝났는데 선택자만 없는 경우는 느린 것이 아니므로 호출하는 쪽에서 시간을 기록하지 않음)
+
+    Args:
+        path (str): 통계 파일 경로
+        window (int): 사이트별 보관할 측정 수
+    """
+
+    def __init__(self, path=DEFAULT_STATS_FILE, window=DEFAULT_WINDOW):
+        self.path = path
+        self.window = window
+        self.sites = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.sites = json.load(f)
+            except Exception as e:
+                logger.warning(f"대기 통계 파일 읽기 실패: {path} ({e})")
+
+    def record(self, site, content_seconds=None, settle_seconds=None, timed_out=False):
+        """
+        측정값을 기록합니다.
+
+        Args:
+            site (str): 사이트 키 (사이트 유형 또는 도메인)
+            content_seconds (float): 페이지 요청부터 대기 선택자가 나타날 때까지의 시간
+                (시간 초과인데 페이지는 이미 다 받은 경우처럼 느린 것이 아니면 None)
+            settle_seconds (float): 추가 대기(동적 로딩) 시간
+            timed_out (bool): content 대기가 시간 초과로 끝났는지
+        """
+        with self._lock:
+            stats = self.sites.setdefault(site, {"content": [], "settle": [], "timeouts": 0})
+            if content_seconds is not None:
+                self._append(stats["content"], content_seconds)
+            if timed_out:
+                stats["timeouts"] += 1
+            if settle_seconds is not None:
+                self._append(stats["settle"], settle_seconds)
+            try:
+                self._save()
+            except Exception as e:
+                # 측정값 저장은 부가 기능이므로 실패해도 스크랩은 계속
+                logger.warning(f"대기 통계 저장 실패: {self.path} ({e})")
+
+    def budget(self, site):
+        """사이트의 대기 예산 (측정값이 부족하면 기존 고정값)"""
+        with self._lock:
+            stats = self.sites.get(site) or {}
+            content = list(stats.get("content", []))
+            settle = list(stats.get("settle", []))
+
+        timeout, poll_frequency, settle_timeout = DEFAULT_BUDGET
+        if len(content) >= MIN_SAMPLES:
+            timeout = _clamp(percentile(content, PERCENTILE) * TIMEOUT_FACTOR + TIMEOUT_MARGIN, TIMEOUT_BOUNDS)
+            poll_frequency = _clamp(percentile(content, 50) / 10, POLL_BOUNDS)
+        if len(settle) >= MIN_SAMPLES:
+            settle_timeout = _clamp(percentile(settle, PERCENTILE) * SETTLE_FACTOR + SETTLE_MARGIN, SETTLE_BOUNDS)
+        return WaitBudget(round(timeout, 2), round(poll_frequency, 2), round(settle_timeout, 2))
+
+    def summary(self):
+        """사이트별 측정 수, p50/p95, 현재 예산"""
+        with self._lock:
+            sites = {site: dict(stats) for site, stats in self.sites.items()}
+        return {
+            site: {
+                "samples": len(stats["content"]),
+                "timeouts": stats["timeouts"],
+                "content_p50": percentile(stats["content"], 50),
+                "content_p95": percentile(stats["content"], PERCENTILE),
+                "settle_p95": percentile(stats["settle"], PERCENTILE),
+                "budget": self.budget(site)._asdict(),
+            }
+            for site, stats in sorted(sites.items())
+        }
+
+    def _append(self, samples, seconds):
+        samples.append(round(seconds, 3))
+        del samples[:-self.window]
+
+    def _save(self):
+        # 여러 프로세스가 동시에 저장해도 서로의 임시 파일을 옮기지 않도록 고유한 임시 파일에 씀
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(self.path)}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.sites, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def document_ready(driver):
+    """페이지 로드(readyState)가 끝났는지 (확인할 수 없으면 False)"""
+    try:
+        return driver.execute_script("return document.readyState") == "complete"
+    except Exception:
+        return False
+
+
+def wait_for_settle(driver, selector, budget):
+    """
+    고정 sleep 대신 본문 길이가 더 이상 늘지 않을 때까지 폴링합니다.
+
+    Args:
+        driver: WebDriver
+        selector (str): 본문 요소 CSS 선택자 (없으면 body 기준)
+        budget (WaitBudget): 대기 예산 (settle_timeout까지, poll_frequency 간격)
+
+    Returns:
+        tuple: (대기한 시간(초), 한도까지 기다렸는지)
+    """
+    started = time.perf_counter()
+    deadline = started + budget.settle_timeout
+    previous = None
+    stable = 0
+    while True:
+        try:
+            length = driver.execute_script(CONTENT_LENGTH_SCRIPT, selector)
+        except Exception as e:
+            logger.debug(f"본문 길이 확인 실패: {e}")
+            length = None
+        stable = stable + 1 if length is not None and length == previous else 0
+        previous = length
+        if stable >= STABLE_POLLS:
+            return time.perf_counter() - started, False
+        if time.perf_counter() + budget.poll_frequency > deadline:
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            return time.perf_counter() - started, True
+        time.sleep(budget.poll_frequency)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_wait_stats_store(path=DEFAULT_STATS_FILE):
+    """프로세스에서 공유하는 대기 통계 저장소를 반환합니다."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = WaitStatsStore(path)
+        return _default_store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="사이트별 페이지 로드 시간과 대기 예산 확인")
+    parser.add_argument("--stats-file", default=DEFAULT_STATS_FILE, help="대기 통계 파일")
+    args = parser.parse_args()
+
+    for site, info in WaitStatsStore(args.stats_file).summary().items():
+        budget = info["budget"]
+        print(f"{site}\t측정 {info['samples']}개 (시간 초과 {info['timeouts']}) "
+              f"p50 {info['content_p50']}초 / p95 {info['content_p95']}초 -> "
+              f"대기 {budget['timeout']}초, 폴링 {budget['poll_frequency']}초, 추가 대기 최대 {budget['settle_timeout']}초")
@@ -0,0 +1,626 @@
+import argparse
+import hmac
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlparse
+from urllib.request import Request, urlopen
+
+from discovery import page_key
+from resilience import SELECTOR_MISS
+
+logger = logging.getLogger("work_queue")
+
+DEFAULT_QUEUE_FILE = "work_queue.db"
+# 파일 경로 또는 큐 서버 주소 (예: http://10.0.0.5:8766)
+QUEUE_ENV = "WORK_QUEUE"
+# 큐 서버와 워커가 공유하는 토큰 (서버를 다른 머신에 공개할 때 필요)
+TOKEN_ENV = "WORK_QUEUE_TOKEN"
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+
+# 작업을 가져간 워커가 이 시간 안에 완료/연장하지 않으면 다른 워커가 다시 가져감 (visibility timeout)
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# 실패 후 다시 가져갈 수 있을 때까지의 대기 (시도마다 두 배, 상한)
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 1800
+# 워커가 큐에 닿지 못할 때(큐 서버 재시작 등) 다시 시도하기까지의 대기 상한
+QUEUE_RETRY_MAX_DELAY = 60
+# 큐 호출에서 워커를 멈추지 않고 다시 시도할 오류 (URLError/timeout은 OSError, 서버 오류 응답은 RuntimeError)
+QUEUE_ERRORS = (OSError, RuntimeError, ValueError, sqlite3.Error)
+
+# 작업 상태
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+DEAD = "dead"
+
+
+class SQLiteWorkQueue:
+    """
+    SQLite 파일 하나에 저장되는 임대(lease) 방식 작업 큐
+
+    - lease(): 우선순위가 높은 것부터, 같으면 먼저 들어온 작업을 하나 가져가며 lease_seconds 동안 다른 워커에게 보이지 않음
+      (임대가 만료된 작업은 워커가 죽은 것으로 보고 다시 가져갈 수 있음)
+    - complete()/fail(): 임대 토큰이 맞을 때만 반영되므로, 만료 후 다른 워커가 가져간 작업을 늦게 끝낸 워커가 덮어쓰지 않음
+      같은 토큰으로 다시 호출해도 결과가 같음 (멱등)
+    - max_attempts번 가져가고도 끝나지 않은 작업은 dead로 옮겨 따로 확인 (dead-letter)
+    - 같은 페이지(discovery.page_key 기준, 쿼리가 다르면 다른 작업)는 한 번만 들어감
+
+    한 머신의 여러 프로세스는 이 파일을 직접 공유하고, 여러 머신은 WorkQueueServer를 거쳐 공유합니다.
+    (SQLite 파일을 네트워크 파일 시스템으로 공유하면 잠금이 보장되지 않음)
+
+    Args:
+        path (str): 큐 DB 파일 경로
+        max_attempts (int): 기본 최대 시도 횟수
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_FILE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # 트랜잭션을 직접 시작 (다른 프로세스의 워커와도 직렬화)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                task_id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                dedupe_key TEXT UNIQUE NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                options TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_token TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, priority DESC, available_at, task_id);
+            CREATE INDEX IF NOT EXISTS tasks_lease ON tasks (status, lease_expires);
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        # 읽은 뒤 쓰는 트랜잭션이 잠금 승격에서 실패하지 않도록 처음부터 쓰기 잠금을 잡음 (BEGIN IMMEDIATE)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, url, priority=0, options=None, max_attempts=None):
+        """
+        작업을 넣습니다. 같은 URL이 이미 있으면 넣지 않습니다.
+
+        Returns:
+            bool: 새로 넣었는지
+        """
+        return self.enqueue_many([url], priority, options, max_attempts) == 1
+
+    def enqueue_many(self, urls, priority=0, options=None, max_attempts=None):
+        """여러 URL을 한 트랜잭션으로 넣고 새로 들어간 개수를 반환합니다."""
+        now = time.time()
+        rows = [
+            (url, page_key(url), priority, json.dumps(options or {}), PENDING,
+             max_attempts or self.max_attempts, now, now)
+            for url in urls
+        ]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (url, dedupe_key, priority, options, status, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            added = conn.total_changes - before
+        logger.info(f"작업 {added}개 추가 (중복 {len(rows) - added}개 제외, 우선순위 {priority})")
+        return added
+
+    def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """
+        다음 작업을 가져갑니다.
+
+        Returns:
+            dict | None: {'task_id', 'url', 'options', 'attempt', 'token', 'lease_expires'} (가져갈 작업이 없으면 None)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # 임대가 만료된 채 시도 횟수를 다 쓴 작업은 계속 워커를 죽이는 작업일 수 있으므로 dead로
+            expired = conn.execute(
+                "UPDATE tasks SET status = ?, last_error = COALESCE(last_error, '임대 만료'), finished_at = ? "
+                "WHERE status = ? AND lease_expires <= ? AND attempts >= max_attempts",
+                (DEAD, now, LEASED, now)
+            ).rowcount
+            if expired:
+                logger.warning(f"임대 만료가 반복된 작업 {expired}개를 dead로 옮김")
+
+            row = conn.execute(
+                "SELECT task_id, url, options, attempts FROM tasks "
+                "WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_expires <= ?) "
+                "ORDER BY priority DESC, available_at, task_id LIMIT 1",
+                (PENDING, now, LEASED, now)
+            ).fetchone()
+            if row is None:
+                return None
+
+            token = uuid.uuid4().hex
+            expires = now + lease_seconds
+            conn.execute(
+                "UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_token = ?, lease_expires = ? "
+                "WHERE task_id = ?",
+                (LEASED, worker_id, token, expires, row["task_id"])
+            )
+        return {
+            'task_id': row["task_id"],
+            'url': row["url"],
+            'options': json.loads(row["options"] or "{}"),
+            'attempt': row["attempts"] + 1,
+            'token': token,
+            'lease_expires': expires,
+        }
+
+    def heartbeat(self, task_id, token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """임대를 연장합니다. (이미 다른 워커가 가져갔거나 끝난 작업이면 False)"""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE task_id = ? AND lease_token = ? AND status = ?",
+                (time.time() + lease_seconds, task_id, token, LEASED)
+            ).rowcount == 1
+
+    def complete(self, task_id, token, result=None):
+        """
+        작업을 완료로 표시합니다. 같은 토큰으로 여러 번 호출해도 한 번만 반영됩니다.
+
+        Returns:
+            bool: 이 토큰의 완료가 반영되었는지 (다른 워커가 다시 가져간 작업이면 False)
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT status, lease_token FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None or row["lease_token"] != token:
+                return False
+            if row["status"] == DONE:
+                return True
+            # 임대가 만료됐어도 아직 아무도 다시 가져가지 않았다면 결과를 받아들임 (작업을 버리지 않도록)
+            conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, lease_expires = NULL, finished_at = ? WHERE task_id = ?",
+                (DONE, json.dumps(result, ensure_ascii=False) if result is not None else None, time.time(), task_id)
+            )
+            return True
+
+    def fail(self, task_id, token, error, retry=True, retry_delay=None):
+        """
+        실패를 기록합니다. 시도 횟수가 남아 있으면 retry_delay(기본: 지수 백오프) 뒤에 다시 가져갈 수 있고,
+        retry가 False이거나 횟수를 다 쓰면 dead로 옮깁니다.
+
+        Returns:
+            str | None: 바뀐 상태 (PENDING 또는 DEAD, 토큰이 맞지 않으면 None)
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT status, lease_token, attempts, max_attempts FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if row is None or row["lease_token"] != token or row["status"] not in (LEASED, PENDING):
+                return None
+            if not retry or row["attempts"] >= row["max_attempts"]:
+                conn.execute(
+                    "UPDATE tasks SET status = ?, last_error = ?, lease_expires = NULL, finished_at = ? WHERE task_id = ?",
+                    (DEAD, error, now, task_id)
+                )
+                return DEAD
+            if retry_delay is None:
+                retry_delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (row["attempts"] - 1))
+            conn.execute(
+                "UPDATE tasks SET status = ?, last_error = ?, available_at = ?, lease_expires = NULL WHERE task_id = ?",
+                (PENDING, error, now + retry_delay, task_id)
+            )
+            return PENDING
+
+    def dead_letters(self, limit=100):
+        """dead로 옮겨진 작업 목록"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, url, attempts, last_error, finished_at FROM tasks WHERE status = ? "
+                "ORDER BY finished_at DESC LIMIT ?", (DEAD, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def requeue_dead(self, task_ids=None):
+        """dead 작업을 시도 횟수를 초기화해 다시 넣습니다. (task_ids가 없으면 전부)"""
+        now = time.time()
+        with self._transaction() as conn:
+            query = "UPDATE tasks SET status = ?, attempts = 0, available_at = ?, lease_token = NULL, finished_at = NULL WHERE status = ?"
+            params = [PENDING, now, DEAD]
+            if task_ids:
+                query += f" AND task_id IN ({','.join('?' * len(task_ids))})"
+                params.extend(task_ids)
+            return conn.execute(query, params).rowcount
+
+    def stats(self):
+        """상태별 작업 수와 만료된 임대 수"""
+        now = time.time()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            expired = self._conn.execute(
+                "SELECT COUNT(*) FROM tasks WHERE status = ? AND lease_expires <= ?", (LEASED, now)
+            ).fetchone()[0]
+        stats = {status: counts.get(status, 0) for status in (PENDING, LEASED, DONE, DEAD)}
+        stats['expired_leases'] = expired
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _QueueHandler(BaseHTTPRequestHandler):
+    """
+    POST /enqueue    {"urls": [...], "priority": 0, "options": {}}
+    POST /lease      {"worker_id": ..., "lease_seconds": ...} -> 작업 (없으면 204)
+    POST /heartbeat  {"task_id", "token", "lease_seconds"}
+    POST /complete   {"task_id", "token", "result"}
+    POST /fail       {"task_id", "token", "error", "retry", "retry_delay"}
+    POST /requeue    {"task_ids": [...]} (생략하면 전부)
+    GET  /stats
+    GET  /dead?limit=100
+
+    서버에 토큰이 있으면 모든 요청에 "Authorization: Bearer <토큰>" 헤더가 필요합니다.
+    """
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status, data=None):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8") if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        token = self.server.token
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization") or ""
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self._send_json(401, {'error': "토큰이 맞지 않습니다"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        if path == "/stats":
+            return self._send_json(200, self.server.queue.stats())
+        if path == "/dead":
+            try:
+                limit = int(parse_qs(url.query).get("limit", ["100"])[0])
+            except ValueError:
+                return self._send_json(400, {'error': "limit은 정수여야 합니다"})
+            return self._send_json(200, self.server.queue.dead_letters(limit))
+        self._send_json(404, {'error': "없는 경로입니다"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {'error': "JSON 본문이 필요합니다"})
+
+        queue = self.server.queue
+        action = self.path.strip("/")
+        try:
+            if action == "enqueue":
+                added = queue.enqueue_many(payload["urls"], payload.get("priority", 0), payload.get("options"),
+                                           payload.get("max_attempts"))
+                return self._send_json(200, {'added': added})
+            if action == "lease":
+                task = queue.lease(payload["worker_id"], payload.get("lease_seconds", DEFAULT_LEASE_SECONDS))
+                return self._send_json(200, task) if task else self._send_json(204)
+            if action == "heartbeat":
+                return self._send_json(200, {'ok': queue.heartbeat(
+                    payload["task_id"], payload["token"], payload.get("lease_seconds", DEFAULT_LEASE_SECONDS))})
+            if action == "complete":
+                return self._send_json(200, {'ok': queue.complete(payload["task_id"], payload["token"], payload.get("result"))})
+            if action == "fail":
+                return self._send_json(200, {'status': queue.fail(
+                    payload["task_id"], payload["token"], payload.get("error", ""),
+                    payload.get("retry", True), payload.get("retry_delay"))})
+            if action == "requeue":
+                return self._send_json(200, {'requeued': queue.requeue_dead(payload.get("task_ids"))})
+        except KeyError as e:
+            return self._send_json(400, {'error': f"필수 값이 없습니다: {e}"})
+        self._send_json(404, {'error': "없는 경로입니다"})
+
+
+class WorkQueueServer(ThreadingHTTPServer):
+    """
+    여러 머신의 워커가 하나의 SQLite 큐를 쓰도록 HTTP로 공유하는 서버
+
+    Args:
+        queue (SQLiteWorkQueue): 공유할 큐
+        host (str): 바인딩할 주소 (기본: 이 머신에서만 접근)
+        port (int): 포트
+        token (str): 요청에 필요한 공유 토큰 (없으면 인증 없음)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, queue, host=DEFAULT_HOST, port=DEFAULT_PORT, token=None):
+        super().__init__((host, port), _QueueHandler)
+        self.queue = queue
+        self.token = token
+
+
+class RemoteWorkQueue:
+    """
+    WorkQueueServer 클라이언트 (SQLiteWorkQueue와 같은 메서드)
+
+    Args:
+        base_url (str): 큐 서버 주소
+        timeout (float): HTTP 요청 하나의 제한 시간(초)
+        token (str): 서버의 공유 토큰 (기본: WORK_QUEUE_TOKEN 환경 변수)
+    """
+
+    def __init__(self, base_url, timeout=10, token=None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token or os.environ.get(TOKEN_ENV)
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = Request(f"{self.base_url}{path}", data=data, method=method, headers=headers)
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                return json.loads(body) if body else None
+        except HTTPError as e:
+            body = json.loads(e.read() or b"null") or {}
+            raise RuntimeError(body.get('error') or f"큐 서버 오류 ({e.code})") from e
+
+    def enqueue(self, url, priority=0, options=None, max_attempts=None):
+        return self.enqueue_many([url], priority, options, max_attempts) == 1
+
+    def enqueue_many(self, urls, priority=0, options=None, max_attempts=None):
+        return self._request("POST", "/enqueue", {'urls': list(urls), 'priority': priority, 'options': options,
+                                                  'max_attempts': max_attempts})['added']
+
+    def lease(self, worker_id, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._request("POST", "/lease", {'worker_id': worker_id, 'lease_seconds': lease_seconds})
+
+    def heartbeat(self, task_id, token, lease_seconds=DEFAULT_LEASE_SECONDS):
+        return self._request("POST", "/heartbeat", {'task_id': task_id, 'token': token, 'lease_seconds': lease_seconds})['ok']
+
+    def complete(self, task_id, token, result=None):
+        return self._request("POST", "/complete", {'task_id': task_id, 'token': token, 'result': result})['ok']
+
+    def fail(self, task_id, token, error, retry=True, retry_delay=None):
+        return self._request("POST", "/fail", {'task_id': task_id, 'token': token, 'error': error,
+                                               'retry': retry, 'retry_delay': retry_delay})['status']
+
+    def dead_letters(self, limit=100):
+        return self._request("GET", f"/dead?limit={int(limit)}")
+
+    def requeue_dead(self, task_ids=None):
+        return self._request("POST", "/requeue", {'task_ids': list(task_ids) if task_ids else None})['requeued']
+
+    def stats(self):
+        return self._request("GET", "/stats")
+
+
+def open_queue(location=None):
+    """파일 경로면 SQLiteWorkQueue, http(s) 주소면 RemoteWorkQueue (기본: WORK_QUEUE 환경 변수 또는 work_queue.db)"""
+    location = location or os.environ.get(QUEUE_ENV) or DEFAULT_QUEUE_FILE
+    if location.startswith(("http://", "https://")):
+        return RemoteWorkQueue(location)
+    return SQLiteWorkQueue(location)
+
+
+def _summarize(result):
+    # 큐에는 본문 대신 결과 위치만 저장
+    return {key: result.get(key) for key in ('title', 'site_type', 'page_source_file', 'near_duplicate_of')} | {
+        'content_length': len(result.get('content') or ""),
+    }
+
+
+def _call_queue(description, call, stop_event, initial_delay):
+    """
+    큐 호출을 성공할 때까지 백오프하며 다시 시도합니다. (큐 서버가 잠깐 내려가도 워커가 죽지 않도록)
+
+    Returns:
+        tuple: (성공 여부, 호출 결과) - stop_event가 설정되면 (False, None)
+    """
+    delay = initial_delay
+    while True:
+        try:
+            return True, call()
+        except QUEUE_ERRORS as e:
+            logger.warning(f"큐 {description} 실패, {delay:.1f}초 후 다시 시도: {e}")
+        if stop_event.wait(delay):
+            return False, None
+        delay = min(QUEUE_RETRY_MAX_DELAY, delay * 2)
+
+
+def run_worker(queue, scrape_func=None, worker_id=None, lease_seconds=DEFAULT_LEASE_SECONDS, idle_sleep=5,
+               max_tasks=None, stop_event=None, exit_when_empty=False):
+    """
+    큐에서 URL을 하나씩 가져와 스크랩합니다.
+
+    스크랩하는 동안 임대 시간의 1/3마다 임대를 연장하므로 오래 걸리는 페이지도 다른 워커가 가져가지 않고,
+    워커가 죽으면 연장이 멈춰 임대 만료 후 다른 워커가 이어받습니다.
+    선택자 미스처럼 다시 해도 같은 실패는 재시도하지 않고 바로 dead로 옮깁니다.
+    큐에 닿지 못하면(큐 서버 재시작 등) 종료하지 않고 백오프하며 다시 시도합니다.
+
+    Args:
+        queue: SQLiteWorkQueue 또는 RemoteWorkQueue
+        scrape_func (callable): url과 옵션을 받아 결과 dict를 반환 (기본: article_scraper.scrape_article)
+        worker_id (str): 워커 이름 (기본: 호스트명-PID)
+        lease_seconds (float): 임대 시간
+        idle_sleep (float): 큐가 비었을 때 다시 확인하기까지의 대기
+        max_tasks (int): 이만큼 처리하면 종료 (None이면 stop_event까지 계속)
+        stop_event (threading.Event): 설정되면 현재 작업을 마치고 종료
+        exit_when_empty (bool): 가져갈 작업이 없으면 기다리지 않고 종료
+
+    Returns:
+        int: 처리한 작업 수
+    """
+    if scrape_func is None:
+        from article_scraper import scrape_article
+        scrape_func = scrape_article
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    stop_event = stop_event or threading.Event()
+    processed = 0
+
+    while not stop_event.is_set() and (max_tasks is None or processed < max_tasks):
+        leased, task = _call_queue("임대", lambda: queue.lease(worker_id, lease_seconds), stop_event, idle_sleep)
+        if not leased:
+            break
+        if task is None:
+            if exit_when_empty:
+                break
+            stop_event.wait(idle_sleep)
+            continue
+
+        logger.info(f"작업 시작: {task['task_id']} {task['url']} ({task['attempt']}번째 시도, {worker_id})")
+        lease_lost = threading.Event()
+        done = threading.Event()
+
+        def keep_alive(task=task):
+            while not done.wait(lease_seconds / 3):
+                try:
+                    if not queue.heartbeat(task['task_id'], task['token'], lease_seconds):
+                        lease_lost.set()
+                        logger.warning(f"임대를 잃었습니다: {task['task_id']} (다른 워커가 가져감)")
+                        return
+                except Exception as e:
+                    logger.warning(f"임대 연장 실패: {task['task_id']} ({e})")
+
+        heartbeat_thread = threading.Thread(target=keep_alive, name=f"lease-{task['task_id']}", daemon=True)
+        heartbeat_thread.start()
+        try:
+            result = scrape_func(task['url'], **task['options'])
+        except Exception as e:
+            result = {'error': str(e)}
+        finally:
+            done.set()
+            heartbeat_thread.join()
+
+        # 결과를 반영하지 못한 채 종료되면 임대 만료 후 다른 워커가 다시 처리함
+        if result and 'error' not in result:
+            summary = _summarize(result)
+            reported, ok = _call_queue("완료 보고", lambda: queue.complete(task['task_id'], task['token'], summary),
+                                       stop_event, idle_sleep)
+            if reported and not ok:
+                logger.warning(f"완료가 반영되지 않았습니다: {task['task_id']} (임대 만료 후 다른 워커가 가져감)")
+        else:
+            error = (result or {}).get('error') or "결과 없음"
+            retry = (result or {}).get('failure_kind') != SELECTOR_MISS
+            reported, status = _call_queue("실패 보고", lambda: queue.fail(task['task_id'], task['token'], error, retry=retry),
+                                           stop_event, idle_sleep)
+            logger.warning(f"작업 실패: {task['task_id']} {task['url']} -> {status} ({error})")
+        processed += 1
+
+    logger.info(f"워커 종료: {worker_id} (처리 {processed}개)")
+    return processed
+
+
+if __name__ == "__main__":
+    from log_setup import setup_logging
+    setup_logging("work_queue.log")
+
+    parser = argparse.ArgumentParser(description="여러 머신이 함께 쓰는 스크랩 작업 큐")
+    parser.add_argument("--queue", help=f"큐 DB 파일 또는 큐 서버 주소 (기본: {QUEUE_ENV} 환경 변수 또는 {DEFAULT_QUEUE_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="URL 추가")
+    enqueue_parser.add_argument("urls", nargs="*", help="URL 목록")
+    enqueue_parser.add_argument("--url-file", help="한 줄에 하나씩 URL이 적힌 파일")
+    enqueue_parser.add_argument("--priority", type=int, default=0, help="높을수록 먼저 처리")
+    enqueue_parser.add_argument("--max-attempts", type=int, help="최대 시도 횟수")
+
+    work_parser = commands.add_parser("work", help="워커 실행")
+    work_parser.add_argument("--worker-id", help="워커 이름 (기본: 호스트명-PID)")
+    work_parser.add_argument("--lease", type=float, default=DEFAULT_LEASE_SECONDS, help="임대 시간(초)")
+    work_parser.add_argument("--max-tasks", type=int, help="처리할 최대 작업 수")
+    work_parser.add_argument("--workers", type=int, default=1, help="이 머신에서 실행할 워커 스레드 수")
+    work_parser.add_argument("--drain", action="store_true", help="큐가 비면 기다리지 않고 종료")
+
+    serve_parser = commands.add_parser("serve", help="다른 머신의 워커가 쓸 수 있도록 큐를 HTTP로 공유")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="바인딩할 주소 (다른 머신에 공개하려면 0.0.0.0과 --token)")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                              help=f"워커가 보내야 하는 공유 토큰 (기본: {TOKEN_ENV} 환경 변수)")
+
+    commands.add_parser("stats", help="상태별 작업 수")
+    commands.add_parser("dead", help="dead 작업 목록")
+    requeue_parser = commands.add_parser("requeue", help="dead 작업 다시 넣기")
+    requeue_parser.add_argument("task_ids", nargs="*", type=int, help="작업 ID (생략하면 전부)")
+    args = parser.parse_args()
+
+    if args.command == "work":
+        # 워커 스레드마다 별도 연결 (SQLite 큐는 프로세스/스레드 사이에서 BEGIN IMMEDIATE로 직렬화)
+        threads = [
+            threading.Thread(target=run_worker, args=(open_queue(args.queue),),
+                             kwargs={'worker_id': f"{args.worker_id or socket.gethostname()}-{os.getpid()}-{index}",
+                                     'lease_seconds': args.lease, 'max_tasks': args.max_tasks,
+                                     'exit_when_empty': args.drain})
+            for index in range(args.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elif args.command == "serve":
+        queue = open_queue(args.queue)
+        if not isinstance(queue, SQLiteWorkQueue):
+            parser.error("serve는 큐 DB 파일에만 사용할 수 있습니다")
+        if not args.token and args.host not in ("127.0.0.1", "localhost", "::1"):
+            parser.error(f"다른 머신에 공개하려면 --token 또는 {TOKEN_ENV} 환경 변수가 필요합니다")
+        server = WorkQueueServer(queue, args.host, args.port, args.token)
+        logger.info(f"작업 큐 서버 시작: http://{args.host}:{args.port} ({queue.path})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        queue = open_queue(args.queue)
+        if args.command == "enqueue":
+            urls = list(args.urls)
+            if args.url_file:
+                with open(args.url_file, "r", encoding="utf-8") as f:
+                    urls.extend(line.strip() for line in f if line.strip())
+            print(f"추가된 작업: {queue.enqueue_many(urls, args.priority, max_attempts=args.max_attempts)}개")
+        elif args.command == "stats":
+            print(json.dumps(queue.stats(), ensure_ascii=False, indent=2))
+        elif args.command == "dead":
+            for task in queue.dead_letters():
+                print(f"{task['task_id']}\t{task['attempts']}회\t{task['url']}\t{task['last_error']}")
+        elif args.command == "requeue":
+            print(f"다시 넣은 작업: {queue.requeue_dead(args.task_ids)}개")